@@ -0,0 +1,63 @@
+import random
+import timeit
+from typing import Set
+
+from django.core.management.base import BaseCommand
+
+from apps.chat.services import intent
+
+FILLER = "오늘 점심은 뭘 먹을까 고민 중인데 회사 근처 식당이 다 붐벼서 "
+
+
+def _message(length: int, rnd: random.Random) -> str:
+    body = (FILLER * (length // len(FILLER) + 1))[:length]
+    kw = rnd.choice(["코디 추천", "우산", "뭐 입지", "영화"])
+    pos = rnd.randint(0, len(body))
+    return body[:pos] + kw + body[pos:]
+
+
+def _legacy(text: str) -> Set[str]:
+    """이전 구현: 호출마다 키워드 목록을 만들고 any(kw in text) 로 의도별 두 번 훑음"""
+    found = set()
+    t = (text or "").lower()
+    outfit_keywords = list(intent.DEFAULT_INTENT_KEYWORDS[intent.OUTFIT_QUESTION])
+    if any(kw in t for kw in outfit_keywords):
+        found.add(intent.OUTFIT_QUESTION)
+    keywords = list(intent.DEFAULT_INTENT_KEYWORDS[intent.OUTFIT])
+    if any(k in t for k in keywords):
+        found.add(intent.OUTFIT)
+    return found
+
+
+class Command(BaseCommand):
+    help = "의도 감지 마이크로벤치마크 (키워드 any() 스캔 vs 컴파일된 멀티 패턴 매처)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lengths", type=int, nargs="+", default=[10, 100, 1000, 10000]
+        )
+        parser.add_argument("--messages", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        engine = intent.IntentEngine(intent.DEFAULT_INTENT_KEYWORDS)
+        rnd = random.Random(7)
+        self.stdout.write(
+            f"{engine.keyword_count} keywords, {opts['messages']} messages per length"
+        )
+        for length in opts["lengths"]:
+            msgs = [_message(length, rnd) for _ in range(opts["messages"])]
+            for m in msgs:
+                assert _legacy(m) == engine.match(m), m
+            row = []
+            for fn in (_legacy, engine.match):
+                best = min(
+                    timeit.repeat(
+                        lambda: [fn(m) for m in msgs], number=1, repeat=opts["repeat"]
+                    )
+                )
+                row.append(best / len(msgs) * 1e6)
+            self.stdout.write(
+                f"  len={length:<6d} any() scan {row[0]:9.2f} µs   "
+                f"compiled {row[1]:9.2f} µs"
+            )
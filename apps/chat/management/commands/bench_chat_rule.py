@@ -0,0 +1,64 @@
+import random
+import timeit
+from typing import List, Optional, Tuple
+
+from django.core.management.base import BaseCommand
+
+from apps.chat.services.model_picker import get_index, pick_model_setting
+from apps.chat.services.rule_answers import format_rule_answer, rule_answer
+from apps.recommend.services import outfit_explanations
+from apps.recommend.services.recommend_service import build_outfit_by_temp_and_cond
+
+CONDITIONS = ["Clear", "Clouds", "Rain", "Snow", "Mist", ""]
+
+
+def _samples(n: int) -> List[Tuple[float, int, Optional[str]]]:
+    rnd = random.Random(42)
+    return [
+        (round(rnd.uniform(-15, 35), 2), rnd.randint(10, 95), rnd.choice(CONDITIONS))
+        for _ in range(n)
+    ]
+
+
+def _legacy(temp: float, humi: int, cond: Optional[str]):
+    """이전 룰 분기: 모델 설정 조회 + 룰 생성 + 답변 텍스트 조립"""
+    pick_model_setting(temp, humi, cond)
+    fb = build_outfit_by_temp_and_cond(temp, cond)
+    return format_rule_answer(fb), fb
+
+
+def _fast(temp: float, humi: int, cond: Optional[str]):
+    return rule_answer(temp, cond)
+
+
+class Command(BaseCommand):
+    help = "챗봇 룰 코디 분기 지연시간 비교 (기존 경로 vs 답변 테이블 fast path)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        # 설명은 룰 템플릿으로 고정 (DB 의 생성 설명 유무와 무관하게 같은 작업을 비교)
+        with outfit_explanations.pinned({}):
+            self._run(opts)
+
+    def _run(self, opts):
+        get_index()  # 모델 설정 인덱스는 워커당 한 번 로드 → 측정에서 DB 조회 제외
+        samples = _samples(opts["samples"])
+        for s in samples:
+            assert _legacy(*s) == _fast(*s), s
+
+        self.stdout.write(
+            f"rule branch, {len(samples)} messages, best of {opts['repeat']}"
+        )
+        for label, fn in (
+            ("legacy (setting query + rebuild)", _legacy),
+            ("answer table fast path", _fast),
+        ):
+            best = min(
+                timeit.repeat(
+                    lambda: [fn(*s) for s in samples], number=1, repeat=opts["repeat"]
+                )
+            )
+            self.stdout.write(f"  {label:34s} {best / len(samples) * 1e6:9.2f} µs/msg")
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.chat.services import log_buffer
+
+
+class Command(BaseCommand):
+    help = "지연 저장(write-behind) 대화 로그 버퍼를 DB 로 배치 저장"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=log_buffer.FLUSH_BATCH)
+        parser.add_argument(
+            "--loop", action="store_true", help="종료될 때까지 주기적으로 반복"
+        )
+        parser.add_argument("--interval", type=float, default=log_buffer.FLUSH_INTERVAL)
+
+    def _report(self, flushed: int) -> None:
+        st = log_buffer.stats()
+        self.stdout.write(
+            f"flushed {flushed}, pending {st['pending']}, "
+            f"lag {st['lag_seconds']:.1f}s ({st['mode']})"
+        )
+
+    def handle(self, *args, **opts):
+        if not opts["loop"]:
+            self._report(log_buffer.flush_all(opts["batch"]))
+            return
+        while True:
+            close_old_connections()
+            flushed = log_buffer.flush_all(opts["batch"])
+            if flushed:
+                self._report(flushed)
+            time.sleep(opts["interval"])
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatIntentKeyword',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('intent', models.CharField(max_length=50)),
+                ('keyword', models.CharField(max_length=100)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'chat_intent_keyword',
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('intent', 'keyword'), name='uniq_intent_keyword'
+                    )
+                ],
+            },
+        ),
+    ]
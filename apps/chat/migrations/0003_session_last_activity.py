@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_last_activity(apps, schema_editor):
+    ChatSession = apps.get_model('chat', 'ChatSession')
+    AiChatLogs = apps.get_model('chat', 'AiChatLogs')
+    last_log = (
+        AiChatLogs.objects.filter(session=OuterRef('pk'))
+        .values('session')
+        .annotate(last=Max('created_at'))
+        .values('last')
+    )
+    ChatSession.objects.update(last_activity_at=Subquery(last_log))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_intent_keyword'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chatsession',
+            index=models.Index(
+                fields=['user', '-last_activity_at'], name='idx_session_user_activity'
+            ),
+        ),
+    ]
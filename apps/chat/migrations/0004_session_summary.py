@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_session_last_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='summary',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='summary_upto',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_session_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aichatlogs',
+            index=models.Index(
+                fields=['session', '-created_at', 'id'], name='idx_log_session_created'
+            ),
+        ),
+    ]
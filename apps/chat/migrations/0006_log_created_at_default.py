@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_log_session_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aichatlogs',
+            name='created_at',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_log_llm_telemetry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='weather_fetched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='weather_key',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='chatsession',
+            name='weather_snapshot',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0008_session_weather_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='aichatlogs',
+            name='idx_log_session_created',
+        ),
+        migrations.AddIndex(
+            model_name='aichatlogs',
+            index=models.Index(
+                fields=['session', '-created_at', '-id'], name='idx_log_session_created'
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0009_log_session_timeline_desc_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aichatlogs',
+            name='buffer_key',
+            field=models.CharField(
+                blank=True, editable=False, max_length=32, null=True, unique=True
+            ),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models.manager import Manager as DjangoManager
+from django.utils import timezone
 
 WEATHER_CHOICES = [
     ("", "ANY"),
@@ -76,6 +77,28 @@ class AiModelSettings(models.Model):
         )
 
 
+class ChatIntentKeyword(models.Model):
+    """의도 감지 키워드 (기본 키워드에 추가, 저장 시 매처 재컴파일)"""
+
+    intent = models.CharField(max_length=50)
+    keyword = models.CharField(max_length=100)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects: DjangoManager["ChatIntentKeyword"] = models.Manager()
+
+    class Meta:
+        db_table = "chat_intent_keyword"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["intent", "keyword"], name="uniq_intent_keyword"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.intent}: {self.keyword}"
+
+
 class AiChatLogs(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -102,14 +125,40 @@ class AiChatLogs(models.Model):
     user_question = models.TextField()
     ai_answer = models.TextField()
     context = models.JSONField(default=dict)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # 지연 저장(write-behind) 시 응답 시각을 그대로 넣기 위해 auto_now_add 대신 default
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    # 호출 계측 (룰/캐시 답변은 토큰·지연 없음)
+    served_by = models.CharField(max_length=20, blank=True)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+    cached_tokens = models.PositiveIntegerField(null=True, blank=True)
+    ttft_ms = models.PositiveIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    # 지연 저장 항목 키 (플러시가 겹쳐 같은 항목을 다시 넣어도 한 행만 남음)
+    buffer_key = models.CharField(
+        max_length=32, null=True, blank=True, unique=True, editable=False
+    )
 
     objects: DjangoManager["AiChatLogs"] = models.Manager()
     id: int
 
     class Meta:
         db_table = "ai_chat_logs"
-        indexes = [models.Index(fields=["user", "session", "-created_at"])]
+        indexes = [
+            models.Index(fields=["user", "session", "-created_at"]),
+            # 세션 타임라인 (session 고정 + created_at 범위 + (created_at, id) 역순 커서)
+            # 본문(TEXT)은 btree 행 크기 제한(약 2.7KB)에 걸려 긴 답변 저장이 실패하므로
+            # include 하지 않음
+            models.Index(
+                fields=["session", "-created_at", "-id"],
+                name="idx_log_session_created",
+            ),
+            # 일별 LLM 통계
+            models.Index(
+                fields=["created_at", "served_by"], name="idx_log_created_served"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user_id}/{self.session_id} - {self.created_at:%Y-%m-%d %H:%M:%S}"
@@ -126,9 +175,23 @@ class ChatSession(models.Model):
     )
     session_uuid = models.UUIDField(default=uuid.uuid4, unique=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # 마지막 로그 저장 시각 (세션 이어쓰기 판단용, 로그 저장 시 갱신)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    # 최근 대화 창 밖으로 밀려난 대화의 누적 요약 (summary_upto 이하 로그까지 반영)
+    summary = models.TextField(blank=True, default="")
+    summary_upto = models.BigIntegerField(null=True, blank=True)
+    # 세션 날씨 스냅샷 (같은 위치면 신선도 기간 동안 재사용, weather_key 는 위치 식별자)
+    weather_snapshot = models.JSONField(null=True, blank=True)
+    weather_key = models.CharField(max_length=64, blank=True)
+    weather_fetched_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "chat_session"
+        indexes = [
+            models.Index(
+                fields=["user", "-last_activity_at"], name="idx_session_user_activity"
+            )
+        ]
 
     def __str__(self):
         return f"{self.id} ({self.session_uuid})"
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ChatLogCursorPagination(CursorPagination):
+    """(created_at, id) 커서 페이지네이션 (OFFSET 없이 인덱스 순서대로)"""
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "limit"
+    max_page_size = 100
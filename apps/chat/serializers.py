@@ -16,16 +16,43 @@ class ChatSendSerializer(serializers.Serializer):
     district = serializers.CharField(required=False, allow_blank=True)
 
 
+LOG_FIELDS = (
+    "id",
+    "user",
+    "session",
+    "model_name",
+    "user_question",
+    "ai_answer",
+    "context",
+    "created_at",
+    "served_by",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "ttft_ms",
+    "latency_ms",
+)
+# 목록 기본 필드 (무거운 context JSON 은 fields= 로 요청할 때만)
+LOG_LIST_FIELDS = tuple(f for f in LOG_FIELDS if f != "context")
+
+
+def parse_log_fields(param: str | None, default=LOG_LIST_FIELDS):
+    """?fields=id,ai_answer → 필드 튜플. 모르는 필드가 있으면 None"""
+    if not param:
+        return default
+    fields = tuple(dict.fromkeys(f.strip() for f in param.split(",") if f.strip()))
+    if not fields or any(f not in LOG_FIELDS for f in fields):
+        return None
+    return fields
+
+
 class AiChatLogReadSerializer(serializers.ModelSerializer):  # ← ModelSerializer 로!
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = AiChatLogs
-        fields = [
-            "id",
-            "user",
-            "session",
-            "model_name",
-            "user_question",
-            "ai_answer",
-            "context",
-            "created_at",
-        ]
+        fields = list(LOG_FIELDS)
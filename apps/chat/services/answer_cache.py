@@ -0,0 +1,211 @@
+"""GPT 일반 대화 답변 캐시 (질문 MinHash/LSH + 날씨 구간)
+
+"오늘 우산 챙겨야 해?" 처럼 사용자만 다른 반복 질문은 같은 날, 같은 지역, 같은 날씨 구간이면
+답도 같다. 구간 안에서도 값이 다른 수치(기온 등)가 들어간 답변은 저장하지 않는다.
+질문을 정규화해 문자 2-gram MinHash 서명을 만들고, LSH 밴드로 후보를 찾은 뒤
+서명 일치율(자카드 추정)이 SIMILARITY_THRESHOLD 이상이면 저장된 답변을 재사용한다.
+인덱스는 워커 프로세스 로컬 메모리이며 항목마다 TTL 이 있다.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from apps.core.dates import local_today
+from apps.recommend.services.recommend_service import temperature_band
+
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SIMILARITY_THRESHOLD = 0.8
+DEFAULT_TTL = 1800  # 30분
+MAX_ENTRIES = 5000
+SHINGLE = 2
+
+_MERSENNE = (1 << 61) - 1
+_rng = np.random.default_rng(20251101)
+_PERM_A = _rng.integers(1, _MERSENNE, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE, size=NUM_PERM, dtype=np.uint64)
+
+_STRIP = re.compile(r"[\s\W_]+", re.UNICODE)
+_DIGIT = re.compile(r"\d")
+
+
+def normalize_question(text: str) -> str:
+    """소문자 + 공백/문장부호 제거"""
+    return _STRIP.sub("", (text or "").lower())
+
+
+def weather_bucket(weather: Dict[str, Any] | None) -> str:
+    """날짜(Asia/Seoul) + 지역 + 체감 기온 구간 + 날씨 상태"""
+    day = local_today().isoformat()
+    if not weather:
+        return f"{day}:none"
+    temp = weather.get("feels_like") or weather.get("temperature")
+    band = temperature_band(temp) if isinstance(temp, (int, float)) else "-"
+    city = (weather.get("city") or "").strip()
+    return f"{day}:{city}:{band}:{(weather.get('condition') or '').lower()}"
+
+
+def signature(norm: str) -> np.ndarray:
+    """문자 n-gram MinHash 서명 (NUM_PERM,)"""
+    if len(norm) <= SHINGLE:
+        grams = {norm}
+    else:
+        grams = {norm[i : i + SHINGLE] for i in range(len(norm) - SHINGLE + 1)}
+    h = np.fromiter(
+        (zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)
+    )
+    # (a*h + b) mod p 를 32비트 해시로 (uint64 오버플로는 의도된 wrap-around)
+    perm = (_PERM_A[:, None] * h[None, :] + _PERM_B[:, None]) % _MERSENNE
+    return (perm & 0xFFFFFFFF).min(axis=1)
+
+
+def _band_keys(sig: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [
+        (b, sig[b * LSH_ROWS : (b + 1) * LSH_ROWS].tobytes()) for b in range(LSH_BANDS)
+    ]
+
+
+@dataclass
+class CacheQuery:
+    bucket: str
+    norm: str
+    sig: np.ndarray = field(repr=False)
+
+
+@dataclass
+class _Entry:
+    bucket: str
+    norm: str
+    sig: np.ndarray = field(repr=False)
+    answer: str
+    expires_at: float
+
+
+class AnswerCache:
+    def __init__(self, *, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._exact: Dict[Tuple[str, str], int] = {}
+        self._lsh: Dict[Tuple[str, int, bytes], Set[int]] = {}
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    # -----------------------------
+    # 내부 인덱스 관리 (lock 안에서 호출)
+    # -----------------------------
+    def _drop(self, entry_id: int) -> None:
+        e = self._entries.pop(entry_id, None)
+        if e is None:
+            return
+        if self._exact.get((e.bucket, e.norm)) == entry_id:
+            del self._exact[(e.bucket, e.norm)]
+        for band, key in _band_keys(e.sig):
+            ids = self._lsh.get((e.bucket, band, key))
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._lsh[(e.bucket, band, key)]
+
+    def _live(self, entry_id: int, now: float) -> Optional[_Entry]:
+        e = self._entries.get(entry_id)
+        if e is not None and e.expires_at <= now:
+            self._drop(entry_id)
+            return None
+        return e
+
+    # -----------------------------
+    # public
+    # -----------------------------
+    def query(self, question: str, weather: Dict[str, Any] | None) -> CacheQuery:
+        norm = normalize_question(question)
+        return CacheQuery(weather_bucket(weather), norm, signature(norm))
+
+    def lookup(self, q: CacheQuery, *, now: float | None = None) -> Optional[str]:
+        now = now if now is not None else time.time()
+        with self._lock:
+            best: Tuple[float, Optional[_Entry]] = (0.0, None)
+            exact_id = self._exact.get((q.bucket, q.norm))
+            if exact_id is not None:
+                e = self._live(exact_id, now)
+                if e is not None:
+                    best = (1.0, e)
+            if best[1] is None:
+                cands: Set[int] = set()
+                for band, key in _band_keys(q.sig):
+                    cands |= self._lsh.get((q.bucket, band, key), set())
+                for cid in list(cands):
+                    e = self._live(cid, now)
+                    if e is None:
+                        continue
+                    sim = float(np.mean(e.sig == q.sig))
+                    if sim >= SIMILARITY_THRESHOLD and sim > best[0]:
+                        best = (sim, e)
+            if best[1] is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return best[1].answer
+
+    def store(
+        self,
+        q: CacheQuery,
+        answer: str,
+        *,
+        ttl: int = DEFAULT_TTL,
+        now: float | None = None,
+    ) -> None:
+        # 수치가 든 답변은 같은 구간의 다른 값에 맞지 않으므로 저장하지 않음
+        if not q.norm or not answer or _DIGIT.search(answer):
+            return
+        now = now if now is not None else time.time()
+        with self._lock:
+            old = self._exact.get((q.bucket, q.norm))
+            if old is not None:
+                self._drop(old)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(q.bucket, q.norm, q.sig, answer, now + ttl)
+            self._exact[(q.bucket, q.norm)] = entry_id
+            for band, key in _band_keys(q.sig):
+                self._lsh.setdefault((q.bucket, band, key), set()).add(entry_id)
+            self.stores += 1
+            # 가장 먼저 저장된 항목부터 제거
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._exact.clear()
+            self._lsh.clear()
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+
+answer_cache = AnswerCache()
@@ -1,159 +1,236 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional, cast
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    cast,
+)
 
+from asgiref.sync import sync_to_async
 from django.db import transaction
-from openai import OpenAI
+from django.utils import timezone
+from openai import AsyncOpenAI, OpenAI
 from openai.types.chat import ChatCompletionMessageParam
 
 from apps.chat.models import AiChatLogs, AiModelSettings, ChatSession
-from apps.chat.services.model_picker import pick_model_setting
-from apps.recommend.services.recommend_service import build_outfit_by_temp_and_cond
+from apps.chat.services import llm, log_buffer
+from apps.chat.services.answer_cache import CacheQuery, answer_cache
+from apps.chat.services.context_builder import (
+    fit_history,
+    history_budget,
+    message_tokens,
+)
+from apps.chat.services.intent import OUTFIT_QUESTION, match_intents
+from apps.chat.services.llm import (
+    CallStats,
+    Deadline,
+    LLMUnavailable,
+    elapsed_ms,
+    usage_stats,
+)
+from apps.chat.services.model_picker import pick_model_setting, route_model
+from apps.chat.services.recent_turns import HISTORY_TURNS, get_recent, push_turn
+from apps.chat.services.rule_answers import rule_answer
+from apps.chat.services.sessions import mark_active, touch_session
+from apps.chat.services.summaries import get_summary, schedule_summary
+from apps.core.db import timed_atomic
+from apps.recommend.services.outfit_explanations import audience_of
 
 logger = logging.getLogger(__name__)
-client = OpenAI()
+# 재시도는 llm 모듈(tenacity)에서 마감 시간 안에서만
+client = OpenAI(max_retries=0)
+aclient = AsyncOpenAI(max_retries=0)
+
+# prepare_turn 에 setting 을 넘기지 않았을 때 (직접 조회)
+_LOOKUP: Any = object()
 
 
 def _msg(role: str, content: str) -> ChatCompletionMessageParam:
     return cast(ChatCompletionMessageParam, {"role": role, "content": content})
 
 
-@transaction.atomic
-def chat_and_log(
+# 모든 사용자·요청에 바이트 단위로 같은 프롬프트 앞부분 (바꾸면 PROMPT_VERSION 도 올릴 것)
+SYSTEM_PROMPT = (
+    "너는 한국어로 대답하는 AI 모델이야. "
+    "사용자가 날씨와 코디를 물으면 현재 날씨 정보를 활용해 코디를 추천하고, "
+    "그 외 질문에는 일상 대화처럼 간결하고 유용하게 답해줘."
+)
+STATIC_PREFIX: Tuple[ChatCompletionMessageParam, ...] = (
+    _msg("system", SYSTEM_PROMPT),
+    _msg(
+        "system",
+        "예시Q: 저녁 뭐 먹지? 예시A: 오늘은 가벼운 한식으로 비빔밥 어때요? 야채 듬뿍에 고추장 조금.",
+    ),
+    _msg(
+        "system",
+        "예시Q: 요약해줘 예시A: 핵심만 3줄로 요약할게요: 1) ..., 2) ..., 3) ...",
+    ),
+)
+PROMPT_VERSION = "chat-v1"
+
+
+class ChatTurn(TypedDict):
+    """답변 생성 전 준비 결과 (룰 답변이면 answer, GPT 면 messages)"""
+
+    setting: Optional[AiModelSettings]
+    answer: Optional[str]
+    messages: List[ChatCompletionMessageParam]
+    context: Dict[str, Any]
+    rule_outfits: Dict[str, Any] | None
+    cache_query: Optional[CacheQuery]
+    # 최근 대화 버퍼가 없어 DB 에서 읽은 경우 그 목록 (저장 시 버퍼를 새로 채움)
+    history_seed: Optional[List[Tuple[str, str]]]
+    # 프롬프트에 못 넣은 대화(창 밖 또는 토큰 예산 초과)가 있어 저장 후 요약 갱신 필요
+    summarize: bool
+    # 프롬프트에 그대로 넣은 최근 대화 수 (요약은 그보다 오래된 대화만 합침)
+    history_kept: int
+    # 라우팅된 LLM 모델 (룰 답변이면 "")
+    model: str
+    # 모델 호출 토큰/지연 (AiChatLogs 계측 컬럼)
+    telemetry: CallStats
+
+
+def _weather_temp(weather: Dict[str, Any] | None) -> Optional[float]:
+    return (
+        (weather.get("feels_like") or weather.get("temperature")) if weather else None
+    )
+
+
+def setting_for_weather(weather: Dict[str, Any] | None) -> Optional[AiModelSettings]:
+    temp = _weather_temp(weather)
+    if temp is None or weather is None:
+        return None
+    return pick_model_setting(temp, weather.get("humidity"), weather.get("condition"))
+
+
+def prepare_turn(
     *,
     user,
     session: ChatSession,
     user_message: str,
     weather: Dict[str, Any] | None,
     profile: Dict[str, Any] | None,
-    model_name: str = "gpt-4o",
-) -> dict:
+    setting: Optional[AiModelSettings] = _LOOKUP,
+) -> ChatTurn:
 
     # -----------------------------
     # 1) 날씨 정보 정리
     # -----------------------------
-    temp: Optional[float] = (
-        (weather.get("feels_like") or weather.get("temperature")) if weather else None
-    )
-    humi: Optional[int] = weather.get("humidity") if weather else None
+    temp = _weather_temp(weather)
     cond: Optional[str] = weather.get("condition") if weather else None
 
-    # 모델 설정값 추출
-    setting: Optional[AiModelSettings] = None
-    if temp is not None:
-        setting = pick_model_setting(temp, humi, cond)
-
     # -----------------------------
     # 2) 사용자가 코디 질문인지 판단
     # -----------------------------
-    text = (user_message or "").lower()
-    outfit_keywords = [
-        "뭐입지",
-        "뭐 입지",
-        "입을까",
-        "입어야",
-        "코디",
-        "옷 추천",
-        "코디 추천",
-        "패션 추천",
-        "뭐 입어",
-        "오늘 입을",
-        "오늘 옷",
-    ]
-    is_outfit_question = any(kw in text for kw in outfit_keywords)
+    intents = match_intents(user_message)
+    is_outfit_question = OUTFIT_QUESTION in intents
+
+    # 모델 설정값 추출 (워커 메모리 인덱스, 비동기 경로는 미리 조회해서 넘김)
+    if setting is _LOOKUP:
+        setting = setting_for_weather(weather)
 
     # -----------------------------
-    # 3) 룰 기반 코디 추천 생성
+    # 3) RULE 기반 코디 추천 답변 (미리 만든 답변 테이블)
     # -----------------------------
-    fb: Dict[str, Any] | None = None
-    if temp is not None:
+    if is_outfit_question and temp is not None:
         try:
-            fb = build_outfit_by_temp_and_cond(temp, cond)  # ⭐ 함수명 변경
+            answer, fb = rule_answer(temp, cond, audience_of(profile, user))
         except Exception:
             logger.exception("outfit rule build failed")
-            fb = None
-
-    logger.info(
-        "chat_and_log debug: temp=%s, cond=%s, is_outfit_question=%s, has_rule=%s",
-        temp,
-        cond,
-        is_outfit_question,
-        bool(fb),
-    )
-
-    # -----------------------------
-    # 4) RULE 기반 코디 추천 답변
-    # -----------------------------
-    if is_outfit_question and fb:
-        logger.info(">>> OUTFIT RULE BRANCH HIT")
-
-        rec1 = fb.get("rec_1") or ""
-        rec2 = fb.get("rec_2") or ""
-        rec3 = fb.get("rec_3") or ""
-        explanation = fb.get("explanation") or ""
-
-        answer_lines: List[str] = []
-        answer_lines.append("[RULE] 온도 기반 하드코딩 코디 추천")
-        if explanation:
-            answer_lines.append(explanation)
-
-        answer_lines.append("")
-        answer_lines.append("오늘의 추천 코디:")
-        if rec1:
-            answer_lines.append(f"1) {rec1}")
-        if rec2:
-            answer_lines.append(f"2) {rec2}")
-        if rec3:
-            answer_lines.append(f"3) {rec3}")
-
-        final_answer = "\n".join(answer_lines).strip()
-
-        log: AiChatLogs = AiChatLogs.objects.create(
-            user=user,
-            model_setting=setting,
-            session=session,
-            model_name=model_name,
-            user_question=user_message,
-            ai_answer=final_answer,
-            context={
-                "weather": weather or {},
-                "profile": profile or {},
-                "model_setting": setting.name if setting else None,
+        else:
+            logger.info(">>> OUTFIT RULE BRANCH HIT")
+            return {
+                "setting": setting,
+                "answer": answer,
+                "messages": [],
+                "context": {
+                    "weather": weather or {},
+                    "profile": profile or {},
+                    "model_setting": setting.name if setting else None,
+                    "rule_outfits": fb,
+                    "served_by": "rule",
+                },
                 "rule_outfits": fb,
-            },
-        )
+                "cache_query": None,
+                "history_seed": None,
+                "summarize": False,
+                "history_kept": 0,
+                "model": "",
+                "telemetry": {},
+            }
 
-        return {
-            "session_id": session.id,
-            "answer": final_answer,
-            "used_setting": setting.category_combo if setting else None,
-            "log_id": log.id,
-            "created_at": log.created_at,
-            "rule_outfits": fb,
-        }
+    context: Dict[str, Any] = {
+        "weather": weather or {},
+        "profile": profile or {},
+        "model_setting": setting.name if setting else None,
+    }
 
     # -----------------------------
-    # 5) GPT 기반 일반 대화 처리
+    # 4) GPT 기반 일반 대화 처리
     # -----------------------------
     logger.info(">>> GPT BRANCH HIT")
 
-    recent = list(
-        AiChatLogs.objects.filter(user=user, session=session)
-        .order_by("-created_at")
-        .values_list("user_question", "ai_answer")[:3]
-    )
+    # 최근 대화는 세션 링 버퍼에서 (없을 때만 DB)
+    recent = get_recent(session.id)
+    history_seed: Optional[List[Tuple[str, str]]] = None
+    if recent is None:
+        recent = history_seed = list(
+            AiChatLogs.objects.filter(user=user, session=session)
+            .order_by("-created_at")
+            .values_list("user_question", "ai_answer")[:HISTORY_TURNS]
+        )
+
+    # 버퍼가 가득 찼거나 토큰 예산 때문에 빠진 대화가 있으면 → 누적 요약을 앞에 두고,
+    # 프롬프트에 못 넣은 대화는 저장 후 백그라운드에서 요약에 합침
+    budget = history_budget()
+    picked, used = fit_history(recent, budget)
+    summarize = len(recent) >= HISTORY_TURNS or len(picked) < len(recent)
+    summary = get_summary(session.id) if summarize else ""
     history: List[ChatCompletionMessageParam] = []
-    for q, a in reversed(recent):
+    if summary:
+        history.append(_msg("system", f"이전 대화 요약: {summary}"))
+        picked, used = fit_history(recent, budget - message_tokens(summary))
+    for q, a in picked:
         history.append(_msg("user", q))
         history.append(_msg("assistant", a))
+    context["history"] = {
+        "turns": len(picked),
+        "tokens": used,
+        "summary": bool(summary),
+    }
 
-    # SYSTEM PROMPT
-    system_prompt = (
-        "너는 한국어로 대답하는 AI 모델이야. "
-        "사용자가 날씨와 코디를 물으면 현재 날씨 정보를 활용해 코디를 추천하고, "
-        "그 외 질문에는 일상 대화처럼 간결하고 유용하게 답해줘."
-    )
+    # 메시지 길이/복잡도/의도로 모델 선택 (사유는 로그에 남겨 기준 조정)
+    route = route_model(user_message, intents, history_turns=len(recent))
+    context["route"] = {"model": route.model, "reason": route.reason}
+
+    # 이전 대화/프로필이 없는 질문만 (질문 + 날씨 구간) 답변 캐시 사용
+    cache_query: Optional[CacheQuery] = None
+    if not recent and not profile:
+        cache_query = answer_cache.query(user_message, weather)
+        cached = answer_cache.lookup(cache_query)
+        if cached is not None:
+            logger.info(">>> ANSWER CACHE HIT")
+            return {
+                "setting": setting,
+                "answer": cached,
+                "messages": [],
+                "context": {**context, "served_by": "answer_cache"},
+                "rule_outfits": None,
+                "cache_query": None,
+                "history_seed": history_seed,
+                "summarize": summarize,
+                "history_kept": len(picked),
+                "model": route.model,
+                "telemetry": {},
+            }
 
     guidance_parts: List[str] = []
     if weather:
@@ -168,51 +245,422 @@ def chat_and_log(
     if profile:
         guidance_parts.append(f"사용자 프로필: {profile}")
 
-    fewshot: List[ChatCompletionMessageParam] = [
-        _msg(
-            "system",
-            "예시Q: 저녁 뭐 먹지? 예시A: 오늘은 가벼운 한식으로 비빔밥 어때요? 야채 듬뿍에 고추장 조금.",
-        ),
-        _msg(
-            "system",
-            "예시Q: 요약해줘 예시A: 핵심만 3줄로 요약할게요: 1) ..., 2) ..., 3) ...",
-        ),
-    ]
-
-    messages: List[ChatCompletionMessageParam] = [
-        _msg("system", system_prompt),
-        *fewshot,
-    ]
+    # 고정 접두부 → 세션 히스토리(턴마다 뒤에만 늘어남) → 요청별 안내 → 질문 순서로 두어
+    # 앞부분이 최대한 길게 이전 요청과 같도록 (OpenAI 자동 프롬프트 캐시)
+    messages: List[ChatCompletionMessageParam] = [*STATIC_PREFIX, *history]
     if guidance_parts:
         messages.append(_msg("system", "\n".join(guidance_parts)))
-    messages.extend(history)
     messages.append(_msg("user", user_message))
 
-    completion = client.chat.completions.create(
-        model=model_name,
-        messages=messages,
-        temperature=0.8,
-    )
-    gpt_answer = (completion.choices[0].message.content or "").strip()
+    return {
+        "setting": setting,
+        "answer": None,
+        "messages": messages,
+        "context": context,
+        "rule_outfits": None,
+        "cache_query": cache_query,
+        "history_seed": history_seed,
+        "summarize": summarize,
+        "history_kept": len(picked),
+        "model": route.model,
+        "telemetry": {},
+    }
 
-    log2: AiChatLogs = AiChatLogs.objects.create(
-        user=user,
-        model_setting=setting,
-        session=session,
-        model_name=model_name,
-        user_question=user_message,
-        ai_answer=gpt_answer,
-        context={
-            "weather": weather or {},
-            "profile": profile or {},
-            "model_setting": setting.name if setting else None,
-        },
+
+def fallback_answer(turn: ChatTurn) -> Optional[Tuple[str, str]]:
+    """LLM 을 못 쓸 때 대신할 (답변, 경로): 그 사이 저장된 캐시 답변 → 날씨 룰 코디"""
+    if turn["cache_query"] is not None:
+        cached = answer_cache.lookup(turn["cache_query"])
+        if cached is not None:
+            return cached, "fallback_cache"
+    weather = turn["context"].get("weather") or None
+    temp = _weather_temp(weather)
+    if weather and temp is not None:
+        try:
+            return rule_answer(temp, weather.get("condition"))[0], "fallback_rule"
+        except Exception:
+            logger.exception("fallback rule build failed")
+    return None
+
+
+def _degrade(turn: ChatTurn, err: LLMUnavailable, started: float) -> str:
+    """마감 초과 등으로 LLM 답변을 못 받았을 때 대체 답변 (없으면 그대로 실패)"""
+    turn["telemetry"]["latency_ms"] = elapsed_ms(started)  # 포기하기까지 걸린 시간
+    fb = fallback_answer(turn)
+    if fb is None:
+        raise err
+    logger.warning("llm unavailable (%s), served by %s", err, fb[1])
+    turn["context"]["served_by"] = fb[1]
+    turn["context"]["llm_error"] = str(err)
+    return fb[0]
+
+
+def _stream_delta(
+    chunk: Any, parts: List[str], stats: CallStats, started: float
+) -> Optional[str]:
+    """스트림 청크 하나 → 새 텍스트 (usage/첫 토큰 시간 기록)"""
+    if getattr(chunk, "usage", None) is not None:
+        stats.update(usage_stats(chunk.usage))
+    if not chunk.choices:
+        return None
+    delta = chunk.choices[0].delta.content
+    if not delta:
+        return None
+    if not parts:
+        stats["ttft_ms"] = elapsed_ms(started)
+    parts.append(delta)
+    return delta
+
+
+def _stream_done(
+    turn: ChatTurn, stats: CallStats, started: float, parts: List[str]
+) -> str:
+    turn["telemetry"] = {**stats, "latency_ms": elapsed_ms(started)}
+    _log_route(turn)
+    answer = "".join(parts).strip()
+    turn["context"]["served_by"] = "llm"
+    remember_answer(turn, answer)
+    return answer
+
+
+def _partial(
+    turn: ChatTurn,
+    err: LLMUnavailable,
+    stats: CallStats,
+    started: float,
+    parts: List[str],
+) -> str:
+    """스트림이 중간에 끊긴 답변 (served_by=llm_partial + 오류 기록)"""
+    logger.warning("llm stream interrupted (%s) after %d chunks", err, len(parts))
+    turn["telemetry"] = {**stats, "latency_ms": elapsed_ms(started)}
+    turn["context"]["served_by"] = "llm_partial"
+    turn["context"]["llm_error"] = str(err)
+    return "".join(parts).strip()
+
+
+def _log_route(turn: ChatTurn) -> None:
+    route = turn["context"].get("route") or {}
+    logger.info(
+        "chat route model=%s reason=%s ttft=%sms latency=%sms",
+        route.get("model"),
+        route.get("reason"),
+        turn["telemetry"].get("ttft_ms"),
+        turn["telemetry"].get("latency_ms"),
     )
 
-    return {
+
+def _llm_answer(turn: ChatTurn, completion, started: float) -> str:
+    """비스트리밍 응답 (첫 토큰 시간 = 전체 지연)"""
+    latency = elapsed_ms(started)
+    turn["telemetry"] = {
+        **usage_stats(getattr(completion, "usage", None)),
+        "ttft_ms": latency,
+        "latency_ms": latency,
+    }
+    _log_route(turn)
+    answer = (completion.choices[0].message.content or "").strip()
+    turn["context"]["served_by"] = "llm"
+    remember_answer(turn, answer)
+    return answer
+
+
+def remember_answer(turn: ChatTurn, answer: str) -> None:
+    """모델이 새로 만든 답변을 캐시에 저장 (캐시 대상 질문만)"""
+    if turn["cache_query"] is not None:
+        answer_cache.store(turn["cache_query"], answer)
+
+
+def save_turn(
+    *,
+    user,
+    session: ChatSession,
+    turn: ChatTurn,
+    user_message: str,
+    answer: str,
+    model_name: str,
+) -> dict:
+    """답변 확정 후 AiChatLogs 저장 (짧은 트랜잭션) 및 응답 dict 구성
+
+    지연 저장(CHAT_LOG_WRITE_BEHIND) 이면 INSERT 없이 버퍼에 넣고 log_id 는 None
+    (버퍼에 못 넣으면 바로 INSERT).
+    """
+    setting = turn["setting"]
+
+    def after_save() -> None:
+        push_turn(session.id, user_message, answer, seed=turn["history_seed"])
+        if turn["summarize"]:
+            schedule_summary(session.id, turn["history_kept"])
+
+    telemetry = {**turn["telemetry"], "served_by": turn["context"].get("served_by", "")}
+    log_id: Optional[int] = None
+    buffered = False
+    if log_buffer.enabled():
+        created_at = timezone.now()
+        buffered = log_buffer.enqueue(
+            telemetry=telemetry,
+            user_id=user.id if user else None,
+            session_id=session.id,
+            model_setting_id=setting.id if setting else None,
+            model_name=model_name,
+            user_question=user_message,
+            ai_answer=answer,
+            context=turn["context"],
+            created_at=created_at,
+        )
+    if buffered:
+        mark_active(session)
+        after_save()
+    else:
+        # 지연 저장이 꺼져 있거나 버퍼(Redis) 오류면 바로 INSERT
+        with timed_atomic("chat.save_turn"):
+            log: AiChatLogs = AiChatLogs.objects.create(
+                user=user,
+                model_setting=setting,
+                session=session,
+                model_name=model_name,
+                user_question=user_message,
+                ai_answer=answer,
+                context=turn["context"],
+                **telemetry,
+            )
+            touch_session(session, log.created_at)
+            transaction.on_commit(after_save)
+        log_id, created_at = log.id, log.created_at
+
+    out = {
         "session_id": session.id,
-        "answer": gpt_answer,
+        "answer": answer,
         "used_setting": setting.category_combo if setting else None,
-        "log_id": log2.id,
-        "created_at": log2.created_at,
+        "log_id": log_id,
+        "created_at": created_at,
+        "served_by": turn["context"].get("served_by"),
     }
+    if turn["rule_outfits"] is not None:
+        out["rule_outfits"] = turn["rule_outfits"]
+    return out
+
+
+def chat_and_log(
+    *,
+    user,
+    session: ChatSession,
+    user_message: str,
+    weather: Dict[str, Any] | None,
+    profile: Dict[str, Any] | None,
+    model_name: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> dict:
+    """설정/히스토리 조회 → 트랜잭션 없이 모델 호출 → 짧은 트랜잭션으로 로그 저장
+
+    모델 호출은 요청 마감(deadline) 안에서만 재시도하고, 넘기면 룰/캐시 답변으로 대체한다.
+    """
+    deadline = deadline or Deadline()
+    turn = prepare_turn(
+        user=user,
+        session=session,
+        user_message=user_message,
+        weather=weather,
+        profile=profile,
+    )
+    model = model_name or turn["model"]
+    answer = turn["answer"]
+    if answer is None:
+        started = time.perf_counter()
+        try:
+            completion = llm.create(
+                client,
+                deadline=deadline,
+                model=model,
+                messages=turn["messages"],
+                temperature=0.8,
+                prompt_cache_key=PROMPT_VERSION,
+            )
+        except LLMUnavailable as e:
+            answer = _degrade(turn, e, started)
+        else:
+            answer = _llm_answer(turn, completion, started)
+
+    return save_turn(
+        user=user,
+        session=session,
+        turn=turn,
+        user_message=user_message,
+        answer=answer,
+        model_name=model,
+    )
+
+
+def stream_chat_and_log(
+    *,
+    user,
+    session: ChatSession,
+    user_message: str,
+    weather: Dict[str, Any] | None,
+    profile: Dict[str, Any] | None,
+    model_name: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> Iterator[Dict[str, Any]]:
+    """chat_and_log 의 스트리밍 버전
+
+    {"type": "delta", "text": ...} 를 토큰 단위로 내보내고, 스트림이 끝나면 로그를 저장한 뒤
+    {"type": "done", ...save_turn 결과} 를 마지막으로 내보낸다.
+    스트림을 열지 못하고 마감을 넘기면 대체 답변을 한 번에 내보내고, 토큰을 받다가 끊기면
+    받은 부분까지를 served_by=llm_partial 로 기록한다.
+    """
+    deadline = deadline or Deadline()
+    turn = prepare_turn(
+        user=user,
+        session=session,
+        user_message=user_message,
+        weather=weather,
+        profile=profile,
+    )
+    model = model_name or turn["model"]
+    answer = turn["answer"]
+    if answer is not None:
+        yield {"type": "delta", "text": answer}
+    else:
+        started = time.perf_counter()
+        stream = llm.stream(
+            client,
+            deadline=deadline,
+            model=model,
+            messages=turn["messages"],
+            temperature=0.8,
+            prompt_cache_key=PROMPT_VERSION,
+        )
+        parts: List[str] = []
+        stats: CallStats = {}
+        try:
+            for chunk in stream:
+                delta = _stream_delta(chunk, parts, stats, started)
+                if delta:
+                    yield {"type": "delta", "text": delta}
+        except LLMUnavailable as e:
+            if parts:
+                # 도중에 끊기면 이미 보낸 부분까지 기록 (캐시에는 저장하지 않음)
+                answer = _partial(turn, e, stats, started, parts)
+            else:
+                answer = _degrade(turn, e, started)
+                yield {"type": "delta", "text": answer}
+        else:
+            answer = _stream_done(turn, stats, started, parts)
+
+    result = save_turn(
+        user=user,
+        session=session,
+        turn=turn,
+        user_message=user_message,
+        answer=answer,
+        model_name=model,
+    )
+    yield {"type": "done", **result}
+
+
+async def achat_and_log(
+    *,
+    user,
+    session: ChatSession,
+    user_message: str,
+    weather: Dict[str, Any] | None,
+    profile: Dict[str, Any] | None,
+    setting: Optional[AiModelSettings] = _LOOKUP,
+    model_name: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> dict:
+    """chat_and_log 의 비동기 버전 (ORM 은 sync_to_async, 모델 호출은 AsyncOpenAI)"""
+    deadline = deadline or Deadline()
+    turn = await sync_to_async(prepare_turn)(
+        user=user,
+        session=session,
+        user_message=user_message,
+        weather=weather,
+        profile=profile,
+        setting=setting,
+    )
+    model = model_name or turn["model"]
+    answer = turn["answer"]
+    if answer is None:
+        started = time.perf_counter()
+        try:
+            completion = await llm.acreate(
+                aclient,
+                deadline=deadline,
+                model=model,
+                messages=turn["messages"],
+                temperature=0.8,
+                prompt_cache_key=PROMPT_VERSION,
+            )
+        except LLMUnavailable as e:
+            # 룰 답변이 설명 테이블을 읽을 수 있으므로 스레드에서
+            answer = await sync_to_async(_degrade)(turn, e, started)
+        else:
+            answer = _llm_answer(turn, completion, started)
+
+    return await sync_to_async(save_turn)(
+        user=user,
+        session=session,
+        turn=turn,
+        user_message=user_message,
+        answer=answer,
+        model_name=model,
+    )
+
+
+async def astream_chat_and_log(
+    *,
+    user,
+    session: ChatSession,
+    user_message: str,
+    weather: Dict[str, Any] | None,
+    profile: Dict[str, Any] | None,
+    model_name: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """stream_chat_and_log 의 비동기 버전 (ASGI 에서 토큰을 받는 즉시 내보냄)"""
+    deadline = deadline or Deadline()
+    turn = await sync_to_async(prepare_turn)(
+        user=user,
+        session=session,
+        user_message=user_message,
+        weather=weather,
+        profile=profile,
+    )
+    model = model_name or turn["model"]
+    answer = turn["answer"]
+    if answer is not None:
+        yield {"type": "delta", "text": answer}
+    else:
+        started = time.perf_counter()
+        parts: List[str] = []
+        stats: CallStats = {}
+        try:
+            async for chunk in llm.astream(
+                aclient,
+                deadline=deadline,
+                model=model,
+                messages=turn["messages"],
+                temperature=0.8,
+                prompt_cache_key=PROMPT_VERSION,
+            ):
+                delta = _stream_delta(chunk, parts, stats, started)
+                if delta:
+                    yield {"type": "delta", "text": delta}
+        except LLMUnavailable as e:
+            if parts:
+                answer = _partial(turn, e, stats, started, parts)
+            else:
+                answer = await sync_to_async(_degrade)(turn, e, started)
+                yield {"type": "delta", "text": answer}
+        else:
+            answer = _stream_done(turn, stats, started, parts)
+
+    result = await sync_to_async(save_turn)(
+        user=user,
+        session=session,
+        turn=turn,
+        user_message=user_message,
+        answer=answer,
+        model_name=model,
+    )
+    yield {"type": "done", **result}
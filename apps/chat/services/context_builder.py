@@ -0,0 +1,48 @@
+"""토큰 예산 안에서 프롬프트용 최근 대화 고르기
+
+토크나이저 없이 로컬에서 토큰 수를 어림한다. 한글 등 비ASCII 문자는 글자당 1토큰,
+ASCII 는 4글자당 1토큰으로 계산해 실제(gpt-4o)보다 약간 크게 잡는다.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from django.conf import settings
+
+Turn = Tuple[str, str]
+
+# 메시지 하나당 role/구분자 토큰
+MESSAGE_OVERHEAD = 4
+
+
+def history_budget() -> int:
+    return getattr(settings, "CHAT_HISTORY_TOKEN_BUDGET", 1200)
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return len(text) - ascii_chars + (ascii_chars + 3) // 4
+
+
+def message_tokens(text: str) -> int:
+    return estimate_tokens(text) + MESSAGE_OVERHEAD
+
+
+def fit_history(recent: Sequence[Turn], budget: int) -> Tuple[List[Turn], int]:
+    """최신순 대화에서 예산에 맞는 만큼 (오래된 순 목록, 사용 토큰)
+
+    중간 대화를 건너뛰지 않도록 처음으로 넘치는 대화에서 멈춘다.
+    """
+    picked: List[Turn] = []
+    used = 0
+    for q, a in recent:
+        cost = message_tokens(q) + message_tokens(a)
+        if used + cost > budget:
+            break
+        picked.append((q, a))
+        used += cost
+    picked.reverse()
+    return picked, used
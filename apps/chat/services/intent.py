@@ -1,6 +1,39 @@
-def detect_intent(text: str) -> str:
-    t = (text or "").lower()
-    keywords = [
+"""키워드 기반 의도 감지 엔진
+
+모든 의도의 키워드를 트라이 형태의 정규식 하나로 한 번만 컴파일하고, 메시지를 한 번
+훑어 걸린 의도를 모두 돌려준다. 키워드 집합은 기본값 + settings.CHAT_INTENT_KEYWORDS
++ ChatIntentKeyword(DB) 를 합친 것이며, DB 키워드가 바뀌면 model_picker 와 같은
+캐시 버전 방식으로 워커마다 다시 컴파일한다.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+
+OUTFIT_QUESTION = "outfit_question"  # 룰 코디 답변 대상 질문
+OUTFIT = "outfit"  # 날씨/코디 관련 대화
+
+DEFAULT_INTENT_KEYWORDS: Dict[str, List[str]] = {
+    OUTFIT_QUESTION: [
+        "뭐입지",
+        "뭐 입지",
+        "입을까",
+        "입어야",
+        "코디",
+        "옷 추천",
+        "코디 추천",
+        "패션 추천",
+        "뭐 입어",
+        "오늘 입을",
+        "오늘 옷",
+    ],
+    OUTFIT: [
         "날씨",
         "기온",
         "우산",
@@ -11,7 +44,130 @@ def detect_intent(text: str) -> str:
         "outer",
         "상의",
         "하의",
-    ]
-    if any(k in t for k in keywords):
+    ],
+}
+
+VERSION_KEY = "chat:intent_keywords_ver"
+VERSION_CHECK_INTERVAL = 5.0  # 초
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """단어 목록 → 공통 접두사를 묶은 정규식 (같은 위치에서는 가장 긴 단어 우선)"""
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        terminal = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if terminal:
+            # 더 긴 단어를 먼저 시도하고, 안 되면 여기서 끝난 단어로 매치
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class IntentEngine:
+    def __init__(self, keyword_sets: Mapping[str, Iterable[str]]):
+        kw_intents: Dict[str, Set[str]] = {}
+        for intent, words in keyword_sets.items():
+            for w in words:
+                w = (w or "").strip().lower()
+                if w:
+                    kw_intents.setdefault(w, set()).add(intent)
+
+        # 같은 위치에서는 가장 긴 키워드 하나만 잡히므로, 그 안에 포함된 짧은 키워드의
+        # 의도까지 미리 합쳐 둔다 (예: "옷 추천" → outfit_question + outfit)
+        self._intents: Dict[str, FrozenSet[str]] = {
+            kw: frozenset(
+                i for other, ints in kw_intents.items() if other in kw for i in ints
+            )
+            for kw in kw_intents
+        }
+        self.keyword_count = len(kw_intents)
+        self._regex: Optional[re.Pattern[str]] = (
+            re.compile(_trie_pattern(kw_intents)) if kw_intents else None
+        )
+
+    def match(self, text: str) -> Set[str]:
+        if self._regex is None or not text:
+            return set()
+        t = text.lower()
+        found: Set[str] = set()
+        search = self._regex.search
+        pos = 0
+        # 매치 다음 글자부터 다시 찾아 겹치는 키워드도 놓치지 않음
+        # (lookahead 로 감싸면 정규식의 첫 글자 건너뛰기 최적화가 꺼져 느려짐)
+        while (m := search(t, pos)) is not None:
+            found |= self._intents[m.group(0)]
+            pos = m.start() + 1
+        return found
+
+
+def load_keyword_sets() -> Dict[str, List[str]]:
+    from apps.chat.models import ChatIntentKeyword
+
+    sets = {k: list(v) for k, v in DEFAULT_INTENT_KEYWORDS.items()}
+    for intent, words in getattr(settings, "CHAT_INTENT_KEYWORDS", {}).items():
+        sets.setdefault(intent, []).extend(words)
+    for intent, kw in ChatIntentKeyword.objects.filter(active=True).values_list(
+        "intent", "keyword"
+    ):
+        sets.setdefault(intent, []).append(kw)
+    return sets
+
+
+class _Holder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.engine: Optional[IntentEngine] = None
+        self.version: Optional[int] = None
+        self.checked_at = 0.0
+
+
+_holder = _Holder()
+
+
+def get_engine() -> IntentEngine:
+    now = time.monotonic()
+    engine = _holder.engine
+    if engine is not None and now - _holder.checked_at < VERSION_CHECK_INTERVAL:
+        return engine
+
+    version = cache.get(VERSION_KEY) or 0
+    with _holder.lock:
+        if _holder.engine is None or _holder.version != version:
+            _holder.engine = IntentEngine(load_keyword_sets())
+            _holder.version = version
+        _holder.checked_at = now
+        return _holder.engine
+
+
+def invalidate_local() -> None:
+    with _holder.lock:
+        _holder.engine = None
+
+
+def invalidate() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+    invalidate_local()
+
+
+def match_intents(text: str) -> Set[str]:
+    return get_engine().match(text)
+
+
+def detect_intent(text: str) -> str:
+    if OUTFIT in match_intents(text):
         return "outfit"
     return "general"
@@ -0,0 +1,253 @@
+"""LLM 호출 공통 정책 (요청 마감 시간 + 재시도 + 동시 호출 제한)
+
+- 요청마다 Deadline 을 만들어 남은 시간만큼만 기다린다 (호출별 timeout 도 남은 시간).
+- 일시적 오류(타임아웃/연결/429/5xx)는 지터가 있는 지수 백오프로 재시도하되 마감을 넘기지 않는다.
+- 워커 프로세스 안에서 동시에 나가는 LLM 호출 수를 세마포어로 제한한다.
+
+마감 안에 답을 못 받으면 LLMUnavailable 을 던지고, 호출부(chat.py)가 룰/캐시 답변으로 대체한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, TypedDict
+
+import httpx
+import openai
+from django.conf import settings
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from tenacity.stop import stop_base
+
+RETRYABLE = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+# 스트림을 받는 도중의 오류 (openai 가 감싸지 않은 httpx 읽기 오류 포함)
+STREAM_ERRORS = (openai.APIError, httpx.HTTPError)
+# 남은 시간이 이보다 적으면 재시도하지 않음
+MIN_ATTEMPT_SECONDS = 0.5
+
+
+class CallStats(TypedDict, total=False):
+    """AiChatLogs 계측 컬럼 값"""
+
+    prompt_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    cached_tokens: Optional[int]
+    ttft_ms: Optional[int]
+    latency_ms: Optional[int]
+
+
+def usage_stats(usage: Any) -> CallStats:
+    """응답(또는 마지막 스트림 청크)의 usage → 토큰 수 (없으면 빈 dict)"""
+    if usage is None:
+        return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "cached_tokens": getattr(details, "cached_tokens", None),
+    }
+
+
+def elapsed_ms(start: float) -> int:
+    """time.perf_counter() 기준 경과 ms"""
+    return int((time.perf_counter() - start) * 1000)
+
+
+class LLMUnavailable(Exception):
+    """마감 초과, 동시 호출 대기 초과, 재시도 소진"""
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float] = None):
+        if seconds is None:
+            seconds = getattr(settings, "CHAT_LLM_DEADLINE_SECONDS", 20.0)
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def _max_concurrency() -> int:
+    return getattr(settings, "CHAT_LLM_MAX_CONCURRENCY", 8)
+
+
+_sync_slots = threading.BoundedSemaphore(_max_concurrency())
+# asyncio.Semaphore 는 이벤트 루프에 묶이므로 루프별로 하나씩
+_async_slots: "dict[int, asyncio.Semaphore]" = {}
+
+
+def _async_slot() -> asyncio.Semaphore:
+    loop_id = id(asyncio.get_running_loop())
+    sem = _async_slots.get(loop_id)
+    if sem is None:
+        sem = _async_slots[loop_id] = asyncio.Semaphore(_max_concurrency())
+    return sem
+
+
+class stop_at_deadline(stop_base):
+    """마감까지 남은 시간이 한 번 더 시도하기에 부족하면 중단"""
+
+    def __init__(self, deadline: Deadline):
+        self.deadline = deadline
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        return self.deadline.remaining() < MIN_ATTEMPT_SECONDS
+
+
+def _policy(deadline: Deadline) -> dict:
+    return {
+        "stop": stop_after_attempt(getattr(settings, "CHAT_LLM_MAX_ATTEMPTS", 3))
+        | stop_at_deadline(deadline),
+        "wait": wait_random_exponential(multiplier=0.2, max=2),
+        "retry": retry_if_exception_type(RETRYABLE),
+        "reraise": True,
+        # 대기 시간도 마감 안에서만
+        "sleep": lambda s: time.sleep(min(s, deadline.remaining())),
+    }
+
+
+def _create(client, deadline: Deadline, kwargs: dict) -> Any:
+    try:
+        for attempt in Retrying(**_policy(deadline)):
+            with attempt:
+                if deadline.expired:
+                    raise LLMUnavailable("deadline_exceeded")
+                return client.chat.completions.create(
+                    timeout=deadline.remaining(), **kwargs
+                )
+    except RETRYABLE as e:
+        raise LLMUnavailable(type(e).__name__) from e
+    raise LLMUnavailable("deadline_exceeded")  # pragma: no cover
+
+
+def create(client, *, deadline: Deadline, **kwargs: Any) -> Any:
+    """client.chat.completions.create (마감/재시도/동시 호출 제한 적용)"""
+    if not _sync_slots.acquire(timeout=deadline.remaining()):
+        raise LLMUnavailable("llm_busy")
+    try:
+        return _create(client, deadline, kwargs)
+    finally:
+        _sync_slots.release()
+
+
+def _close(chunks: Any) -> None:
+    close = getattr(chunks, "close", None)
+    if close is not None:
+        close()
+
+
+def stream(client, *, deadline: Deadline, **kwargs: Any) -> Iterator[Any]:
+    """stream=True 호출의 청크 (스트림이 끝날 때까지 동시 호출 슬롯 유지)
+
+    재시도는 스트림을 여는 호출까지만 (토큰을 받기 시작한 뒤에는 재시도하지 않음).
+    timeout 은 읽기 한 번의 제한이라, 청크 사이마다 마감을 확인해 전체 시간을 지킨다.
+    청크를 받는 중의 오류/마감 초과도 LLMUnavailable (호출부가 받은 부분까지 기록).
+    """
+    if not _sync_slots.acquire(timeout=deadline.remaining()):
+        raise LLMUnavailable("llm_busy")
+    try:
+        # 마지막 청크에 usage 를 받아 토큰 수 기록
+        chunks = _create(
+            client,
+            deadline,
+            {**kwargs, "stream": True, "stream_options": {"include_usage": True}},
+        )
+        try:
+            for chunk in chunks:
+                yield chunk
+                if deadline.expired:
+                    raise LLMUnavailable("deadline_exceeded")
+        except STREAM_ERRORS as e:
+            raise LLMUnavailable(type(e).__name__) from e
+        finally:
+            _close(chunks)
+    finally:
+        _sync_slots.release()
+
+
+async def _acreate(aclient, deadline: Deadline, kwargs: dict) -> Any:
+    policy = _policy(deadline)
+    policy["sleep"] = lambda s: asyncio.sleep(min(s, deadline.remaining()))
+    try:
+        async for attempt in AsyncRetrying(**policy):
+            with attempt:
+                if deadline.expired:
+                    raise LLMUnavailable("deadline_exceeded")
+                return await aclient.chat.completions.create(
+                    timeout=deadline.remaining(), **kwargs
+                )
+    except RETRYABLE as e:
+        raise LLMUnavailable(type(e).__name__) from e
+    raise LLMUnavailable("deadline_exceeded")  # pragma: no cover
+
+
+async def _acquire_async(deadline: Deadline) -> asyncio.Semaphore:
+    slot = _async_slot()
+    try:
+        await asyncio.wait_for(slot.acquire(), timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        raise LLMUnavailable("llm_busy")
+    return slot
+
+
+async def acreate(aclient, *, deadline: Deadline, **kwargs: Any) -> Any:
+    """create 의 비동기 버전"""
+    slot = await _acquire_async(deadline)
+    try:
+        return await _acreate(aclient, deadline, kwargs)
+    finally:
+        slot.release()
+
+
+async def _aclose(chunks: Any) -> None:
+    close = getattr(chunks, "close", None) or getattr(chunks, "aclose", None)
+    if close is not None:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+
+async def astream(aclient, *, deadline: Deadline, **kwargs: Any) -> AsyncIterator[Any]:
+    """stream 의 비동기 버전 (다음 청크를 기다리는 시간도 남은 마감 안에서만)"""
+    slot = await _acquire_async(deadline)
+    try:
+        chunks = await _acreate(
+            aclient,
+            deadline,
+            {**kwargs, "stream": True, "stream_options": {"include_usage": True}},
+        )
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        chunks.__anext__(), timeout=deadline.remaining()
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise LLMUnavailable("deadline_exceeded")
+                yield chunk
+        except STREAM_ERRORS as e:
+            raise LLMUnavailable(type(e).__name__) from e
+        finally:
+            await _aclose(chunks)
+    finally:
+        slot.release()
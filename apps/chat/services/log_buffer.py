@@ -0,0 +1,320 @@
+"""대화 로그 지연 저장 (write-behind)
+
+settings.CHAT_LOG_WRITE_BEHIND 가 켜져 있으면 save_turn 은 AiChatLogs INSERT 대신
+로그를 버퍼에 넣고 바로 응답한다. 플러셔가 버퍼를 배치 단위로 bulk_create 하고,
+세션별 last_activity_at 도 함께 갱신한다.
+
+- Redis(django-redis): 공유 리스트(RPUSH)에 쌓고 ``flush_chat_logs`` 명령이 비운다.
+- 그 외(locmem 등): 프로세스 로컬 큐에 쌓고 워커 안의 데몬 스레드가 비운다.
+
+항목마다 buffer_key 를 붙여 두어, 잠금이 만료된 뒤 다른 플러셔가 같은 항목을 다시 저장해도
+이미 들어간 행은 건너뛴다.
+
+플러시 전 최근 대화는 recent_turns 링 버퍼에서 읽히므로 프롬프트 히스토리는 끊기지 않는다.
+(세션 타임라인/로그 API 는 DB 기준이라 플러시 지연만큼 늦게 보인다.)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple, TypedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DataError, IntegrityError, connection, transaction
+from django.forms.models import model_to_dict
+
+from apps.chat.models import AiChatLogs, ChatSession
+from apps.core.cache import redis_client
+from apps.core.db import timed_atomic
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = "chat:log_buffer"
+FLUSH_LOCK_KEY = "chat:log_buffer:flush"
+FLUSH_BATCH = 500
+FLUSH_INTERVAL = 1.0  # 초 (로컬 큐 플러셔 주기)
+FLUSH_LOCK_SECONDS = 30
+# 특정 행 때문에 나는 오류 (그 행만 버림)
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class BufferStats(TypedDict):
+    mode: str
+    pending: int
+    lag_seconds: float  # 가장 오래 기다린 로그의 대기 시간
+    flushed: int  # 이 프로세스가 저장한 로그 수
+    dead_lettered: int  # 저장할 수 없어 버린 로그 수
+    last_flush_at: Optional[float]
+
+
+def enabled() -> bool:
+    return getattr(settings, "CHAT_LOG_WRITE_BEHIND", False)
+
+
+class _Local:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue: Deque[str] = deque()
+        self.thread: Optional[threading.Thread] = None
+        self.flushed = 0
+        self.dead_lettered = 0
+        self.last_flush_at: Optional[float] = None
+
+
+_local = _Local()
+
+
+def _encode(fields: Dict[str, Any], created_at: datetime) -> str:
+    return json.dumps(
+        {**fields, "created_at": created_at.isoformat(), "enqueued_at": time.time()},
+        ensure_ascii=False,
+    )
+
+
+def enqueue(
+    *,
+    user_id: Optional[int],
+    session_id: int,
+    model_setting_id: Optional[int],
+    model_name: str,
+    user_question: str,
+    ai_answer: str,
+    context: Dict[str, Any],
+    created_at: datetime,
+    telemetry: Dict[str, Any] | None = None,
+) -> bool:
+    """버퍼에 넣었으면 True, 버퍼(Redis) 오류면 False"""
+    item = _encode(
+        {
+            **(telemetry or {}),
+            "user_id": user_id,
+            "session_id": session_id,
+            "model_setting_id": model_setting_id,
+            "model_name": model_name,
+            "user_question": user_question,
+            "ai_answer": ai_answer,
+            "context": context,
+            "buffer_key": uuid.uuid4().hex,
+        },
+        created_at,
+    )
+    r = redis_client()
+    if r is not None:
+        try:
+            r.rpush(cache.make_key(BUFFER_KEY), item)
+        except Exception:
+            # 버퍼에 못 넣으면 호출부가 바로 INSERT (답변은 이미 나갔으므로 요청은 살림)
+            logger.warning("chat log buffer unavailable", exc_info=True)
+            return False
+        return True
+    with _local.lock:
+        _local.queue.append(item)
+    _ensure_local_flusher()
+    return True
+
+
+def _dead_letter(reason: str, item: Any) -> None:
+    """저장할 수 없는 항목은 기록만 남기고 버림 (버퍼 전체가 막히지 않도록)"""
+    with _local.lock:
+        _local.dead_lettered += 1
+    logger.error("dropping chat log (%s): %r", reason, str(item)[:500])
+
+
+def _decode(raw: str) -> Optional[AiChatLogs]:
+    try:
+        row = json.loads(raw)
+        row.pop("enqueued_at", None)
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+        return AiChatLogs(**row)
+    except (ValueError, TypeError, KeyError):
+        _dead_letter("malformed", raw)
+        return None
+
+
+def _insert(logs: List[AiChatLogs]) -> List[AiChatLogs]:
+    """bulk_create, 특정 행 때문에 실패하면(FK/데이터 오류) 한 건씩 넣고 실패한 행만 버림
+
+    이미 저장된 buffer_key 는 건너뛴다 (잠금 만료 후 다른 플러셔가 같은 배치를 다시 읽은 경우).
+    연결 오류 등 그 밖의 DB 오류는 그대로 올려 배치 전체를 다음 주기에 재시도한다.
+    """
+    keys = [log.buffer_key for log in logs if log.buffer_key]
+    if keys:
+        done = set(
+            AiChatLogs.objects.filter(buffer_key__in=keys).values_list(
+                "buffer_key", flat=True
+            )
+        )
+        logs = [log for log in logs if log.buffer_key not in done]
+    if not logs:
+        return logs
+    try:
+        with transaction.atomic():
+            AiChatLogs.objects.bulk_create(logs, batch_size=FLUSH_BATCH)
+        return logs
+    except ROW_ERRORS:
+        logger.warning(
+            "bulk insert of %d chat logs failed, retrying one by one", len(logs)
+        )
+
+    saved: List[AiChatLogs] = []
+    for log in logs:
+        try:
+            with transaction.atomic():
+                log.save(force_insert=True)
+        except ROW_ERRORS as e:
+            if log.buffer_key and _already_saved(log.buffer_key):
+                continue  # 동시에 돈 다른 플러셔가 저장
+            _dead_letter(type(e).__name__, model_to_dict(log))
+        else:
+            saved.append(log)
+    return saved
+
+
+def _already_saved(buffer_key: str) -> bool:
+    return AiChatLogs.objects.filter(buffer_key=buffer_key).exists()
+
+
+def _write(items: List[str]) -> int:
+    """버퍼 항목 → bulk_create + 세션 last_activity_at 갱신 (한 트랜잭션). 저장한 개수 반환"""
+    logs = [log for log in map(_decode, items) if log is not None]
+    if not logs:
+        return 0
+
+    with timed_atomic("chat.flush_logs"):
+        logs = _insert(logs)
+        last_at: Dict[int, datetime] = {}
+        for log in logs:
+            if log.session_id is not None:
+                prev = last_at.get(log.session_id)
+                last_at[log.session_id] = (
+                    max(prev, log.created_at) if prev else log.created_at
+                )
+        for sid, at in last_at.items():
+            ChatSession.objects.filter(id=sid).exclude(last_activity_at__gt=at).update(
+                last_activity_at=at
+            )
+    return len(logs)
+
+
+Flushed = Tuple[int, int]  # (버퍼에서 꺼낸 개수, 저장한 개수)
+
+
+def _flush_redis(r, batch: int) -> Flushed:
+    # 플러셔가 여러 개 떠도 같은 항목을 두 번 저장하지 않도록 잠금
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=FLUSH_LOCK_SECONDS):
+        return 0, 0
+    key = cache.make_key(BUFFER_KEY)
+    try:
+        items = [
+            x.decode() if isinstance(x, bytes) else x
+            for x in r.lrange(key, 0, batch - 1)
+        ]
+        if not items:
+            return 0, 0
+        n = _write(items)
+        # 저장(또는 dead letter)한 뒤에만 버퍼에서 제거 (DB 오류면 다음 주기에 재시도)
+        r.ltrim(key, len(items), -1)
+        return len(items), n
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _flush_local(batch: int) -> Flushed:
+    with _local.lock:
+        items = [_local.queue.popleft() for _ in range(min(batch, len(_local.queue)))]
+    if not items:
+        return 0, 0
+    try:
+        return len(items), _write(items)
+    except Exception:
+        with _local.lock:
+            _local.queue.extendleft(reversed(items))
+        raise
+
+
+def _flush(batch: int) -> Flushed:
+    r = redis_client()
+    taken, n = _flush_redis(r, batch) if r is not None else _flush_local(batch)
+    if n:
+        with _local.lock:
+            _local.flushed += n
+            _local.last_flush_at = time.time()
+    return taken, n
+
+
+def flush(batch: int = FLUSH_BATCH) -> int:
+    """버퍼에서 최대 batch 개를 저장하고 저장한 개수 반환"""
+    return _flush(batch)[1]
+
+
+def flush_all(batch: int = FLUSH_BATCH) -> int:
+    total = 0
+    # 한 배치가 전부 버려져도(저장 0건) 남은 항목은 계속 비움
+    while True:
+        taken, n = _flush(batch)
+        if not taken:
+            return total
+        total += n
+
+
+def _oldest_enqueued_at(item: Optional[str | bytes]) -> Optional[float]:
+    if item is None:
+        return None
+    try:
+        return json.loads(item)["enqueued_at"]
+    except (ValueError, KeyError):
+        return None
+
+
+def stats() -> BufferStats:
+    r = redis_client()
+    if r is not None:
+        key = cache.make_key(BUFFER_KEY)
+        pending = r.llen(key)
+        oldest = _oldest_enqueued_at(r.lindex(key, 0))
+        mode = "redis"
+    else:
+        with _local.lock:
+            pending = len(_local.queue)
+            oldest = _oldest_enqueued_at(_local.queue[0] if pending else None)
+        mode = "local"
+    return {
+        "mode": mode,
+        "pending": pending,
+        "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+        "flushed": _local.flushed,
+        "dead_lettered": _local.dead_lettered,
+        "last_flush_at": _local.last_flush_at,
+    }
+
+
+def _local_flusher() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush_all()
+        except Exception:
+            logger.exception("chat log flush failed")
+        finally:
+            connection.close()  # 스레드 전용 DB 연결 정리
+
+
+def _ensure_local_flusher() -> None:
+    if _local.thread is not None:
+        return
+    with _local.lock:
+        if _local.thread is None:
+            _local.thread = threading.Thread(
+                target=_local_flusher, name="chat-log-flusher", daemon=True
+            )
+            _local.thread.start()
+            # 워커 종료 시 남은 로그 저장
+            atexit.register(flush_all)
@@ -1,28 +1,165 @@
-from typing import Optional
+"""AiModelSettings 조회 (프로세스 로컬 구간 인덱스) + 메시지별 LLM 모델 라우팅
 
-from django.db.models import F, Q
+설정 테이블은 작고 거의 바뀌지 않으므로 활성 설정을 한 번 읽어 온도 구간별 후보 목록을
+만들어 두고 메모리에서 찾는다. 후보는 SQL 과 같은 (temp_span, humidity_span, id) 순서라
+조건에 맞는 첫 후보가 기존 쿼리의 .first() 와 같다.
+설정이 저장/삭제되면 signals 에서 버전을 올리고, 다른 워커는 VERSION_CHECK_INTERVAL
+안에 버전 변경을 보고 다시 만든다.
+
+route_model 은 짧거나 단순한 일상 대화는 작은 모델로, 코디 관련/복잡한 질문은 큰 모델로
+보낸다. 기준은 settings.CHAT_MODEL_ROUTING 으로 덮어쓸 수 있다.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Collection, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
 
 from apps.chat.models import AiModelSettings
 
+VERSION_KEY = "chat:model_settings_ver"
+VERSION_CHECK_INTERVAL = 5.0  # 초
+
+DEFAULT_ROUTING: Dict[str, Any] = {
+    "large_model": "gpt-4o",
+    "small_model": "gpt-4o-mini",
+    # 이 길이(글자) 이상이면 복잡한 질문으로 보고 큰 모델
+    "complex_min_chars": 200,
+    # 이런 표현이 있으면 길이와 상관없이 큰 모델
+    "complex_markers": ["비교", "분석", "정리", "요약", "이유", "왜", "계획"],
+    # 이 의도가 걸리면 큰 모델 (intent.OUTFIT)
+    "large_intents": ["outfit"],
+    # 이전 대화가 이만큼 쌓였으면 맥락 유지를 위해 큰 모델
+    "large_min_history_turns": 6,
+}
+
+
+class SettingsIndex:
+    def __init__(self, settings: List[AiModelSettings]):
+        rows = sorted(
+            settings,
+            key=lambda s: (
+                s.temperature_max - s.temperature_min,
+                s.humidity_max - s.humidity_min,
+                s.id,
+            ),
+        )
+        points = sorted(
+            {p for s in rows for p in (s.temperature_min, s.temperature_max)}
+        )
+        self._points = points
+        # 슬롯 2i = 경계점 points[i], 2i+1 = (points[i], points[i+1]) 열린 구간
+        self._slots: List[List[AiModelSettings]] = []
+        for i, p in enumerate(points):
+            self._slots.append(
+                [s for s in rows if s.temperature_min <= p <= s.temperature_max]
+            )
+            if i + 1 < len(points):
+                nxt = points[i + 1]
+                self._slots.append(
+                    [
+                        s
+                        for s in rows
+                        if s.temperature_min <= p and nxt <= s.temperature_max
+                    ]
+                )
+
+    def _slot(self, temp_c: float) -> List[AiModelSettings]:
+        i = bisect_left(self._points, temp_c)
+        if i < len(self._points) and self._points[i] == temp_c:
+            return self._slots[2 * i]
+        if i == 0 or i == len(self._points):
+            return []
+        return self._slots[2 * (i - 1) + 1]
+
+    def pick(
+        self, temp_c: float, humidity: int | None, condition: str | None
+    ) -> Optional[AiModelSettings]:
+        for s in self._slot(temp_c):
+            if humidity is not None and not (
+                s.humidity_min <= humidity <= s.humidity_max
+            ):
+                continue
+            if s.weather_condition and s.weather_condition != condition:
+                continue
+            return s
+        return None
+
+
+class _Holder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index: Optional[SettingsIndex] = None
+        self.version: Optional[int] = None
+        self.checked_at = 0.0
+
+
+_holder = _Holder()
+
+
+def get_index() -> SettingsIndex:
+    now = time.monotonic()
+    index = _holder.index
+    if index is not None and now - _holder.checked_at < VERSION_CHECK_INTERVAL:
+        return index
+
+    version = cache.get(VERSION_KEY) or 0
+    with _holder.lock:
+        if _holder.index is None or _holder.version != version:
+            _holder.index = SettingsIndex(
+                list(AiModelSettings.objects.filter(active=True))
+            )
+            _holder.version = version
+        _holder.checked_at = now
+        return _holder.index
+
+
+def invalidate_local() -> None:
+    with _holder.lock:
+        _holder.index = None
+
+
+def invalidate() -> None:
+    """이 프로세스 인덱스를 버리고 다른 워커도 다시 만들도록 버전 증가"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+    invalidate_local()
+
 
 def pick_model_setting(
     temp_c: float, humidity: int | None, condition: str | None
 ) -> Optional[AiModelSettings]:
-    qs = AiModelSettings.objects.filter(
-        active=True,
-        temperature_min__lte=temp_c,
-        temperature_max__gte=temp_c,
-    )
-    if humidity is not None:
-        qs = qs.filter(humidity_min__lte=humidity, humidity_max__gte=humidity)
-    if condition:
-        qs = qs.filter(Q(weather_condition="") | Q(weather_condition=condition))
-    else:
-        qs = qs.filter(Q(weather_condition=""))
-
-    qs = qs.annotate(
-        temp_span=F("temperature_max") - F("temperature_min"),
-        humidity_span=F("humidity_max") - F("humidity_min"),
-    ).order_by("temp_span", "humidity_span", "id")
-
-    return qs.first()
+    return get_index().pick(temp_c, humidity, condition)
+
+
+class Route(NamedTuple):
+    model: str
+    reason: str
+
+
+def routing_rules() -> Dict[str, Any]:
+    return {**DEFAULT_ROUTING, **getattr(settings, "CHAT_MODEL_ROUTING", {})}
+
+
+def route_model(
+    message: str, intents: Collection[str], *, history_turns: int = 0
+) -> Route:
+    """메시지 → (모델, 사유). 사유는 로그 context.route 에 남겨 기준 조정에 사용"""
+    rules = routing_rules()
+    text = (message or "").strip()
+    if len(text) >= rules["complex_min_chars"]:
+        return Route(rules["large_model"], "long")
+    if any(m in text for m in rules["complex_markers"]):
+        return Route(rules["large_model"], "complex")
+    if any(i in intents for i in rules["large_intents"]):
+        return Route(rules["large_model"], "outfit")
+    if history_turns >= rules["large_min_history_turns"]:
+        return Route(rules["large_model"], "long_history")
+    return Route(rules["small_model"], "simple")
@@ -0,0 +1,85 @@
+"""세션별 최근 대화 링 버퍼
+
+GPT 프롬프트에 넣는 최근 (질문, 답변) 쌍을 세션마다 최신순 리스트로 캐시에 둔다.
+Redis(django-redis) 에서는 LPUSH + LTRIM 으로 길이를 HISTORY_TURNS 로 유지하고,
+그 외 캐시 백엔드(locmem 등)에서는 같은 모양의 리스트를 통째로 저장한다.
+버퍼가 없으면(만료/유실) DB 에서 읽은 뒤 다음 저장 때 다시 채운다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import List, Optional, Tuple
+
+from django.core.cache import caches
+
+from apps.core.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+RECENT_PREFIX = "chat:recent"
+HISTORY_TURNS = 8  # 프롬프트 후보 (실제 포함 개수는 토큰 예산으로 결정)
+RING_TTL = 60 * 60 * 24  # 하루 동안 대화가 없으면 버퍼 만료
+
+Turn = Tuple[str, str]
+
+
+def _key(session_id: int) -> str:
+    return f"{RECENT_PREFIX}:{session_id}"
+
+
+def get_recent(session_id: int) -> Optional[List[Turn]]:
+    """최신순 최근 대화. 버퍼가 없거나 캐시 오류면 None (DB 로 대체)"""
+    cache = caches["default"]
+    try:
+        r = redis_client()
+        if r is None:
+            turns = cache.get(_key(session_id))
+            return [(q, a) for q, a in turns] if turns is not None else None
+        raw = r.lrange(cache.make_key(_key(session_id)), 0, HISTORY_TURNS - 1)
+    except Exception:
+        logger.warning("recent turns read failed", exc_info=True)
+        return None
+    if not raw:
+        return None
+    return [(q, a) for q, a in map(json.loads, raw)]
+
+
+def push_turn(
+    session_id: int,
+    question: str,
+    answer: str,
+    *,
+    seed: Optional[List[Turn]] = None,
+) -> None:
+    """새 대화를 버퍼 앞에 추가
+
+    seed 는 이번 요청에서 DB 로 읽은 이전 대화(최신순). 주어지면 버퍼를 그것으로 새로 만들고,
+    없으면 버퍼가 이미 있을 때만 추가한다 (없는 버퍼에 한 건만 넣으면 이전 대화가 빠짐).
+    """
+    cache = caches["default"]
+    new: Turn = (question, answer)
+    try:
+        r = redis_client()
+        if r is None:
+            key = _key(session_id)
+            base = seed if seed is not None else cache.get(key)
+            if base is not None:
+                turns = [new, *base][:HISTORY_TURNS]
+                cache.set(key, [list(t) for t in turns], timeout=RING_TTL)
+            return
+
+        key = cache.make_key(_key(session_id))
+        pipe = r.pipeline(transaction=True)
+        item = json.dumps(new, ensure_ascii=False)
+        if seed is not None:
+            pipe.delete(key)
+            pipe.rpush(key, item, *(json.dumps(t, ensure_ascii=False) for t in seed))
+        else:
+            pipe.lpushx(key, item)
+        pipe.ltrim(key, 0, HISTORY_TURNS - 1)
+        pipe.expire(key, RING_TTL)
+        pipe.execute()
+    except Exception:
+        logger.warning("recent turns write failed", exc_info=True)
@@ -0,0 +1,85 @@
+"""룰 기반 코디 답변 테이블
+
+코디 질문의 룰 답변은 (날씨 상태 규칙 또는 온도 구간) 만으로 정해지므로 import 시 모든
+조합의 답변 텍스트를 미리 만들어 둔다. 요청마다 남는 일은 구간 탐색(bisect)과 설명의
+{temp} 치환뿐이다. 배치 생성 설명(outfit_explanations)이 있으면 설명만 그것으로 바꾼다.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from apps.recommend.services.outfit_explanations import Audience
+from apps.recommend.services.recommend_service import (
+    CONDITION_RULES,
+    TEMPERATURE_BAND_RULES,
+    generated_explanation,
+    temperature_band,
+)
+
+RuleKey = Tuple[str, object]
+
+RULE_HEADER = "[RULE] 온도 기반 하드코딩 코디 추천"
+# 설명이 배치 생성(outfit_explanations) 문장일 때
+GENERATED_HEADER = "[RULE] 온도 기반 코디 추천 (맞춤 설명)"
+
+
+def format_rule_answer(fb: Dict[str, str], *, generated: bool = False) -> str:
+    rec1 = fb.get("rec_1") or ""
+    rec2 = fb.get("rec_2") or ""
+    rec3 = fb.get("rec_3") or ""
+    explanation = fb.get("explanation") or ""
+
+    answer_lines: List[str] = []
+    answer_lines.append(GENERATED_HEADER if generated else RULE_HEADER)
+    if explanation:
+        answer_lines.append(explanation)
+
+    answer_lines.append("")
+    answer_lines.append("오늘의 추천 코디:")
+    if rec1:
+        answer_lines.append(f"1) {rec1}")
+    if rec2:
+        answer_lines.append(f"2) {rec2}")
+    if rec3:
+        answer_lines.append(f"3) {rec3}")
+
+    return "\n".join(answer_lines).strip()
+
+
+def _entry(recs: Tuple[str, str, str], explanation: str) -> Tuple[str, Dict[str, str]]:
+    fb = {"rec_1": recs[0], "rec_2": recs[1], "rec_3": recs[2]}
+    fb["explanation"] = explanation
+    return format_rule_answer(fb), fb
+
+
+# key → (답변 템플릿, rule_outfits 템플릿). 온도 구간 설명만 {temp} 를 포함
+ANSWER_TABLE: Dict[RuleKey, Tuple[str, Dict[str, str]]] = {
+    **{("cond", c): _entry(*rule) for c, rule in CONDITION_RULES.items()},
+    **{("band", i): _entry(*rule) for i, rule in enumerate(TEMPERATURE_BAND_RULES)},
+}
+
+
+def rule_key(temp: float, cond: Optional[str]) -> RuleKey:
+    c = (cond or "").lower()
+    if c in CONDITION_RULES:
+        return ("cond", c)
+    return ("band", temperature_band(temp))
+
+
+def rule_answer(
+    temp: float, cond: Optional[str], audience: Audience | None = None
+) -> Tuple[str, Dict[str, str]]:
+    """(답변 텍스트, rule_outfits) — build_outfit_by_temp_and_cond + 텍스트 조립과 동일"""
+    key = rule_key(temp, cond)
+    answer, fb = ANSWER_TABLE[key]
+    explanation = generated_explanation(temp, cond, audience)
+    if explanation is not None:
+        fb = {**fb, "explanation": explanation}
+        return format_rule_answer(fb, generated=True), fb
+    if key[0] == "cond":
+        return answer, dict(fb)
+    return answer.format(temp=temp), {
+        **fb,
+        "explanation": fb["explanation"].format(temp=temp),
+    }
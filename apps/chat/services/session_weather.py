@@ -0,0 +1,214 @@
+"""세션 단위 날씨 스냅샷
+
+클라이언트가 weather 를 보내지 않으면 메시지마다 OpenWeather 를 부르던 것을, 세션에 붙인
+스냅샷으로 대신한다. 같은 위치(weather_key)의 스냅샷이
+- FRESH 이내면 그대로 사용,
+- MAX_AGE 이내면 그대로 쓰고 백그라운드에서 새로 받아 둠,
+- 그보다 오래됐거나 없으면 그 자리에서 받아 저장.
+스냅샷은 ChatSession 컬럼에 저장하고 캐시에도 두어 보통은 DB 조회 없이 읽는다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Dict, NamedTuple, Optional, TypedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from apps.chat.models import ChatSession
+from apps.chat.services.weather_for_chat import (
+    aget_weather_for_chat,
+    get_user_base_location,
+    get_weather_for_chat,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "chat:session_weather"
+REFRESH_LOCK_SECONDS = 60
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-weather")
+
+
+class Place(NamedTuple):
+    """요청이 지정한 위치 (좌표가 없으면 사용자 기본 위치)"""
+
+    lat: float | None = None
+    lon: float | None = None
+    city: str | None = None
+    district: str | None = None
+
+    @property
+    def has_coords(self) -> bool:
+        return self.lat is not None and self.lon is not None
+
+
+class Snapshot(TypedDict):
+    key: str
+    weather: Optional[Dict[str, Any]]
+    fetched_at: datetime
+
+
+def fresh_seconds() -> int:
+    return getattr(settings, "CHAT_WEATHER_FRESH_SECONDS", 600)
+
+
+def max_age_seconds() -> int:
+    return getattr(settings, "CHAT_WEATHER_MAX_AGE_SECONDS", 3600)
+
+
+def location_key(place: Place, user=None) -> str:
+    """좌표는 약 1km 격자 + 지명, 좌표가 없으면 해석된 기본 위치 id (weather_key 64자 이내)"""
+    if place.has_coords:
+        key = f"{place.lat:.2f},{place.lon:.2f}"
+        name = " ".join(p for p in [place.city, place.district] if p)
+        if name:
+            key += ":" + hashlib.md5(name.encode()).hexdigest()[:12]
+        return key
+    loc = get_user_base_location(user)
+    return f"base:{loc.id}" if loc is not None else "base"
+
+
+def _fetch(place: Place, user) -> Optional[Dict[str, Any]]:
+    return get_weather_for_chat(
+        user=user,
+        lat=place.lat,
+        lon=place.lon,
+        city=place.city,
+        district=place.district,
+    )
+
+
+async def _afetch(place: Place, user) -> Optional[Dict[str, Any]]:
+    return await aget_weather_for_chat(
+        user=user,
+        lat=place.lat,
+        lon=place.lon,
+        city=place.city,
+        district=place.district,
+    )
+
+
+def _cache_key(session_id: int) -> str:
+    return f"{SNAPSHOT_PREFIX}:{session_id}"
+
+
+def load_snapshot(session_id: int) -> Optional[Snapshot]:
+    snap: Optional[Snapshot] = cache.get(_cache_key(session_id))
+    if snap is not None:
+        return snap
+    row = (
+        ChatSession.objects.filter(id=session_id)
+        .values("weather_key", "weather_snapshot", "weather_fetched_at")
+        .first()
+    )
+    if row is None or row["weather_fetched_at"] is None:
+        return None
+    snap = Snapshot(
+        key=row["weather_key"],
+        weather=row["weather_snapshot"],
+        fetched_at=row["weather_fetched_at"],
+    )
+    cache.set(_cache_key(session_id), snap, timeout=max_age_seconds())
+    return snap
+
+
+def store_snapshot(
+    session_id: int, key: str, weather: Optional[Dict[str, Any]]
+) -> None:
+    now = timezone.now()
+    ChatSession.objects.filter(id=session_id).update(
+        weather_snapshot=weather, weather_key=key, weather_fetched_at=now
+    )
+    snap: Snapshot = {"key": key, "weather": weather, "fetched_at": now}
+    cache.set(_cache_key(session_id), snap, timeout=max_age_seconds())
+
+
+def _age(snap: Snapshot) -> float:
+    return (timezone.now() - snap["fetched_at"]).total_seconds()
+
+
+def _refresh(session_id: int, key: str, user, place: Place) -> None:
+    try:
+        store_snapshot(session_id, key, _fetch(place, user))
+    except Exception:
+        logger.exception("session weather refresh failed (session=%s)", session_id)
+    finally:
+        cache.delete(f"{_cache_key(session_id)}:lock")
+        connection.close()  # 스레드 전용 DB 연결 정리
+
+
+def _schedule_refresh(session_id: int, key: str, user, place: Place) -> None:
+    if cache.add(f"{_cache_key(session_id)}:lock", 1, timeout=REFRESH_LOCK_SECONDS):
+        _executor.submit(_refresh, session_id, key, user, place)
+
+
+def _usable(snap: Optional[Snapshot], key: str) -> Optional[Snapshot]:
+    if snap is None or snap["key"] != key or _age(snap) >= max_age_seconds():
+        return None
+    return snap
+
+
+def session_weather(
+    session: ChatSession,
+    user=None,
+    *,
+    lat: float | None = None,
+    lon: float | None = None,
+    city: str | None = None,
+    district: str | None = None,
+) -> Optional[Dict[str, Any]]:
+    """세션 스냅샷 재사용, 필요할 때만 get_weather_for_chat 호출"""
+    place = Place(lat, lon, city, district)
+    key = location_key(place, user)
+    snap = _usable(load_snapshot(session.id), key)
+    if snap is not None:
+        if _age(snap) >= fresh_seconds():
+            _schedule_refresh(session.id, key, user, place)
+        return snap["weather"]
+
+    weather = _fetch(place, user)
+    store_snapshot(session.id, key, weather)
+    return weather
+
+
+async def asession_weather(
+    session_id: Optional[int],
+    session: Awaitable[ChatSession],
+    user=None,
+    *,
+    lat: float | None = None,
+    lon: float | None = None,
+    city: str | None = None,
+    district: str | None = None,
+) -> Optional[Dict[str, Any]]:
+    """session_weather 의 비동기 버전 (동기 조회가 필요하면 httpx 비동기 호출)
+
+    스냅샷 조회/날씨 조회는 요청의 session_id 만으로 먼저 하고, 세션 확인(session)은
+    저장하기 전에만 기다려 세션 조회와 동시에 진행된다. 새 세션이면 session_id 는 None.
+    """
+    place = Place(lat, lon, city, district)
+    if place.has_coords:
+        key = location_key(place)
+    else:  # 기본 위치 조회만 DB 가 필요
+        key = await sync_to_async(location_key)(place, user)
+    snap = None
+    if session_id is not None:
+        snap = _usable(await sync_to_async(load_snapshot)(session_id), key)
+    if snap is not None:
+        resolved = await session  # 소유 확인 후에만 사용
+        if _age(snap) >= fresh_seconds():
+            _schedule_refresh(resolved.id, key, user, place)
+        return snap["weather"]
+
+    weather = await _afetch(place, user)
+    resolved = await session
+    await sync_to_async(store_snapshot)(resolved.id, key, weather)
+    return weather
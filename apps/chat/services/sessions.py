@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.chat.models import ChatSession
+
+ACTIVE_SESSION_PREFIX = "chat:active_session"
+
+
+class SessionNotFound(Exception): ...
+
+
+def session_ttl() -> timedelta:
+    return timedelta(minutes=getattr(settings, "CHAT_SESSION_TTL_MINUTES", 10))
+
+
+def _active_key(user_id: int) -> str:
+    return f"{ACTIVE_SESSION_PREFIX}:{user_id}"
+
+
+def _session_ref(session_id: int, user_id: int) -> ChatSession:
+    """캐시에 있던 세션 id 로 쿼리 없이 만든 인스턴스 (나머지 필드는 접근 시 지연 로드)"""
+    return ChatSession.from_db("default", ["id", "user_id"], [session_id, user_id])
+
+
+def mark_active(session: ChatSession) -> None:
+    """사용자 활성 세션 키를 TTL 로 다시 설정 (익명 세션은 생략)"""
+    if session.user_id is None:
+        return
+    cache.set(
+        _active_key(session.user_id),
+        session.id,
+        timeout=int(session_ttl().total_seconds()),
+    )
+
+
+def touch_session(session: ChatSession, at: datetime) -> None:
+    """로그 저장 시 호출: last_activity_at 갱신 + 커밋 후 활성 세션 키 갱신"""
+    ChatSession.objects.filter(id=session.id).update(last_activity_at=at)
+    transaction.on_commit(lambda: mark_active(session))
+
+
+def active_session(user) -> Optional[ChatSession]:
+    """TTL 안에 대화가 있었던 사용자 세션 (캐시 1회 조회, 캐시 유실 시 인덱스 쿼리 1회)"""
+    key = _active_key(user.id)
+    sid = cache.get(key)
+    if sid is not None:
+        return _session_ref(sid, user.id)
+
+    now = timezone.now()
+    session = (
+        ChatSession.objects.filter(user=user, last_activity_at__gte=now - session_ttl())
+        .order_by("-last_activity_at")
+        .first()
+    )
+    if session is not None:
+        remaining = session.last_activity_at + session_ttl() - now  # type: ignore[operator]
+        cache.set(key, session.id, timeout=max(1, int(remaining.total_seconds())))
+    return session
+
+
+def resolve_session(*, user, session_id: int | None) -> ChatSession:
+    """요청에 쓸 대화 세션
+
+    session_id 가 있으면 요청 사용자의 그 세션 (없거나 다른 사용자 세션이면 SessionNotFound),
+    로그인 사용자는 마지막 대화가 CHAT_SESSION_TTL_MINUTES 이내인 세션을 이어 쓰고,
+    그 외에는 새로 생성. 최근 대화 버퍼/요약/날씨 스냅샷은 세션 id 로만 찾으므로
+    소유자 확인은 여기서 한다 (익명 요청은 익명 세션만).
+    """
+    if session_id is not None:
+        chat_session = ChatSession.objects.filter(id=session_id, user=user).first()
+        if chat_session is None:
+            raise SessionNotFound(session_id)
+        return chat_session
+
+    if user is not None:
+        active = active_session(user)
+        if active is not None:
+            return active
+
+    return ChatSession.objects.create(user=user)
@@ -0,0 +1,124 @@
+"""세션별 누적 대화 요약
+
+프롬프트에 그대로 넣는 최근 대화(최대 HISTORY_TURNS, 토큰 예산에 따라 더 적을 수 있음)보다
+오래된 미요약 대화를 오래된 순으로 이전 요약과 합쳐 ChatSession.summary 에 저장한다. 요약 생성은 응답 경로를 막지 않도록 로그 저장 커밋 후 백그라운드 스레드에서
+실행하고, 프롬프트 조립 때는 캐시된 요약만 읽는다.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+
+from apps.chat.models import AiChatLogs, ChatSession
+from apps.chat.services import llm
+from apps.chat.services.recent_turns import HISTORY_TURNS, RING_TTL
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "chat:summary"
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_MAX_TOKENS = 300
+SUMMARY_DEADLINE_SECONDS = 30.0  # 백그라운드 작업이라 응답 경로보다 넉넉하게
+FOLD_BATCH = 20  # 한 번에 요약에 합치는 최대 대화 수
+LOCK_SECONDS = 60  # 세션당 요약 작업 중복 방지
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+
+
+def _key(session_id: int) -> str:
+    return f"{SUMMARY_PREFIX}:{session_id}"
+
+
+def get_summary(session_id: int) -> str:
+    summary: Optional[str] = cache.get(_key(session_id))
+    if summary is None:
+        summary = (
+            ChatSession.objects.filter(id=session_id)
+            .values_list("summary", flat=True)
+            .first()
+        ) or ""
+        cache.set(_key(session_id), summary, timeout=RING_TTL)
+    return summary
+
+
+def refresh_summary(session_id: int, keep: int = HISTORY_TURNS) -> bool:
+    """최신 keep 개를 뺀 미요약 대화를 오래된 순으로 FOLD_BATCH 개까지 요약에 합침
+
+    갱신했으면 True. 남은 대화는 다음 턴의 작업이 이어서 합친다.
+    """
+    from apps.chat.services.chat import client
+
+    row = ChatSession.objects.filter(id=session_id).values("summary", "summary_upto")
+    current = row.first()
+    if current is None:
+        return False
+    upto = current["summary_upto"]
+    pending = AiChatLogs.objects.filter(session_id=session_id, id__gt=upto or 0)
+    if keep > 0:
+        # 프롬프트에 그대로 남을 최신 keep 개 중 가장 오래된 id 앞까지만
+        kept = list(pending.order_by("-id").values_list("id", flat=True)[:keep])
+        if len(kept) < keep:
+            return False
+        pending = pending.filter(id__lt=kept[-1])
+    logs = list(
+        pending.order_by("id").values_list("id", "user_question", "ai_answer")[
+            :FOLD_BATCH
+        ]
+    )
+    if not logs:
+        return False
+
+    transcript = "\n".join(f"사용자: {q}\nAI: {a}" for _, q, a in logs)
+    completion = llm.create(
+        client,
+        deadline=llm.Deadline(SUMMARY_DEADLINE_SECONDS),
+        model=SUMMARY_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "이전 요약과 새 대화를 합쳐, 이후 대화에 필요한 사실·선호만 "
+                "한국어 5문장 이내로 요약해줘.",
+            },
+            {
+                "role": "user",
+                "content": f"이전 요약:\n{current['summary'] or '(없음)'}\n\n"
+                f"새 대화:\n{transcript}",
+            },
+        ],
+        temperature=0.2,
+        max_tokens=SUMMARY_MAX_TOKENS,
+    )
+    summary = (completion.choices[0].message.content or "").strip()
+    if not summary:
+        return False
+
+    # 다른 작업이 먼저 갱신했으면 덮어쓰지 않음
+    same_upto = Q(summary_upto__isnull=True) if upto is None else Q(summary_upto=upto)
+    updated = ChatSession.objects.filter(same_upto, id=session_id).update(
+        summary=summary, summary_upto=logs[-1][0]
+    )
+    if updated:
+        cache.set(_key(session_id), summary, timeout=RING_TTL)
+    return bool(updated)
+
+
+def _run(session_id: int, keep: int) -> None:
+    try:
+        refresh_summary(session_id, keep)
+    except Exception:
+        logger.exception("chat summary failed (session=%s)", session_id)
+    finally:
+        cache.delete(f"{_key(session_id)}:lock")
+        connection.close()  # 스레드 전용 DB 연결 정리
+
+
+def schedule_summary(session_id: int, keep: int = HISTORY_TURNS) -> None:
+    """백그라운드 요약 예약 (같은 세션 작업이 진행 중이면 생략)"""
+    if cache.add(f"{_key(session_id)}:lock", 1, timeout=LOCK_SECONDS):
+        _executor.submit(_run, session_id, keep)
@@ -0,0 +1,177 @@
+"""LLM 호출 지연/토큰 집계 (관리자 통계용)
+
+cached_ratio 는 usage 의 cached_tokens / prompt_tokens (OpenAI 프롬프트 캐시 적중 비율).
+건수/합계는 DB 집계로 구하고, 백분위는 PostgreSQL 이면 percentile_cont 로 DB 에서 계산한다.
+그 밖의 DB(개발/테스트 SQLite)는 최근 SAMPLE_LIMIT 건만 읽어 numpy 로 계산한다.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+import numpy as np
+from django.db import connection
+from django.db.models import Aggregate, Count, FloatField, Q, QuerySet, Sum
+from django.db.models.functions import TruncDate
+
+from apps.chat.models import AiChatLogs
+from apps.core.dates import SERVICE_TZ, day_range, local_today
+
+PERCENTILES = (50, 95, 99)
+SAMPLE_LIMIT = 10_000  # DB 백분위 함수가 없을 때 읽는 최근 행 수 상한
+# 라우팅 기준 조정용: (모델, 라우팅 사유) 별 지연
+ROUTE_FIELDS = ("model_name", "context__route__reason")
+
+
+class LatencyOut(TypedDict):
+    count: int
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL percentile_cont (numpy.percentile 기본값과 같은 선형 보간)"""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile: int, **extra):
+        super().__init__(expression, fraction=percentile / 100, **extra)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(float(value), 1)
+
+
+def _from_row(row: Dict[str, Any]) -> LatencyOut:
+    return {
+        "count": row["count"],
+        "p50": _round(row["p50"]),
+        "p95": _round(row["p95"]),
+        "p99": _round(row["p99"]),
+    }
+
+
+def _percentiles(values: List[int], count: Optional[int] = None) -> LatencyOut:
+    """values 로 백분위 계산 (count 는 표본이 아닌 전체 건수)"""
+    if not values:
+        return {"count": count or 0, "p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(np.asarray(values), PERCENTILES)
+    return {
+        "count": len(values) if count is None else count,
+        "p50": _round(p50),
+        "p95": _round(p95),
+        "p99": _round(p99),
+    }
+
+
+def _route_key(model: str, reason: Optional[str]) -> str:
+    return f"{model}:{reason or '-'}"
+
+
+def _latency_db(qs: QuerySet) -> Tuple[LatencyOut, LatencyOut, Dict[str, LatencyOut]]:
+    def aggs(field: str) -> Dict[str, Aggregate]:
+        return {
+            "count": Count(field),
+            **{f"p{p}": PercentileCont(field, p) for p in PERCENTILES},
+        }
+
+    latency = _from_row(qs.aggregate(**aggs("latency_ms")))
+    ttft = _from_row(qs.aggregate(**aggs("ttft_ms")))
+    by_route = {
+        _route_key(row["model_name"], row["context__route__reason"]): _from_row(row)
+        for row in qs.values(*ROUTE_FIELDS).annotate(**aggs("latency_ms"))
+    }
+    return latency, ttft, by_route
+
+
+def _latency_sampled(
+    qs: QuerySet,
+) -> Tuple[LatencyOut, LatencyOut, Dict[str, LatencyOut]]:
+    counts = qs.aggregate(latency=Count("latency_ms"), ttft=Count("ttft_ms"))
+    route_counts = {
+        _route_key(model, reason): n
+        for model, reason, n in qs.values(*ROUTE_FIELDS)
+        .annotate(n=Count("id"))
+        .values_list(*ROUTE_FIELDS, "n")
+    }
+    latency: List[int] = []
+    ttft: List[int] = []
+    by_route: Dict[str, List[int]] = {key: [] for key in route_counts}
+    rows = qs.order_by("-id").values_list("latency_ms", "ttft_ms", *ROUTE_FIELDS)
+    for total, first, model, reason in rows[:SAMPLE_LIMIT]:
+        latency.append(total)
+        if first is not None:
+            ttft.append(first)
+        by_route[_route_key(model, reason)].append(total)
+    return (
+        _percentiles(latency, counts["latency"]),
+        _percentiles(ttft, counts["ttft"]),
+        {k: _percentiles(v, route_counts[k]) for k, v in by_route.items()},
+    )
+
+
+def cached_ratio(prompt_tokens: Optional[int], cached_tokens: Optional[int]) -> float:
+    """프롬프트 토큰 중 프롬프트 캐시에서 처리된 비율"""
+    if not prompt_tokens:
+        return 0.0
+    return round((cached_tokens or 0) / prompt_tokens, 4)
+
+
+def llm_stats(days: int = 7) -> Dict[str, Any]:
+    """최근 days 일(Asia/Seoul, 오늘 포함) 지연 백분위 + 경로별 건수 + 일별 토큰 합계"""
+    since = day_range(local_today() - timedelta(days=days - 1))[0]
+    qs = AiChatLogs.objects.filter(created_at__gte=since)
+
+    # 지연은 실제 모델 응답만 (대체 답변은 포기까지 걸린 시간이라 따로 보지 않음)
+    answered = qs.filter(served_by="llm", latency_ms__isnull=False)
+    if connection.vendor == "postgresql":
+        latency, ttft, by_route = _latency_db(answered)
+    else:
+        latency, ttft, by_route = _latency_sampled(answered)
+
+    daily = (
+        qs.annotate(day=TruncDate("created_at", tzinfo=SERVICE_TZ))
+        .values("day")
+        .annotate(
+            calls=Count("id"),
+            llm_calls=Count("id", filter=Q(served_by="llm")),
+            prompt_tokens=Sum("prompt_tokens"),
+            completion_tokens=Sum("completion_tokens"),
+            cached_tokens=Sum("cached_tokens"),
+        )
+        .order_by("day")
+    )
+    served_by = dict(
+        qs.values_list("served_by")
+        .annotate(n=Count("id"))
+        .values_list("served_by", "n")
+    )
+    rows = [
+        {
+            **row,
+            "day": row["day"].isoformat(),
+            **{
+                k: row[k] or 0
+                for k in ("prompt_tokens", "completion_tokens", "cached_tokens")
+            },
+        }
+        for row in daily
+    ]
+    for row in rows:
+        row["cached_ratio"] = cached_ratio(row["prompt_tokens"], row["cached_tokens"])
+    return {
+        "since": since.isoformat(),
+        "latency_ms": latency,
+        "ttft_ms": ttft,
+        "served_by": served_by,
+        "by_route": dict(sorted(by_route.items())),
+        "cached_ratio": cached_ratio(
+            sum(r["prompt_tokens"] for r in rows),
+            sum(r["cached_tokens"] for r in rows),
+        ),
+        "daily": rows,
+    }
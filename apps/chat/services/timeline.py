@@ -0,0 +1,98 @@
+"""세션 대화 타임라인 keyset 페이지네이션
+
+커서는 마지막으로 받은(가장 오래된) 로그의 (created_at, id) 를 base64 로 감싼 불투명 토큰이다.
+세션 존재 확인과 페이지 조회를 한 쿼리로 처리한다: ChatSession 에 오늘 로그를
+FilteredRelation 으로 LEFT JOIN 해 limit+1 행을 가져오면
+행이 없을 때 → 세션 없음, 로그 컬럼이 NULL 인 한 행 → 세션은 있지만 로그 없음,
+limit 보다 많으면 → 다음 페이지 있음.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+from django.db.models import FilteredRelation, Q
+
+from apps.chat.models import AiChatLogs, ChatSession
+from apps.core.dates import day_range
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+Cursor = Tuple[datetime, int]
+
+
+class TimelinePage(TypedDict):
+    logs: List[Dict[str, Any]]  # 오래된 순
+    has_more: bool
+    next_cursor: Optional[str]
+
+
+def encode_cursor(created_at: datetime, log_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), log_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """잘못된 토큰이면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, log_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (binascii.Error, TypeError, json.JSONDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def cursor_for_log(session_id: int, log_id: int) -> Optional[Cursor]:
+    """(지원 종료 예정) before_id 호환: 그 로그 위치의 커서. 로그가 없으면 None"""
+    created_at = (
+        AiChatLogs.objects.filter(session_id=session_id, id=log_id)
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    return (created_at, log_id) if created_at is not None else None
+
+
+def session_page(
+    session_id: int, *, limit: int = DEFAULT_LIMIT, cursor: Optional[Cursor] = None
+) -> Optional[TimelinePage]:
+    """오늘(Asia/Seoul) 로그 중 cursor 보다 오래된 limit 개. 세션이 없으면 None"""
+    limit = max(1, min(limit, MAX_LIMIT))
+    start, end = day_range()
+    cond = Q(logs__created_at__gte=start, logs__created_at__lt=end)
+    if cursor is not None:
+        at, log_id = cursor
+        cond &= Q(logs__created_at__lt=at) | Q(logs__created_at=at, logs__id__lt=log_id)
+
+    rows = list(
+        ChatSession.objects.filter(id=session_id)
+        .annotate(page=FilteredRelation("logs", condition=cond))
+        .order_by("-page__created_at", "-page__id")
+        .values(
+            "page__id", "page__user_question", "page__ai_answer", "page__created_at"
+        )[: limit + 1]
+    )
+    if not rows:
+        return None
+
+    logs = [
+        {
+            "id": r["page__id"],
+            "user_question": r["page__user_question"],
+            "ai_answer": r["page__ai_answer"],
+            "created_at": r["page__created_at"],
+        }
+        for r in rows
+        if r["page__id"] is not None
+    ]
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    next_cursor = (
+        encode_cursor(logs[-1]["created_at"], logs[-1]["id"]) if has_more else None
+    )
+    logs.reverse()
+    return {"logs": logs, "has_more": has_more, "next_cursor": next_cursor}
@@ -1,5 +1,7 @@
 from typing import Any, Dict, Optional
 
+from asgiref.sync import sync_to_async
+
 from apps.weather.models import WeatherLocation
 from apps.weather.services import geocoding
 from apps.weather.services import openweather as ow
@@ -21,6 +23,26 @@ def get_user_base_location(user) -> Optional[WeatherLocation]:
     return None
 
 
+def _chat_weather(cur: CurrentOut, city_name: str) -> Dict[str, Any]:
+    return {
+        "city": city_name,
+        "temperature": cur["temperature"],
+        "feels_like": cur["feels_like"],
+        "humidity": cur["humidity"],
+        "condition": cur["condition"],
+        "rain_probability": cur.get("rain_volume") or cur.get("rain_probability") or 0,
+    }
+
+
+def _coords_city_name(city: str | None, district: str | None) -> str:
+    parts = [p for p in [city, district] if p]
+    return " ".join(parts) or "현재 위치"
+
+
+def _location_name(loc: WeatherLocation) -> str:
+    return getattr(loc, "dp_name", f"{loc.city} {loc.district}")
+
+
 def get_weather_for_chat(
     user=None,
     *,
@@ -32,37 +54,32 @@ def get_weather_for_chat(
 
     if lat is not None and lon is not None:
         cur: CurrentOut = ow.get_current(lat=lat, lon=lon)
-
-        parts = [p for p in [city, district] if p]
-        city_name = " ".join(parts) or "현재 위치"
-
-        return {
-            "city": city_name,
-            "temperature": cur["temperature"],
-            "feels_like": cur["feels_like"],
-            "humidity": cur["humidity"],
-            "condition": cur["condition"],
-            "rain_probability": cur.get("rain_volume")
-            or cur.get("rain_probability")
-            or 0,
-        }
+        return _chat_weather(cur, _coords_city_name(city, district))
 
     loc = get_user_base_location(user)
     if loc is None:
         return None
 
     cur2: CurrentOut = ow.get_current(lat=loc.lat, lon=loc.lon)
+    return _chat_weather(cur2, _location_name(loc))
 
-    return {
-        "city": getattr(loc, "dp_name", f"{loc.city} {loc.district}"),
-        "temperature": cur2["temperature"],
-        "feels_like": cur2["feels_like"],
-        "humidity": cur2["humidity"],
-        "condition": cur2["condition"],
-        "rain_probability": cur2.get("rain_volume")
-        or cur2.get("rain_probability")
-        or 0,
-    }
 
+async def aget_weather_for_chat(
+    user=None,
+    *,
+    lat: float | None = None,
+    lon: float | None = None,
+    city: str | None = None,
+    district: str | None = None,
+) -> Optional[Dict[str, Any]]:
+    """get_weather_for_chat 의 비동기 버전 (OpenWeather 호출은 httpx 비동기)"""
+    if lat is not None and lon is not None:
+        cur = await ow.aget_current(lat=lat, lon=lon)
+        return _chat_weather(cur, _coords_city_name(city, district))
+
+    loc = await sync_to_async(get_user_base_location)(user)
+    if loc is None:
+        return None
 
-#
+    cur2 = await ow.aget_current(lat=loc.lat, lon=loc.lon)
+    return _chat_weather(cur2, _location_name(loc))
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.chat.models import AiModelSettings, ChatIntentKeyword
+from apps.chat.services import intent, model_picker
+
+
+@receiver(post_save, sender=AiModelSettings)
+@receiver(post_delete, sender=AiModelSettings)
+def invalidate_model_settings_index(sender, **kwargs):
+    # 이 프로세스는 바로 버리고, 다른 워커용 버전 증가는 커밋 후
+    # (커밋 전에 다른 워커가 옛 데이터로 새 버전을 만드는 것 방지)
+    model_picker.invalidate_local()
+    transaction.on_commit(model_picker.invalidate)
+
+
+@receiver(post_save, sender=ChatIntentKeyword)
+@receiver(post_delete, sender=ChatIntentKeyword)
+def invalidate_intent_engine(sender, **kwargs):
+    intent.invalidate_local()
+    transaction.on_commit(intent.invalidate)
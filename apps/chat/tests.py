@@ -1,3 +1,1294 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict
+from unittest import skipUnless
+from unittest.mock import AsyncMock, patch
 
-# Create your tests here.
+import httpx
+import openai
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F, Q
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.chat.models import (
+    AiChatLogs,
+    AiModelSettings,
+    ChatIntentKeyword,
+    ChatSession,
+)
+from apps.chat.services import answer_cache as answer_cache_mod
+from apps.chat.services import (
+    context_builder,
+    intent,
+    llm,
+    log_buffer,
+    model_picker,
+    recent_turns,
+    rule_answers,
+    session_weather,
+    sessions,
+    summaries,
+    telemetry,
+)
+from apps.chat.services.answer_cache import answer_cache
+from apps.chat.services.chat import (
+    STATIC_PREFIX,
+    chat_and_log,
+    prepare_turn,
+    save_turn,
+    stream_chat_and_log,
+)
+from apps.chat.services.rule_answers import format_rule_answer, rule_answer
+from apps.core import db
+from apps.core.dates import day_range, today_filter
+from apps.core.middleware import TxnTimingMiddleware
+from apps.recommend.models import OutfitExplanation
+from apps.recommend.services import outfit_explanations
+from apps.recommend.services.recommend_service import build_outfit_by_temp_and_cond
+
+
+def _chunk(text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text))]
+    )
+
+
+class ChatStreamTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.client = APIClient()
+
+    @patch("apps.chat.services.chat.client")
+    def test_send_stream_forwards_tokens_then_logs(self, mock_client):
+        mock_client.chat.completions.create.return_value = iter(
+            [_chunk("안녕"), _chunk("하세요"), SimpleNamespace(choices=[])]
+        )
+        resp = self.client.post(
+            "/api/chat/send/?stream=1",
+            {"message": "안녕", "weather": {}},
+            format="json",
+        )
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        body = b"".join(resp.streaming_content).decode()
+
+        self.assertIn('event: delta\ndata: {"text": "안녕"}', body)
+        self.assertIn("event: done", body)
+        self.assertTrue(mock_client.chat.completions.create.call_args.kwargs["stream"])
+        log = AiChatLogs.objects.get()
+        self.assertEqual(log.ai_answer, "안녕하세요")
+
+    @patch("apps.chat.services.chat.client")
+    def test_interrupted_stream_logs_partial_answer(self, mock_client):
+        def chunks():
+            yield _chunk("비빔밥")
+            yield _chunk(" 어때요")
+            raise httpx.ReadError("connection reset")
+
+        mock_client.chat.completions.create.return_value = chunks()
+        events = list(
+            stream_chat_and_log(
+                user=None,
+                session=ChatSession.objects.create(),
+                user_message="저녁 뭐 먹지",
+                weather=None,
+                profile=None,
+            )
+        )
+        self.assertEqual([e["type"] for e in events], ["delta", "delta", "done"])
+        self.assertEqual(events[-1]["served_by"], "llm_partial")
+        log = AiChatLogs.objects.get()
+        self.assertEqual(log.ai_answer, "비빔밥 어때요")
+        self.assertEqual(log.served_by, "llm_partial")
+        self.assertEqual(log.context["llm_error"], "ReadError")
+
+    def test_stream_enforces_overall_deadline(self):
+        client = SimpleNamespace(
+            chat=SimpleNamespace(
+                completions=SimpleNamespace(
+                    create=lambda **kw: iter([_chunk("a"), _chunk("b")])
+                )
+            )
+        )
+        deadline = llm.Deadline(30)
+        it = llm.stream(client, deadline=deadline, model="m", messages=[])
+        next(it)
+        deadline.expires_at = 0  # 첫 청크 이후 마감 초과
+        with self.assertRaises(llm.LLMUnavailable):
+            next(it)
+
+
+class ChatAsyncStreamTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+
+    @patch("apps.chat.services.chat.aclient")
+    async def test_asgi_stream_sends_first_token_before_llm_finishes(
+        self, mock_aclient
+    ):
+        release = asyncio.Event()
+        finished = []
+
+        async def chunks():
+            yield _chunk("안녕")
+            await release.wait()  # 첫 프레임을 받기 전에는 다음 청크가 오지 않음
+            yield _chunk("하세요")
+            finished.append(True)
+
+        mock_aclient.chat.completions.create = AsyncMock(return_value=chunks())
+        resp = await AsyncClient().post(
+            "/api/chat/send/?stream=1",
+            {"message": "안녕", "weather": {}},
+            content_type="application/json",
+        )
+        self.assertTrue(resp.is_async)
+        body = aiter(resp.streaming_content)
+        first = await asyncio.wait_for(anext(body), timeout=5)
+        self.assertEqual(first.decode(), 'event: delta\ndata: {"text": "안녕"}\n\n')
+        self.assertEqual(finished, [])
+
+        release.set()
+        rest = b"".join([chunk async for chunk in body]).decode()
+        self.assertIn("event: done", rest)
+        log = await AiChatLogs.objects.aget()
+        self.assertEqual(log.ai_answer, "안녕하세요")
+
+
+class ChatTransactionTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+
+    @patch("apps.chat.services.chat.client")
+    def test_model_call_runs_outside_transaction(self, mock_client):
+        from django.db import connection
+
+        seen = {}
+        base_depth = len(connection.savepoint_ids)  # TestCase 자체 atomic
+
+        def fake_create(**kwargs):
+            seen["depth"] = len(connection.savepoint_ids)
+            msg = SimpleNamespace(content="답변")
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+        mock_client.chat.completions.create.side_effect = fake_create
+        resp = APIClient().post(
+            "/api/chat/send/", {"message": "안녕", "weather": {}}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(seen["depth"], base_depth)
+        self.assertIn("db-txn;dur=", resp["Server-Timing"])
+
+    async def test_txn_timing_middleware_async(self):
+        def write():
+            with db.timed_atomic("test"):
+                ChatSession.objects.create()
+
+        async def view(request):
+            await sync_to_async(write)()
+            return HttpResponse("ok")
+
+        middleware = TxnTimingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        resp = await middleware(RequestFactory().get("/"))
+        self.assertIn('desc="1 txn"', resp["Server-Timing"])
+
+
+class ChatAsyncSendTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+
+    @patch("apps.chat.services.chat.aclient")
+    async def test_send_async_logs_answer(self, mock_aclient):
+        msg = SimpleNamespace(content=" 비동기 답변 ")
+        mock_aclient.chat.completions.create = AsyncMock(
+            return_value=SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+        )
+        resp = await AsyncClient().post(
+            "/api/chat/send/async/",
+            {"message": "안녕", "weather": {"temperature": 20, "humidity": 50}},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["response"], "비동기 답변")
+        log = await AiChatLogs.objects.aget()
+        self.assertEqual(log.session_id, resp.json()["session_id"])
+
+    @patch("apps.chat.services.chat.aclient")
+    @patch("apps.chat.services.session_weather.aget_weather_for_chat")
+    @patch("apps.chat.views.resolve_session")
+    async def test_send_async_resolves_session_and_weather_concurrently(
+        self, mock_resolve, mock_weather, mock_aclient
+    ):
+        fetched = threading.Event()
+        seen = {}
+
+        def resolve(user, session_id):
+            # 날씨 조회가 세션 확인을 기다리지 않고 먼저 끝나야 함
+            seen["weather_first"] = fetched.wait(timeout=2)
+            return ChatSession.objects.create()
+
+        async def weather(**kwargs):
+            fetched.set()
+            return {"temperature": 20, "humidity": 50}
+
+        mock_resolve.side_effect = resolve
+        mock_weather.side_effect = weather
+        msg = SimpleNamespace(content="답변")
+        mock_aclient.chat.completions.create = AsyncMock(
+            return_value=SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+        )
+        resp = await AsyncClient().post(
+            "/api/chat/send/async/",
+            {"message": "안녕", "lat": 37.5, "lon": 127.0},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(seen["weather_first"])
+
+    async def test_send_async_unknown_session(self):
+        resp = await AsyncClient().post(
+            "/api/chat/send/async/",
+            {"message": "안녕", "weather": {"temperature": 20}, "session_id": 999},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.json()["error_status"], "session_not_found")
+
+
+class RuleAnswerTableTests(TestCase):
+    def test_table_matches_rule_builder(self):
+        for temp in (-12, -5, -4.99, 0, 3.5, 9, 10, 11.01, 17, 20.5, 25, 29, 33.3):
+            for cond in ("Clear", "Rain", "snow", "비", None):
+                fb = build_outfit_by_temp_and_cond(temp, cond)
+                self.assertEqual(rule_answer(temp, cond), (format_rule_answer(fb), fb))
+
+    def test_rule_branch_skips_db(self):
+        session = ChatSession.objects.create()
+        setting = AiModelSettings.objects.create(
+            name="mild", temperature_min=10, temperature_max=15, category_combo="m"
+        )
+        model_picker.invalidate()
+        self.addCleanup(model_picker.invalidate)
+        intent.get_engine()  # 키워드 매처 로드는 워커당 한 번
+        outfit_explanations.get_table()  # 설명 테이블도 워커당 한 번
+        model_picker.get_index()  # 모델 설정 인덱스도 워커당 한 번
+        with self.assertNumQueries(0):
+            turn = prepare_turn(
+                user=None,
+                session=session,
+                user_message="오늘 뭐 입지?",
+                weather={"temperature": 12.5, "humidity": 40, "condition": "Clear"},
+                profile=None,
+            )
+        self.assertIn("12.5°C", turn["answer"])
+        # 룰 답변도 선택된 모델 설정은 로그에 남김
+        self.assertEqual(turn["setting"], setting)
+        self.assertEqual(turn["context"]["model_setting"], "mild")
+
+    def test_rule_branch_uses_generated_explanation(self):
+        self.addCleanup(outfit_explanations.invalidate_local)
+        OutfitExplanation.objects.create(
+            rule_key="band:5",
+            gender="W",
+            age_group="20",
+            explanation="{temp}°C엔 니트 가디건을 걸치기 좋아요.",
+            model_name="fake",
+            prompt_version="test",
+        )
+        outfit_explanations.invalidate_local()
+        turn = prepare_turn(
+            user=None,
+            session=ChatSession.objects.create(),
+            user_message="오늘 뭐 입지?",
+            weather={"temperature": 12.5, "condition": "Clear"},
+            profile={"gender": "W", "age": 24},
+        )
+        self.assertIn("12.5°C엔 니트 가디건을 걸치기 좋아요.", turn["answer"])
+        self.assertEqual(
+            turn["rule_outfits"]["explanation"], "12.5°C엔 니트 가디건을 걸치기 좋아요."
+        )
+        self.assertTrue(turn["answer"].startswith(rule_answers.GENERATED_HEADER))
+
+    def test_bench_pins_rule_template_explanations(self):
+        OutfitExplanation.objects.create(
+            rule_key="band:5",
+            explanation="{temp}°C엔 니트 가디건을 걸치기 좋아요.",
+            model_name="fake",
+            prompt_version="test",
+        )
+        outfit_explanations.invalidate_local()
+        self.addCleanup(outfit_explanations.invalidate_local)
+        out = io.StringIO()
+        call_command("bench_chat_rule", samples=20, repeat=1, stdout=out)
+        self.assertIn("answer table fast path", out.getvalue())
+        # 고정이 풀리면 다시 DB 테이블 사용
+        self.assertIsNotNone(outfit_explanations.lookup("band:5"))
+
+
+class AnswerCacheTests(TestCase):
+    def setUp(self):
+        answer_cache.clear()
+        self.weather = {"temperature": 12.0, "humidity": 50, "condition": "Rain"}
+
+    def test_near_duplicate_hits_within_same_weather_bucket(self):
+        q = answer_cache.query("오늘 우산 챙겨야 해?", self.weather)
+        answer_cache.store(q, "네, 챙기세요.", now=0)
+
+        same = answer_cache.query("오늘 우산  챙겨야해??", self.weather)
+        self.assertEqual(answer_cache.lookup(same, now=10), "네, 챙기세요.")
+        other_day = answer_cache.query("내일 우산 챙겨야 해?", self.weather)
+        self.assertIsNone(answer_cache.lookup(other_day, now=10))
+        clear = answer_cache.query("오늘 우산 챙겨야 해?", {"temperature": 12.0})
+        self.assertIsNone(answer_cache.lookup(clear, now=10))
+        # TTL 만료
+        self.assertIsNone(answer_cache.lookup(same, now=answer_cache_mod.DEFAULT_TTL))
+        self.assertEqual(answer_cache.stats()["hits"], 1)
+
+    def test_bucket_is_per_city_and_day_and_skips_numeric_answers(self):
+        seoul = {**self.weather, "city": "서울"}
+        q = answer_cache.query("오늘 우산 챙겨야 해?", seoul)
+        answer_cache.store(q, "네, 챙기세요.", now=0)
+
+        busan = answer_cache.query("오늘 우산 챙겨야 해?", {**seoul, "city": "부산"})
+        self.assertIsNone(answer_cache.lookup(busan, now=10))
+        with patch(
+            "apps.chat.services.answer_cache.local_today",
+            return_value=date(2099, 1, 1),
+        ):
+            tomorrow = answer_cache.query("오늘 우산 챙겨야 해?", seoul)
+        self.assertIsNone(answer_cache.lookup(tomorrow, now=10))
+
+        # 기온 같은 수치는 같은 구간이라도 사용자마다 다름
+        q = answer_cache.query("지금 몇 도야?", seoul)
+        answer_cache.store(q, "지금 12도예요.", now=0)
+        self.assertIsNone(answer_cache.lookup(q, now=10))
+
+    @patch("apps.chat.services.chat.client")
+    def test_repeated_question_skips_model_call(self, mock_client):
+        msg = SimpleNamespace(content="우산 챙기세요")
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=msg)]
+        )
+        for _ in range(2):
+            resp = APIClient().post(
+                "/api/chat/send/",
+                {"message": "우산 필요해?", "weather": self.weather},
+                format="json",
+            )
+            self.assertEqual(resp.data["response"], "우산 챙기세요")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1)
+        self.assertEqual(AiChatLogs.objects.count(), 2)
+
+
+class ModelSettingsIndexTests(TestCase):
+    def setUp(self):
+        model_picker.invalidate()
+
+    def tearDown(self):
+        # 롤백은 signal 을 보내지 않으므로 다음 테스트를 위해 비움
+        model_picker.invalidate()
+
+    def _sql_pick(self, temp_c, humidity, condition):
+        qs = AiModelSettings.objects.filter(
+            active=True, temperature_min__lte=temp_c, temperature_max__gte=temp_c
+        )
+        if humidity is not None:
+            qs = qs.filter(humidity_min__lte=humidity, humidity_max__gte=humidity)
+        if condition:
+            qs = qs.filter(Q(weather_condition="") | Q(weather_condition=condition))
+        else:
+            qs = qs.filter(Q(weather_condition=""))
+        return (
+            qs.annotate(
+                temp_span=F("temperature_max") - F("temperature_min"),
+                humidity_span=F("humidity_max") - F("humidity_min"),
+            )
+            .order_by("temp_span", "humidity_span", "id")
+            .first()
+        )
+
+    def test_matches_sql_tie_break(self):
+        rows = [
+            (-10, 5, 0, 100, ""),
+            (0, 10, 0, 100, ""),
+            (0, 10, 30, 70, ""),
+            (0, 10, 0, 100, "Rain"),
+            (5, 15, 0, 100, ""),
+            (10, 30, 0, 60, "Clear"),
+            (20, 25, 0, 100, ""),
+        ]
+        for i, (tmin, tmax, hmin, hmax, cond) in enumerate(rows):
+            AiModelSettings.objects.create(
+                name=f"s{i}",
+                temperature_min=tmin,
+                temperature_max=tmax,
+                humidity_min=hmin,
+                humidity_max=hmax,
+                weather_condition=cond,
+                category_combo=f"c{i}",
+            )
+        AiModelSettings.objects.create(
+            name="off",
+            temperature_min=0,
+            temperature_max=1,
+            category_combo="x",
+            active=False,
+        )
+        for temp in (-11, -10, -3, 0, 0.5, 5, 7.5, 10, 12, 15, 22, 25, 30, 31):
+            for humi in (None, 20, 50, 90):
+                for cond in (None, "", "Rain", "Clear", "Snow"):
+                    self.assertEqual(
+                        model_picker.pick_model_setting(temp, humi, cond),
+                        self._sql_pick(temp, humi, cond),
+                        (temp, humi, cond),
+                    )
+
+    def test_save_rebuilds_index_without_query_per_lookup(self):
+        self.assertIsNone(model_picker.pick_model_setting(12, 50, None))
+        s = AiModelSettings.objects.create(
+            name="mild", temperature_min=10, temperature_max=15, category_combo="m"
+        )
+        self.assertEqual(model_picker.pick_model_setting(12, 50, None), s)
+        with self.assertNumQueries(0):
+            model_picker.pick_model_setting(13, 50, "Clear")
+        s.delete()
+        self.assertIsNone(model_picker.pick_model_setting(12, 50, None))
+
+
+class IntentEngineTests(TestCase):
+    def setUp(self):
+        intent.invalidate()
+
+    def tearDown(self):
+        intent.invalidate()
+
+    def test_all_intents_in_one_pass(self):
+        engine = intent.IntentEngine(
+            {"a": ["코디", "코디 추천"], "b": ["옷"], "c": ["디 추"]}
+        )
+        self.assertEqual(engine.match("오늘 코디 추천 해줘"), {"a", "c"})
+        self.assertEqual(engine.match("옷 코디"), {"a", "b"})
+        self.assertEqual(engine.match("점심 메뉴"), set())
+
+    def test_defaults_match_legacy_keywords(self):
+        self.assertEqual(
+            intent.match_intents("오늘 뭐 입지?"),
+            {intent.OUTFIT_QUESTION, intent.OUTFIT},
+        )
+        self.assertEqual(intent.detect_intent("우산 챙길까"), "outfit")
+        self.assertEqual(intent.detect_intent("저녁 뭐 먹지"), "general")
+
+    def test_db_keywords_hot_reload(self):
+        self.assertEqual(intent.match_intents("출근룩 골라줘"), set())
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatIntentKeyword.objects.create(
+                intent=intent.OUTFIT_QUESTION, keyword="출근룩"
+            )
+        self.assertEqual(
+            intent.match_intents("출근룩 골라줘"), {intent.OUTFIT_QUESTION}
+        )
+
+
+class SessionActivityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="s@test.com", password="1234"
+        )
+
+    def _save(self, session):
+        turn = prepare_turn(
+            user=self.user,
+            session=session,
+            user_message="hi",
+            weather=None,
+            profile=None,
+            setting=None,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            save_turn(
+                user=self.user,
+                session=session,
+                turn=turn,
+                user_message="hi",
+                answer="a",
+                model_name="m",
+            )
+
+    def test_reuses_active_session_from_cache(self):
+        session = ChatSession.objects.create(user=self.user)
+        self._save(session)
+        session.refresh_from_db()
+        self.assertIsNotNone(session.last_activity_at)
+
+        with self.assertNumQueries(0):
+            resolved = sessions.resolve_session(user=self.user, session_id=None)
+        self.assertEqual(resolved.id, session.id)
+
+        cache.clear()  # 캐시 유실 시에도 인덱스 쿼리 한 번
+        with self.assertNumQueries(1):
+            resolved = sessions.resolve_session(user=self.user, session_id=None)
+        self.assertEqual(resolved.id, session.id)
+
+    @override_settings(CHAT_SESSION_TTL_MINUTES=5)
+    def test_expired_session_starts_new(self):
+        old = ChatSession.objects.create(
+            user=self.user, last_activity_at=timezone.now() - timedelta(minutes=6)
+        )
+        resolved = sessions.resolve_session(user=self.user, session_id=None)
+        self.assertNotEqual(resolved.id, old.id)
+
+    def test_other_users_session_is_not_found(self):
+        mine = ChatSession.objects.create(user=self.user)
+        recent_turns.push_turn(mine.id, "비밀 질문", "비밀 답", seed=[])
+        other = get_user_model().objects.create_user(
+            email="o@test.com", password="1234"
+        )
+        for user in (other, None):
+            with self.assertRaises(sessions.SessionNotFound):
+                sessions.resolve_session(user=user, session_id=mine.id)
+        self.assertEqual(
+            sessions.resolve_session(user=self.user, session_id=mine.id).id, mine.id
+        )
+
+        client = APIClient()
+        client.force_authenticate(other)
+        resp = client.post(
+            "/api/chat/send/",
+            {"message": "안녕", "weather": {}, "session_id": mine.id},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.json()["error_status"], "session_not_found")
+
+
+class RecentTurnsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+        intent.get_engine()
+
+    def _turn(self, session):
+        return prepare_turn(
+            user=None,
+            session=session,
+            user_message="안녕",
+            weather=None,
+            profile=None,
+            setting=None,
+        )
+
+    def test_ring_buffer_keeps_latest_turns(self):
+        self.assertIsNone(recent_turns.get_recent(1))
+        recent_turns.push_turn(1, "q0", "a0")  # 버퍼가 없으면 추가하지 않음
+        self.assertIsNone(recent_turns.get_recent(1))
+        recent_turns.push_turn(1, "q1", "a1", seed=[])
+        last = recent_turns.HISTORY_TURNS + 3
+        for i in range(2, last + 1):
+            recent_turns.push_turn(1, f"q{i}", f"a{i}")
+        self.assertEqual(
+            recent_turns.get_recent(1),
+            [(f"q{i}", f"a{i}") for i in range(last, 3, -1)],
+        )
+
+    def test_history_read_from_buffer_after_first_turn(self):
+        session = ChatSession.objects.create()
+        AiChatLogs.objects.create(
+            session=session, user_question="이전", ai_answer="답", model_name="m"
+        )
+        with self.assertNumQueries(1):
+            turn = self._turn(session)
+        self.assertEqual(turn["history_seed"], [("이전", "답")])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            save_turn(
+                user=None,
+                session=session,
+                turn=turn,
+                user_message="안녕",
+                answer="반가워",
+                model_name="m",
+            )
+        with self.assertNumQueries(0):
+            turn = self._turn(session)
+        self.assertIsNone(turn["history_seed"])
+        self.assertEqual(
+            [m["content"] for m in turn["messages"][-5:]],
+            ["이전", "답", "안녕", "반가워", "안녕"],
+        )
+
+
+class HistoryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+
+    def test_estimate_and_fit(self):
+        self.assertEqual(context_builder.estimate_tokens("안녕하세요"), 5)
+        self.assertEqual(context_builder.estimate_tokens("hello world!"), 3)
+        turns = [("짧은질문", "짧은답"), ("가" * 100, "나" * 100), ("q", "a")]
+        picked, used = context_builder.fit_history(turns, 100)
+        # 넘치는 대화에서 멈추고 그보다 오래된 대화는 넣지 않음
+        self.assertEqual(picked, [("짧은질문", "짧은답")])
+        self.assertEqual(used, 4 + 4 + 3 + 4)
+
+    @patch("apps.chat.services.chat.client")
+    def test_old_turns_folded_into_summary(self, mock_client):
+        msg = SimpleNamespace(content="사용자는 추위를 많이 탐")
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=msg)]
+        )
+        session = ChatSession.objects.create()
+        for i in range(recent_turns.HISTORY_TURNS + 2):
+            AiChatLogs.objects.create(
+                session=session, user_question=f"q{i}", ai_answer=f"a{i}"
+            )
+        self.assertTrue(summaries.refresh_summary(session.id))
+        session.refresh_from_db()
+        self.assertEqual(session.summary, "사용자는 추위를 많이 탐")
+        folded = mock_client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertIn("q1", folded[-1]["content"])
+        self.assertNotIn("q2", folded[-1]["content"])
+        self.assertFalse(summaries.refresh_summary(session.id))
+
+        turn = prepare_turn(
+            user=None,
+            session=session,
+            user_message="안녕",
+            weather=None,
+            profile=None,
+            setting=None,
+        )
+        contents = [m["content"] for m in turn["messages"]]
+        self.assertIn("이전 대화 요약: 사용자는 추위를 많이 탐", contents)
+        self.assertTrue(turn["summarize"])
+        self.assertEqual(
+            turn["context"]["history"]["turns"], recent_turns.HISTORY_TURNS
+        )
+        self.assertEqual(turn["history_kept"], recent_turns.HISTORY_TURNS)
+
+    @patch("apps.chat.services.chat.client")
+    def test_oldest_turns_folded_first_in_batches(self, mock_client):
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="요약"))]
+        )
+        session = ChatSession.objects.create()
+        total = recent_turns.HISTORY_TURNS + summaries.FOLD_BATCH + 3
+        logs = [
+            AiChatLogs.objects.create(
+                session=session, user_question=f"<q{i}>", ai_answer=f"a{i}"
+            )
+            for i in range(total)
+        ]
+
+        self.assertTrue(summaries.refresh_summary(session.id))
+        folded = mock_client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertIn("<q0>", folded[-1]["content"])
+        self.assertNotIn(f"<q{summaries.FOLD_BATCH}>", folded[-1]["content"])
+        session.refresh_from_db()
+        self.assertEqual(session.summary_upto, logs[summaries.FOLD_BATCH - 1].id)
+
+        # 남은 3개를 다음 작업이 이어서 합침 (최신 HISTORY_TURNS 개는 제외)
+        self.assertTrue(summaries.refresh_summary(session.id))
+        session.refresh_from_db()
+        self.assertEqual(session.summary_upto, logs[-recent_turns.HISTORY_TURNS - 1].id)
+        self.assertFalse(summaries.refresh_summary(session.id))
+
+    @override_settings(CHAT_HISTORY_TOKEN_BUDGET=40)
+    @patch("apps.chat.services.chat.client")
+    def test_turns_dropped_for_budget_are_summarized(self, mock_client):
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="요약"))]
+        )
+        session = ChatSession.objects.create()
+        AiChatLogs.objects.create(
+            session=session, user_question="가" * 50, ai_answer="a"
+        )
+        AiChatLogs.objects.create(
+            session=session, user_question="짧은질문", ai_answer="답"
+        )
+
+        turn = prepare_turn(
+            user=None,
+            session=session,
+            user_message="안녕",
+            weather=None,
+            profile=None,
+            setting=None,
+        )
+        # 창은 안 찼지만 긴 대화가 예산 때문에 빠짐 → 요약 대상
+        self.assertTrue(turn["summarize"])
+        self.assertEqual(turn["history_kept"], 1)
+
+        self.assertTrue(summaries.refresh_summary(session.id, turn["history_kept"]))
+        folded = mock_client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertIn("가" * 50, folded[-1]["content"])
+        self.assertNotIn("짧은질문", folded[-1]["content"])
+
+
+class ChatLogDateFilterTests(TestCase):
+    def test_today_filter_is_range_on_created_at(self):
+        start, end = day_range(date(2025, 11, 1))
+        self.assertEqual(start.isoformat(), "2025-11-01T00:00:00+09:00")
+        self.assertEqual(end - start, timedelta(days=1))
+
+        qs = AiChatLogs.objects.filter(session_id=1, **today_filter()).order_by(
+            "-created_at", "-id"
+        )
+        sql = str(qs.query).lower()
+        self.assertNotIn("cast_date", sql)  # sqlite 날짜 캐스팅 함수
+        self.assertNotIn("::date", sql)
+
+    @skipUnless(connection.vendor == "postgresql", "실행 계획은 PostgreSQL 기준")
+    def test_today_timeline_plan_uses_session_index_without_sort(self):
+        qs = AiChatLogs.objects.filter(session_id=1, **today_filter()).order_by(
+            "-created_at", "-id"
+        )[:20]
+        with connection.cursor() as cur:
+            cur.execute("SET LOCAL enable_seqscan = off")
+        plan = qs.explain()
+        # (session, -created_at, -id) 순서 그대로 읽어 정렬 단계가 없어야 함
+        self.assertIn("Index Scan using idx_log_session_created", plan)
+        self.assertNotIn("Backward", plan)
+        self.assertNotIn("Sort", plan)
+
+    def test_session_timeline_only_today(self):
+        session = ChatSession.objects.create()
+        old = AiChatLogs.objects.create(
+            session=session, user_question="어제", ai_answer="a"
+        )
+        AiChatLogs.objects.filter(id=old.id).update(
+            created_at=day_range()[0] - timedelta(seconds=1)
+        )
+        new = AiChatLogs.objects.create(
+            session=session, user_question="오늘", ai_answer="b"
+        )
+        resp = APIClient().get(f"/api/chat/session/?session_id={session.id}")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([m["id"] for m in resp.json()["messages"]], [new.id, new.id])
+        self.assertFalse(resp.json()["has_more"])
+
+
+class SessionTimelineTests(TestCase):
+    def setUp(self):
+        self.session = ChatSession.objects.create()
+        # 같은 시각 로그가 섞여도 (created_at, id) 커서로 빠짐/중복 없이 넘김
+        at = timezone.now()
+        self.ids = [
+            AiChatLogs.objects.create(
+                session=self.session, user_question=f"q{i}", ai_answer=f"a{i}"
+            ).id
+            for i in range(5)
+        ]
+        AiChatLogs.objects.filter(id__in=self.ids[1:4]).update(created_at=at)
+
+    def _get(self, **params):
+        return APIClient().get(
+            "/api/chat/session/", {"session_id": self.session.id, **params}
+        )
+
+    def test_pages_with_cursor_in_one_query(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            with self.assertNumQueries(1):
+                body = self._get(**params).json()
+            seen = [m["id"] for m in body["messages"][::2]] + seen
+            cursor = body["next_cursor"]
+            self.assertEqual(body["has_more"], cursor is not None)
+            if cursor is None:
+                break
+        expected = AiChatLogs.objects.order_by("created_at", "id").values_list(
+            "id", flat=True
+        )
+        self.assertEqual(seen, list(expected))
+        self.assertEqual(sorted(seen), self.ids)
+
+    def test_missing_session_and_bad_cursor(self):
+        with self.assertNumQueries(1):
+            resp = APIClient().get("/api/chat/session/", {"session_id": 999})
+        self.assertEqual(resp.status_code, 404)
+        resp = self._get(cursor="!!")
+        self.assertEqual(resp.json()["error_status"], "invalid_cursor")
+        resp = self._get(limit="abc")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error_status"], "invalid_limit")
+
+    def test_deprecated_before_id_still_pages(self):
+        body = self._get(limit=2).json()
+        self.assertEqual(body["next_before_id"], body["messages"][0]["id"])
+        older = self._get(limit=2, before_id=body["next_before_id"]).json()
+        by_cursor = self._get(limit=2, cursor=body["next_cursor"]).json()
+        self.assertEqual(older["messages"], by_cursor["messages"])
+        resp = self._get(before_id=10**9)
+        self.assertEqual(resp.json()["error_status"], "invalid_cursor")
+
+
+class ChatLogViewSetTests(TestCase):
+    def setUp(self):
+        self.session = ChatSession.objects.create()
+        for i in range(5):
+            AiChatLogs.objects.create(
+                session=self.session,
+                user_question=f"q{i}",
+                ai_answer=f"a{i}",
+                context={"big": "x" * 100},
+            )
+
+    def test_cursor_pages_without_context(self):
+        resp = APIClient().get(
+            "/api/chat/logs/", {"session_id": self.session.id, "limit": 2}
+        )
+        body = resp.json()
+        self.assertEqual([r["user_question"] for r in body["results"]], ["q4", "q3"])
+        self.assertNotIn("context", body["results"][0])
+        self.assertIsNotNone(body["next"])
+
+        resp = APIClient().get(body["next"] + "&fields=id,context")
+        rows = resp.json()["results"]
+        self.assertEqual(set(rows[0]), {"id", "context"})
+        self.assertEqual(rows[0]["context"], {"big": "x" * 100})
+
+        resp = APIClient().get("/api/chat/logs/", {"fields": "id,password"})
+        self.assertEqual(resp.json()["error_status"], "invalid_fields")
+
+    def test_export_ndjson_admin_only(self):
+        client = APIClient()
+        self.assertIn(client.get("/api/chat/logs/export/").status_code, (401, 403))
+
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="1234"
+        )
+        client.force_authenticate(admin)
+        resp = client.get(
+            "/api/chat/logs/export/",
+            {"session_id": self.session.id, "fields": "id,session,user_question"},
+        )
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [r["user_question"] for r in rows], [f"q{i}" for i in range(5)]
+        )
+        self.assertEqual(rows[0]["session"], self.session.id)
+
+    @patch("rest_framework.permissions.IsAdminUser.has_permission", return_value=True)
+    async def test_export_streams_async_under_asgi(self, _perm):
+        resp = await AsyncClient().get(
+            "/api/chat/logs/export/",
+            {"session_id": self.session.id, "fields": "id,user_question"},
+        )
+        self.assertTrue(resp.is_async)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(
+            [r["user_question"] for r in lines], [f"q{i}" for i in range(5)]
+        )
+
+
+@override_settings(CHAT_LOG_WRITE_BEHIND=True)
+@patch("apps.chat.services.log_buffer._ensure_local_flusher")
+class LogWriteBehindTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+        log_buffer.flush_all()
+
+    def test_buffered_until_flushed(self, _flusher):
+        session = ChatSession.objects.create()
+        turn = prepare_turn(
+            user=None,
+            session=session,
+            user_message="안녕",
+            weather=None,
+            profile=None,
+            setting=None,
+        )
+        with self.assertNumQueries(0):
+            out = save_turn(
+                user=None,
+                session=session,
+                turn=turn,
+                user_message="안녕",
+                answer="반가워",
+                model_name="m",
+            )
+        self.assertIsNone(out["log_id"])
+        self.assertFalse(AiChatLogs.objects.exists())
+        # 플러시 전에도 다음 프롬프트 히스토리에는 보임
+        self.assertEqual(recent_turns.get_recent(session.id), [("안녕", "반가워")])
+        self.assertEqual(log_buffer.stats()["pending"], 1)
+
+        self.assertEqual(log_buffer.flush_all(), 1)
+        log = AiChatLogs.objects.get()
+        self.assertEqual(log.created_at, out["created_at"])
+        self.assertEqual(log.session_id, session.id)
+        session.refresh_from_db()
+        self.assertEqual(session.last_activity_at, out["created_at"])
+        self.assertEqual(log_buffer.stats()["pending"], 0)
+
+    def _enqueue(self, session, question):
+        log_buffer.enqueue(
+            user_id=None,
+            session_id=session.id,
+            model_setting_id=None,
+            model_name="m",
+            user_question=question,
+            ai_answer="a",
+            context={},
+            created_at=timezone.now(),
+        )
+
+    def test_bad_row_is_dead_lettered_without_blocking(self, _flusher):
+        session = ChatSession.objects.create()
+        dropped = log_buffer.stats()["dead_lettered"]
+        self._enqueue(session, "q1")
+        self._enqueue(session, None)  # NOT NULL 위반 → 이 행만 버림
+        self._enqueue(session, "q2")
+
+        with self.assertLogs("apps.chat.services.log_buffer", "ERROR"):
+            self.assertEqual(log_buffer.flush_all(), 2)
+        self.assertEqual(
+            list(
+                AiChatLogs.objects.order_by("id").values_list(
+                    "user_question", flat=True
+                )
+            ),
+            ["q1", "q2"],
+        )
+        st = log_buffer.stats()
+        self.assertEqual(st["pending"], 0)
+        self.assertEqual(st["dead_lettered"], dropped + 1)
+
+    def test_redelivered_item_is_saved_once(self, _flusher):
+        session = ChatSession.objects.create()
+        dropped = log_buffer.stats()["dead_lettered"]
+        self._enqueue(session, "q1")
+        with log_buffer._local.lock:
+            item = log_buffer._local.queue[0]
+            log_buffer._local.queue.append(item)  # 같은 배치 안의 중복
+        self.assertEqual(log_buffer.flush_all(), 1)
+
+        # 잠금이 만료돼 다른 플러셔가 이미 저장한 항목을 다시 읽은 경우
+        with log_buffer._local.lock:
+            log_buffer._local.queue.append(item)
+        self.assertEqual(log_buffer.flush_all(), 0)
+        self.assertEqual(AiChatLogs.objects.count(), 1)
+        self.assertEqual(log_buffer.stats()["dead_lettered"], dropped)
+
+    @patch("apps.chat.services.log_buffer.redis_client")
+    def test_buffer_outage_falls_back_to_insert(self, mock_redis, _flusher):
+        mock_redis.return_value.rpush.side_effect = ConnectionError("redis down")
+        session = ChatSession.objects.create()
+        turn = prepare_turn(
+            user=None,
+            session=session,
+            user_message="안녕",
+            weather=None,
+            profile=None,
+            setting=None,
+        )
+        out = save_turn(
+            user=None,
+            session=session,
+            turn=turn,
+            user_message="안녕",
+            answer="반가워",
+            model_name="m",
+        )
+        self.assertIsNotNone(out["log_id"])
+        self.assertEqual(AiChatLogs.objects.get().ai_answer, "반가워")
+
+
+@override_settings(CHAT_LLM_MAX_ATTEMPTS=2)
+class LLMDeadlineTests(TestCase):
+    WEATHER = {"temperature": 3, "feels_like": 1, "humidity": 40, "condition": "Clear"}
+
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+
+    def _send(self, **kwargs):
+        return chat_and_log(
+            user=None,
+            session=ChatSession.objects.create(),
+            user_message="저녁 뭐 먹지",
+            profile=None,
+            **{"weather": self.WEATHER, **kwargs},
+        )
+
+    @patch("apps.chat.services.chat.client")
+    def test_retries_then_falls_back_to_rule(self, mock_client):
+        err = openai.APITimeoutError(request=httpx.Request("POST", "http://x"))
+        mock_client.chat.completions.create.side_effect = err
+        out = self._send()
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+        self.assertIn("timeout", mock_client.chat.completions.create.call_args.kwargs)
+        self.assertEqual(out["served_by"], "fallback_rule")
+        self.assertEqual(out["answer"], rule_answer(1, "Clear")[0])
+        log = AiChatLogs.objects.get()
+        self.assertEqual(log.context["served_by"], "fallback_rule")
+
+    @patch("apps.chat.services.chat.client")
+    def test_expired_deadline_skips_call(self, mock_client):
+        out = self._send(deadline=llm.Deadline(0))
+        mock_client.chat.completions.create.assert_not_called()
+        self.assertEqual(out["served_by"], "fallback_rule")
+
+        with self.assertRaises(llm.LLMUnavailable):
+            self._send(weather=None, deadline=llm.Deadline(0))
+
+    @patch("apps.chat.services.chat.client")
+    def test_llm_answer_recorded(self, mock_client):
+        msg = SimpleNamespace(content="비빔밥 어때요")
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=msg)]
+        )
+        self.assertEqual(self._send()["served_by"], "llm")
+
+
+class LLMTelemetryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+
+    @patch("apps.chat.services.chat.client")
+    def test_stream_records_usage_and_latency(self, mock_client):
+        usage = SimpleNamespace(
+            prompt_tokens=120,
+            completion_tokens=7,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+        )
+        mock_client.chat.completions.create.return_value = iter(
+            [_chunk("안녕"), SimpleNamespace(choices=[], usage=usage)]
+        )
+        events = list(
+            stream_chat_and_log(
+                user=None,
+                session=ChatSession.objects.create(),
+                user_message="안녕",
+                weather=None,
+                profile=None,
+            )
+        )
+        self.assertEqual(events[-1]["served_by"], "llm")
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs["stream_options"], {"include_usage": True})
+        log = AiChatLogs.objects.get()
+        self.assertEqual(
+            (
+                log.served_by,
+                log.prompt_tokens,
+                log.completion_tokens,
+                log.cached_tokens,
+            ),
+            ("llm", 120, 7, 64),
+        )
+        self.assertIsNotNone(log.ttft_ms)
+        self.assertGreaterEqual(log.latency_ms, log.ttft_ms)
+
+    def test_llm_stats_percentiles_and_daily_tokens(self):
+        for ms in range(1, 101):
+            AiChatLogs.objects.create(
+                user_question="q",
+                ai_answer="a",
+                served_by="llm",
+                latency_ms=ms,
+                ttft_ms=ms,
+                prompt_tokens=10,
+                completion_tokens=2,
+                cached_tokens=5 if ms % 2 else 0,
+            )
+        AiChatLogs.objects.create(user_question="q", ai_answer="a", served_by="rule")
+
+        admin = get_user_model().objects.create_superuser(
+            email="stats@test.com", password="1234"
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        body = client.get("/api/chat/llm-stats/", {"days": 1}).json()
+        self.assertEqual(body["latency_ms"]["count"], 100)
+        self.assertAlmostEqual(body["latency_ms"]["p50"], 50.5)
+        self.assertAlmostEqual(body["latency_ms"]["p99"], 99.0, delta=0.1)
+        self.assertEqual(body["served_by"], {"llm": 100, "rule": 1})
+        (today,) = body["daily"]
+        self.assertEqual((today["calls"], today["llm_calls"]), (101, 100))
+        self.assertEqual(today["prompt_tokens"], 1000)
+        self.assertEqual(today["cached_tokens"], 250)
+        self.assertEqual(today["cached_ratio"], 0.25)
+        self.assertEqual(body["cached_ratio"], 0.25)
+
+    def test_llm_stats_samples_recent_rows_without_db_percentiles(self):
+        for ms in range(1, 101):
+            AiChatLogs.objects.create(
+                user_question="q", ai_answer="a", served_by="llm", latency_ms=ms
+            )
+        with patch.object(telemetry, "SAMPLE_LIMIT", 10):
+            stats = telemetry.llm_stats(1)
+        # 건수는 전체, 백분위는 최근 10건(91~100)
+        self.assertEqual(stats["latency_ms"]["count"], 100)
+        self.assertAlmostEqual(stats["latency_ms"]["p50"], 95.5)
+        self.assertEqual(stats["by_route"][":-"]["count"], 100)
+
+    def test_percentile_cont_sql(self):
+        qs = AiChatLogs.objects.annotate(p=telemetry.PercentileCont("latency_ms", 95))
+        self.assertIn("PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY", str(qs.query))
+
+    def test_prompt_prefix_is_stable_across_requests(self):
+        def messages(weather, profile, question):
+            return prepare_turn(
+                user=None,
+                session=ChatSession.objects.create(),
+                user_message=question,
+                weather=weather,
+                profile=profile,
+                setting=None,
+            )["messages"]
+
+        a = messages({"temperature": 3, "condition": "Rain"}, {"age": 20}, "안녕")
+        b = messages(None, None, "점심 추천")
+        n = len(STATIC_PREFIX)
+        self.assertEqual(json.dumps(a[:n]), json.dumps(b[:n]))
+        # 요청별 안내는 고정 접두부·히스토리 뒤, 질문 바로 앞
+        self.assertIn("현재 날씨", a[-2]["content"])
+        self.assertEqual(a[-1], {"role": "user", "content": "안녕"})
+
+
+class ModelRoutingTests(TestCase):
+    def test_route_rules(self):
+        route = model_picker.route_model
+        self.assertEqual(route("안녕", set()), ("gpt-4o-mini", "simple"))
+        self.assertEqual(route("우산 챙길까", {intent.OUTFIT}).reason, "outfit")
+        self.assertEqual(route("두 노트북 비교해줘", set()).model, "gpt-4o")
+        self.assertEqual(route("가" * 200, set()).reason, "long")
+        self.assertEqual(route("응", set(), history_turns=6).reason, "long_history")
+        with override_settings(CHAT_MODEL_ROUTING={"small_model": "tiny"}):
+            self.assertEqual(route("안녕", set()).model, "tiny")
+
+    @patch("apps.chat.services.chat.client")
+    def test_routed_model_is_called_and_logged(self, mock_client):
+        answer_cache.clear()
+        msg = SimpleNamespace(content="안녕하세요")
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=msg)]
+        )
+        resp = APIClient().post(
+            "/api/chat/send/", {"message": "안녕", "weather": {}}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        self.assertEqual(kwargs["model"], "gpt-4o-mini")
+        log = AiChatLogs.objects.get()
+        self.assertEqual(log.model_name, "gpt-4o-mini")
+        self.assertEqual(
+            log.context["route"], {"model": "gpt-4o-mini", "reason": "simple"}
+        )
+
+
+class SessionWeatherTests(TestCase):
+    CURRENT: Dict[str, Any] = {
+        "base_time": 0,
+        "temperature": 12.0,
+        "feels_like": 10.0,
+        "humidity": 60,
+        "wind_speed": 1.0,
+        "rain_volume": None,
+        "condition": "Clear",
+        "icon": None,
+        "raw": {},
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    @patch("apps.chat.services.chat.client")
+    @patch("apps.weather.services.openweather.get_current")
+    def test_one_fetch_per_session(self, mock_current, mock_client):
+        mock_current.return_value = self.CURRENT
+        msg = SimpleNamespace(content="답변")
+        mock_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=msg)]
+        )
+        body = {"lat": 37.5665, "lon": 126.978}
+        api = APIClient()
+        sid = None
+        for i in range(10):
+            resp = api.post(
+                "/api/chat/send/",
+                {
+                    **body,
+                    "message": f"질문 {i}",
+                    **({"session_id": sid} if sid else {}),
+                },
+                format="json",
+            )
+            self.assertEqual(resp.status_code, 200)
+            sid = resp.json()["session_id"]
+        self.assertEqual(mock_current.call_count, 1)
+        self.assertEqual(AiChatLogs.objects.filter(session_id=sid).count(), 10)
+        self.assertEqual(
+            ChatSession.objects.get(id=sid).weather_snapshot["temperature"], 12.0
+        )
+
+    @patch("apps.chat.services.session_weather._schedule_refresh")
+    @patch("apps.weather.services.openweather.get_current")
+    def test_stale_snapshot_refreshes_in_background(self, mock_current, mock_refresh):
+        mock_current.return_value = self.CURRENT
+        s = ChatSession.objects.create()
+        key = session_weather.location_key(session_weather.Place(37.5, 127.0))
+        session_weather.store_snapshot(s.id, key, {"temperature": 3})
+        ChatSession.objects.filter(id=s.id).update(
+            weather_fetched_at=timezone.now() - timedelta(minutes=20)
+        )
+        cache.clear()  # DB 컬럼에서 다시 읽기
+
+        weather = session_weather.session_weather(s, lat=37.5, lon=127.0)
+        self.assertEqual(weather, {"temperature": 3})
+        mock_refresh.assert_called_once()
+        mock_current.assert_not_called()
+
+        # 위치가 바뀌면 스냅샷을 쓰지 않고 바로 조회
+        weather = session_weather.session_weather(s, lat=35.1, lon=129.0)
+        self.assertEqual(weather["temperature"], 12.0)
+        self.assertEqual(mock_current.call_count, 1)
+
+    @patch("apps.chat.services.session_weather.get_user_base_location")
+    @patch("apps.chat.services.session_weather.get_weather_for_chat")
+    def test_snapshot_key_follows_place_name_and_base_location(
+        self, mock_weather, mock_base
+    ):
+        mock_weather.return_value = {"temperature": 5}
+        s = ChatSession.objects.create()
+        Place = session_weather.Place
+
+        session_weather.session_weather(s, lat=37.5, lon=127.0, city="서울")
+        session_weather.session_weather(s, lat=37.5, lon=127.0, city="서울")
+        self.assertEqual(mock_weather.call_count, 1)
+        # 같은 격자라도 지명이 다르면 새로 조회
+        session_weather.session_weather(s, lat=37.5, lon=127.0, city="과천")
+        self.assertEqual(mock_weather.call_count, 2)
+
+        # 좌표가 없으면 기본 위치가 바뀔 때 새로 조회
+        mock_base.return_value = SimpleNamespace(id=1)
+        session_weather.session_weather(s)
+        session_weather.session_weather(s)
+        self.assertEqual(mock_weather.call_count, 3)
+        mock_base.return_value = SimpleNamespace(id=2)
+        session_weather.session_weather(s)
+        self.assertEqual(mock_weather.call_count, 4)
+        self.assertEqual(session_weather.location_key(Place()), "base:2")
+        self.assertLessEqual(
+            len(session_weather.location_key(Place(37.5, 127.0, "가" * 50, "나" * 50))),
+            ChatSession._meta.get_field("weather_key").max_length,
+        )
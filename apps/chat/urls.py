@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from apps.chat.views import AiChatViewSet, ChatLogViewSet
+from apps.chat.views import AiChatViewSet, ChatLogViewSet, send_async
 
 router = DefaultRouter()
 
@@ -9,5 +9,6 @@ router.register(r"", AiChatViewSet, basename="chat")
 router.register(r"logs", ChatLogViewSet, basename="chat_logs")
 
 urlpatterns = [
+    path("send/async/", send_async, name="chat-send-async"),
     path("", include(router.urls)),
 ]
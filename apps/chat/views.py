@@ -1,8 +1,15 @@
+import asyncio
+import json
 import logging
 import uuid
-from datetime import timedelta
+from datetime import date
+from typing import List
 
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.utils import (
     OpenApiExample,
     OpenApiParameter,
@@ -11,21 +18,188 @@ from drf_spectacular.utils import (
 )
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
 
-from apps.chat.models import AiChatLogs, ChatSession
-from apps.chat.serializers import AiChatLogReadSerializer, ChatSendSerializer
-from apps.chat.services.chat import chat_and_log
-from apps.chat.services.weather_for_chat import get_weather_for_chat
+from apps.chat.models import AiChatLogs
+from apps.chat.pagination import ChatLogCursorPagination
+from apps.chat.serializers import (
+    LOG_FIELDS,
+    AiChatLogReadSerializer,
+    ChatSendSerializer,
+    parse_log_fields,
+)
+from apps.chat.services import log_buffer, telemetry
+from apps.chat.services.answer_cache import answer_cache
+from apps.chat.services.chat import (
+    achat_and_log,
+    astream_chat_and_log,
+    chat_and_log,
+    setting_for_weather,
+    stream_chat_and_log,
+)
+from apps.chat.services.session_weather import asession_weather, session_weather
+from apps.chat.services.sessions import SessionNotFound, resolve_session
+from apps.chat.services.timeline import (
+    DEFAULT_LIMIT,
+    cursor_for_log,
+    decode_cursor,
+    session_page,
+)
+from apps.core.dates import day_range, today_filter
+from apps.core.streaming import is_asgi, streaming_body
+from apps.users.authentication import CustomJWTAuthentication
 
 logger = logging.getLogger(__name__)
 
+SESSION_NOT_FOUND = {
+    "error": "세션을 찾을 수 없습니다.",
+    "error_status": "session_not_found",
+}
+CHAT_FAILED = {"error": "AI 대화 실패", "error_status": "chat_failed"}
+
+
+def _sse(event: str, data: dict) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+def _sse_frame(ev: dict) -> bytes:
+    if ev["type"] == "delta":
+        return _sse("delta", {"text": ev["text"]})
+    return _sse(
+        "done",
+        {
+            "session_id": ev["session_id"],
+            "log_id": ev["log_id"],
+            "created_at": timezone.localtime(ev["created_at"]).isoformat(),
+            "served_by": ev["served_by"],
+        },
+    )
+
+
+def _sse_chat_events(events):
+    """stream_chat_and_log 이벤트 → SSE 프레임 (delta/done/error)"""
+    try:
+        for ev in events:
+            yield _sse_frame(ev)
+    except Exception:
+        logger.exception("chat stream failed")
+        yield _sse("error", CHAT_FAILED)
+
+
+async def _asse_chat_events(events):
+    """_sse_chat_events 의 비동기 버전 (ASGI: 토큰마다 바로 전송)"""
+    try:
+        async for ev in events:
+            yield _sse_frame(ev)
+    except Exception:
+        logger.exception("chat stream failed")
+        yield _sse("error", CHAT_FAILED)
+
+
+def _json(data: dict, status_code: int = 200) -> JsonResponse:
+    return JsonResponse(
+        data, status=status_code, json_dumps_params={"ensure_ascii": False}
+    )
+
+
+@csrf_exempt
+async def send_async(request):
+    """AiChatViewSet.send 의 ASGI 비동기 버전 (POST /api/chat/send/async/)
+
+    날씨는 세션 스냅샷을 재사용하고(없을 때만 OpenWeather 비동기 호출), OpenAI 호출은
+    AsyncOpenAI 로 기다리므로 워커 하나가 여러 대화를 동시에 처리한다.
+    """
+    if request.method != "POST":
+        return _json({"detail": "method_not_allowed"}, 405)
+
+    try:
+        auth = await sync_to_async(CustomJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return _json({"detail": str(e.detail)}, 401)
+    user = auth[0] if auth else None
+
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return _json({"error": "잘못된 JSON", "error_status": "invalid_json"}, 400)
+    ser = ChatSendSerializer(data=body)
+    if not ser.is_valid():
+        return _json(ser.errors, 400)
+    data = ser.validated_data
+    text = data.get("detail") or data.get("message") or ""
+
+    # 세션 확인과 날씨 → 모델 설정 조회를 동시에
+    session_id = data.get("session_id")
+    session_task = asyncio.ensure_future(
+        sync_to_async(resolve_session)(user=user, session_id=session_id)
+    )
+
+    async def weather_and_setting():
+        weather = data.get("weather")
+        if not weather:
+            try:
+                weather = await asession_weather(
+                    session_id,
+                    session_task,
+                    user=user,
+                    lat=data.get("lat"),
+                    lon=data.get("lon"),
+                    city=data.get("city"),
+                    district=data.get("district"),
+                )
+            except SessionNotFound:
+                return None, None  # 404 는 session_task 쪽에서 처리
+            except Exception:
+                logger.exception("asession_weather failed")
+                weather = None
+        return weather, await sync_to_async(setting_for_weather)(weather)
+
+    try:
+        chat_session, (weather, setting) = await asyncio.gather(
+            session_task, weather_and_setting()
+        )
+    except SessionNotFound:
+        return _json(SESSION_NOT_FOUND, 404)
+
+    try:
+        result = await achat_and_log(
+            user=user,
+            session=chat_session,
+            user_message=text,
+            weather=weather,
+            profile=data.get("profile"),
+            setting=setting,
+        )
+    except Exception:
+        logger.exception("async chat send failed")
+        return _json(CHAT_FAILED, 502)
+
+    return _json(
+        {
+            "response": result["answer"],
+            "session_id": chat_session.id,
+            "created_at": timezone.localtime(result["created_at"]).isoformat(),
+            "served_by": result["served_by"],
+        }
+    )
+
 
 class AiChatViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
 
     @extend_schema(
         request=ChatSendSerializer,
+        parameters=[
+            OpenApiParameter(
+                name="stream",
+                type=OpenApiTypes.BOOL,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="1 이면 text/event-stream 으로 토큰 단위 응답 (delta → done)",
+            ),
+        ],
         responses={200: OpenApiTypes.OBJECT},
         examples=[
             OpenApiExample(
@@ -52,14 +226,17 @@ class AiChatViewSet(viewsets.ViewSet):
         city = ser.validated_data.get("city")
         district = ser.validated_data.get("district")
 
-        SESSION_TTL_MINUTES = 10
-
         session_id = ser.validated_data.get("session_id")
-        chat_session = None
+
+        try:
+            chat_session = resolve_session(user=user, session_id=session_id)
+        except SessionNotFound:
+            return Response(SESSION_NOT_FOUND, status=status.HTTP_404_NOT_FOUND)
 
         if not weather:
             try:
-                weather = get_weather_for_chat(
+                weather = session_weather(
+                    chat_session,
                     user=user,
                     lat=lat,
                     lon=lon,
@@ -67,39 +244,26 @@ class AiChatViewSet(viewsets.ViewSet):
                     district=district,
                 )
             except Exception:
-                logger.exception("get_weather_for_chat failed")
+                logger.exception("session_weather failed")
                 weather = None
 
-        if session_id is not None:
-            chat_session = ChatSession.objects.filter(id=session_id).first()
-            if chat_session is None:
-                return Response(
-                    {
-                        "error": "세션을 찾을 수 없습니다.",
-                        "error_status": "session_not_found",
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-
-        if chat_session is None and user is not None:
-            last_session = (
-                ChatSession.objects.filter(user=user).order_by("-created_at").first()
+        if request.query_params.get("stream") in ("1", "true"):
+            turn_kwargs = dict(
+                user=user,
+                session=chat_session,
+                user_message=text,
+                weather=weather,
+                profile=profile,
             )
-
-            if last_session:
-                last_log = (
-                    AiChatLogs.objects.filter(session=last_session)
-                    .order_by("-created_at")
-                    .first()
-                )
-
-                if last_log and last_log.created_at >= timezone.now() - timedelta(
-                    minutes=SESSION_TTL_MINUTES
-                ):
-                    chat_session = last_session
-
-        if chat_session is None:
-            chat_session = ChatSession.objects.create(user=user)
+            # ASGI 는 동기 이터레이터를 끝까지 모아 보내므로 비동기 스트림으로
+            if is_asgi(request):
+                body = _asse_chat_events(astream_chat_and_log(**turn_kwargs))
+            else:
+                body = _sse_chat_events(stream_chat_and_log(**turn_kwargs))
+            resp = StreamingHttpResponse(body, content_type="text/event-stream")
+            resp["Cache-Control"] = "no-cache"
+            resp["X-Accel-Buffering"] = "no"  # nginx 버퍼링 끄기
+            return resp
 
         try:
             result = chat_and_log(
@@ -108,22 +272,19 @@ class AiChatViewSet(viewsets.ViewSet):
                 user_message=text,
                 weather=weather,
                 profile=profile,
-                model_name="gpt-4o",
             )
             return Response(
                 {
                     "response": result["answer"],
                     "session_id": chat_session.id,
                     "created_at": timezone.localtime(result["created_at"]).isoformat(),
+                    "served_by": result["served_by"],
                 },
                 status=status.HTTP_200_OK,
             )
         except Exception:
             logger.exception("chat send faild")
-            return Response(
-                {"error": "AI 대화 실패", "error_status": "chat_failed"},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
+            return Response(CHAT_FAILED, status=status.HTTP_502_BAD_GATEWAY)
 
     @extend_schema(
         parameters=[
@@ -139,14 +300,22 @@ class AiChatViewSet(viewsets.ViewSet):
                 type=OpenApiTypes.INT,
                 required=False,
                 location=OpenApiParameter.QUERY,
-                description="가져올 로그 개수 (기본 20)",
+                description="가져올 로그 개수 (기본 20, 최대 100)",
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="이전 응답의 next_cursor (더 오래된 로그 조회, 무한스크롤)",
             ),
             OpenApiParameter(
                 name="before_id",
                 type=OpenApiTypes.INT,
                 required=False,
                 location=OpenApiParameter.QUERY,
-                description="이 ID 보다 작은 로그만 조회 (무한스크롤)",
+                deprecated=True,
+                description="(다음 릴리스에서 제거) 이 ID 로그보다 오래된 로그, cursor 사용",
             ),
         ],
         responses={200: OpenApiTypes.OBJECT},
@@ -154,9 +323,9 @@ class AiChatViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["GET"], url_path="session")
     def session(self, request):
         sid_param = request.query_params.get("session_id")
-        limit = int(request.query_params.get("limit") or 20)
-        before_id = request.query_params.get("before_id")
-        today = timezone.localdate()
+        cursor_param = request.query_params.get("cursor")
+        # 지원 종료 예정: cursor 가 없을 때만 사용
+        before_param = request.query_params.get("before_id")
 
         if not sid_param:
             return Response(
@@ -178,34 +347,37 @@ class AiChatViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if not ChatSession.objects.filter(id=session_id).exists():
+        try:
+            limit = int(request.query_params.get("limit") or DEFAULT_LIMIT)
+        except ValueError:
             return Response(
-                {"error": "세션 없음", "error_status": "session_empty"},
-                status=status.HTTP_404_NOT_FOUND,
+                {"error": "limit 은 숫자여야 합니다.", "error_status": "invalid_limit"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        qs = AiChatLogs.objects.filter(
-            session_id=session_id,
-            created_at__date=today,
-        )
-
-        if before_id:
-            try:
-                before_id_int = int(before_id)
-                qs = qs.filter(id__lt=before_id_int)
-            except ValueError:
-                pass
-
-        qs = qs.order_by("-created_at")[:limit]
-
-        logs = list(qs.values("id", "user_question", "ai_answer", "created_at"))
-        logs.reverse()
+        try:
+            if cursor_param:
+                cursor = decode_cursor(cursor_param)
+            elif before_param:
+                cursor = cursor_for_log(session_id, int(before_param))
+                if cursor is None:
+                    raise ValueError("unknown before_id")
+            else:
+                cursor = None
+        except ValueError:
+            return Response(
+                {"error": "잘못된 cursor 입니다.", "error_status": "invalid_cursor"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        if not logs:
+        # 세션 존재 확인 + 페이지 + has_more 를 한 쿼리로
+        page = session_page(session_id, limit=limit, cursor=cursor)
+        if page is None or not page["logs"]:
             return Response(
                 {"error": "세션 없음", "error_status": "session_empty"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        logs = page["logs"]
 
         out = []
         for row in logs:
@@ -229,31 +401,117 @@ class AiChatViewSet(viewsets.ViewSet):
                 }
             )
 
-        oldest_id = logs[0]["id"]
-        has_more = AiChatLogs.objects.filter(
-            session_id=session_id,
-            created_at__date=today,
-            id__lt=oldest_id,
-        ).exists()
-
         return Response(
             {
                 "session_id": session_id,
                 "created_at": timezone.localtime(logs[0]["created_at"]).isoformat(),
                 "messages": out,
-                "next_before_id": oldest_id if has_more else None,
-                "has_more": has_more,
+                "next_cursor": page["next_cursor"],
+                # 지원 종료 예정 (before_id 클라이언트용)
+                "next_before_id": logs[0]["id"] if page["has_more"] else None,
+                "has_more": page["has_more"],
             },
             status=status.HTTP_200_OK,
         )
 
+    @extend_schema(
+        summary="GPT 답변 캐시 적중률 (관리자 전용, 현재 워커 기준)",
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="answer-cache",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def answer_cache_stats(self, request):
+        return Response(answer_cache.stats(), status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="LLM 호출 지연(p50/p95/p99)·토큰 일별 통계 (관리자 전용)",
+        parameters=[
+            OpenApiParameter(
+                name="days",
+                type=OpenApiTypes.INT,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="오늘 포함 최근 일수 (기본 7, 최대 90)",
+            )
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="llm-stats",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def llm_stats(self, request):
+        try:
+            days = int(request.query_params.get("days") or 7)
+        except ValueError:
+            days = 7
+        return Response(
+            telemetry.llm_stats(max(1, min(days, 90))), status=status.HTTP_200_OK
+        )
+
+    @extend_schema(
+        summary="대화 로그 지연 저장 버퍼 상태 (관리자 전용, 대기 건수/지연 시간)",
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="log-buffer",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def log_buffer_stats(self, request):
+        return Response(
+            {"enabled": log_buffer.enabled(), **log_buffer.stats()},
+            status=status.HTTP_200_OK,
+        )
+
+
+INVALID_FIELDS = {
+    "error": f"fields 는 {', '.join(LOG_FIELDS)} 중에서 골라야 합니다.",
+    "error_status": "invalid_fields",
+}
+EXPORT_CHUNK_SIZE = 2000
+FIELDS_PARAM = OpenApiParameter(
+    name="fields",
+    type=OpenApiTypes.STR,
+    required=False,
+    location=OpenApiParameter.QUERY,
+    description="쉼표로 구분한 응답 필드 (목록 기본값은 context 제외)",
+)
+
+
+def _ndjson_rows(rows, batch: int = EXPORT_CHUNK_SIZE):
+    """행 → NDJSON 바이트 (batch 행씩 묶어서 한 청크)"""
+    lines: List[bytes] = []
+    for row in rows:
+        lines.append(
+            (json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + "\n").encode(
+                "utf-8"
+            )
+        )
+        if len(lines) >= batch:
+            yield b"".join(lines)
+            lines.clear()
+    if lines:
+        yield b"".join(lines)
+
 
 class ChatLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = AiChatLogReadSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = ChatLogCursorPagination
+
+    # 목록/상세 응답 필드 (list/retrieve 에서 ?fields= 로 결정)
+    log_fields = LOG_FIELDS
 
     def get_queryset(self):
-        qs = AiChatLogs.objects.all().order_by("-created_at")
+        qs = AiChatLogs.objects.only(*self.log_fields).order_by("-created_at", "-id")
 
         sid = self.request.query_params.get("session_id")
         if sid:
@@ -263,7 +521,103 @@ class ChatLogViewSet(viewsets.ReadOnlyModelViewSet):
         if user:
             qs = qs.filter(user=user)
 
-        today = timezone.localdate()
-        qs = qs.filter(created_at__date=today)
+        qs = qs.filter(**today_filter())
 
         return qs
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.log_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            FIELDS_PARAM,
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="페이지 크기 (기본 20, 최대 100)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        fields = parse_log_fields(request.query_params.get("fields"))
+        if fields is None:
+            return Response(INVALID_FIELDS, status=status.HTTP_400_BAD_REQUEST)
+        self.log_fields = fields
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(parameters=[FIELDS_PARAM])
+    def retrieve(self, request, *args, **kwargs):
+        fields = parse_log_fields(request.query_params.get("fields"), LOG_FIELDS)
+        if fields is None:
+            return Response(INVALID_FIELDS, status=status.HTTP_400_BAD_REQUEST)
+        # 상세는 조회 키(id)가 필요
+        self.log_fields = tuple(dict.fromkeys(("id", *fields)))
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="대화 로그 NDJSON 내보내기 (관리자 전용)",
+        parameters=[
+            FIELDS_PARAM,
+            OpenApiParameter(
+                name="session_id",
+                type=OpenApiTypes.INT,
+                required=False,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="date",
+                type=OpenApiTypes.DATE,
+                required=False,
+                location=OpenApiParameter.QUERY,
+                description="조회 날짜 YYYY-MM-DD (Asia/Seoul, 기본 오늘)",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="export",
+        permission_classes=[permissions.IsAdminUser],
+        pagination_class=None,
+    )
+    def export(self, request):
+        fields = parse_log_fields(request.query_params.get("fields"))
+        if fields is None:
+            return Response(INVALID_FIELDS, status=status.HTTP_400_BAD_REQUEST)
+
+        day = None
+        if date_param := request.query_params.get("date"):
+            try:
+                day = date.fromisoformat(date_param)
+            except ValueError:
+                return Response(
+                    {
+                        "error": "date 는 YYYY-MM-DD 형식이어야 합니다.",
+                        "error_status": "invalid_date",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        start, end = day_range(day)
+
+        qs = AiChatLogs.objects.filter(created_at__gte=start, created_at__lt=end)
+        if sid := request.query_params.get("session_id"):
+            qs = qs.filter(session_id=sid)
+        # FK 는 *_id 컬럼 그대로 (JOIN 없음)
+        columns = [f"{f}_id" if f in ("user", "session") else f for f in fields]
+        rows = (
+            dict(zip(fields, values))
+            for values in qs.order_by("created_at", "id")
+            .values_list(*columns)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)  # PostgreSQL 은 서버 사이드 커서
+        )
+        # ASGI 에서는 청크마다 스레드에서 꺼냄 (동기 이터레이터는 전부 모아서 보냄)
+        body = streaming_body(request, _ndjson_rows(rows))
+        resp = StreamingHttpResponse(body, content_type="application/x-ndjson")
+        resp["Content-Disposition"] = (
+            f'attachment; filename="chat-logs-{start.date().isoformat()}.ndjson"'
+        )
+        return resp
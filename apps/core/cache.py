@@ -0,0 +1,13 @@
+from django.core.cache import caches
+
+
+def redis_client():
+    """기본 캐시가 django-redis 면 원본 Redis 클라이언트, 아니면 None (locmem 등)"""
+    try:
+        from django_redis import get_redis_connection
+        from django_redis.cache import RedisCache
+    except ImportError:
+        return None
+    if not isinstance(caches["default"], RedisCache):
+        return None
+    return get_redis_connection("default")
@@ -0,0 +1,32 @@
+"""서비스 기준(Asia/Seoul) 날짜 범위
+
+``created_at__date=today`` 는 컬럼을 시간대 변환 후 날짜로 캐스팅해 인덱스를 못 탄다.
+대신 하루를 [자정, 다음 자정) aware datetime 범위로 바꿔 ``created_at`` 을 그대로 비교한다.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Tuple
+from zoneinfo import ZoneInfo
+
+from django.utils import timezone
+
+SERVICE_TZ = ZoneInfo("Asia/Seoul")
+
+
+def local_today() -> date:
+    return timezone.localtime(timezone.now(), SERVICE_TZ).date()
+
+
+def day_range(day: date | None = None) -> Tuple[datetime, datetime]:
+    """[day 00:00, 다음날 00:00) (Asia/Seoul 기준)"""
+    day = day or local_today()
+    start = datetime.combine(day, time.min, tzinfo=SERVICE_TZ)
+    return start, datetime.combine(day + timedelta(days=1), time.min, tzinfo=SERVICE_TZ)
+
+
+def today_filter(field: str = "created_at") -> dict:
+    """qs.filter(**today_filter()) 용 반개구간 조건"""
+    start, end = day_range()
+    return {f"{field}__gte": start, f"{field}__lt": end}
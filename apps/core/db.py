@@ -0,0 +1,45 @@
+"""트랜잭션 점유 시간 계측
+
+``timed_atomic`` 은 ``transaction.atomic`` 과 같지만 블록이 연결/트랜잭션을 잡고 있던 시간을
+로그로 남기고 요청 단위로 합산한다. 합계는 ``TxnTimingMiddleware`` 가 응답의
+``Server-Timing`` 헤더로 내보낸다.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Tuple
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# 요청 안에서 끝난 (이름, ms) 목록
+_txn_timings: ContextVar[List[Tuple[str, float]] | None] = ContextVar(
+    "txn_timings", default=None
+)
+
+
+def start_request() -> None:
+    _txn_timings.set([])
+
+
+def request_timings() -> List[Tuple[str, float]]:
+    return list(_txn_timings.get() or [])
+
+
+@contextmanager
+def timed_atomic(name: str, *, using: str | None = None) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        held_ms = (time.perf_counter() - start) * 1000
+        timings = _txn_timings.get()
+        if timings is not None:
+            timings.append((name, held_ms))
+        logger.info("db txn %s held %.1fms", name, held_ms)
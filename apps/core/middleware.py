@@ -0,0 +1,41 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from apps.core import db
+
+
+class TxnTimingMiddleware:
+    """요청별 트랜잭션 점유 시간 합계를 Server-Timing 헤더로 노출
+
+    ASGI 에서 비동기 뷰 사이에 동기 어댑터가 끼지 않도록 동기/비동기 모두 지원한다.
+    합계 목록은 ContextVar 에 두고 같은 리스트에 추가하므로 sync_to_async 스레드에서 끝난
+    트랜잭션도 합산된다.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        db.start_request()
+        return self._add_header(self.get_response(request))
+
+    async def __acall__(self, request):
+        db.start_request()
+        return self._add_header(await self.get_response(request))
+
+    @staticmethod
+    def _add_header(response):
+        timings = db.request_timings()
+        if timings:
+            total = sum(ms for _, ms in timings)
+            response["Server-Timing"] = (
+                f'db-txn;dur={total:.1f};desc="{len(timings)} txn"'
+            )
+        return response
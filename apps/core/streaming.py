@@ -0,0 +1,47 @@
+"""StreamingHttpResponse 본문 (WSGI/ASGI 공용)
+
+ASGI 에서 동기 이터레이터를 넘기면 Django 가 sync_to_async(list) 로 전부 모은 뒤 보내므로
+스트리밍(첫 바이트 시간, 일정한 메모리)이 사라진다. ASGI 요청이면 비동기 이터레이터를 넘긴다.
+"""
+
+from __future__ import annotations
+
+from typing import AsyncIterator, Iterable, Iterator, TypeVar, cast
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def is_asgi(request) -> bool:
+    # DRF Request 는 원래 HttpRequest 를 _request 로 감쌈
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+def _next(it: Iterator[T]) -> T | object:
+    return next(it, _DONE)
+
+
+async def aiter_in_thread(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """동기 이터레이터를 한 청크씩 스레드에서 꺼내는 비동기 이터레이터
+
+    thread_sensitive 라 요청 안의 모든 next() 가 같은 스레드(같은 DB 연결)에서 돈다
+    (서버 사이드 커서를 쓰는 .iterator() 도 그대로 사용 가능).
+    """
+    it = iter(iterable)
+    next_chunk = sync_to_async(_next)
+    try:
+        while (chunk := await next_chunk(it)) is not _DONE:
+            yield cast(T, chunk)
+    finally:
+        close = getattr(it, "close", None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_body(request, iterable: Iterable[T]) -> Iterable[T] | AsyncIterator[T]:
+    """ASGI 면 비동기 이터레이터, WSGI 면 그대로"""
+    return aiter_in_thread(iterable) if is_asgi(request) else iterable
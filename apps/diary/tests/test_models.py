@@ -1,7 +1,9 @@
+import shutil
+import tempfile
 from datetime import date as date_obj
 
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from apps.diary.models import Diary
@@ -9,7 +11,17 @@ from apps.users.models import User
 from apps.weather.models import WeatherData, WeatherLocation
 
 
+# 업로드 이미지가 저장소 트리에 남지 않도록 임시 폴더에 저장
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class DiaryModelTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         # User 생성
         self.user = User.objects.create_user(
@@ -1,8 +1,10 @@
+import shutil
+import tempfile
 from datetime import date as date_obj
 from io import BytesIO
 
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from PIL import Image
 
@@ -26,7 +28,17 @@ def generate_test_image():
     return SimpleUploadedFile("test_image.jpg", file.read(), content_type="image/jpeg")
 
 
+# 업로드 이미지가 저장소 트리에 남지 않도록 임시 폴더에 저장
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class DiarySerializerTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         """테스트에 필요한 기본 데이터 생성"""
         # 사용자 생성
@@ -13,8 +13,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.weather import repository as weather_repo
-from apps.weather.models import WeatherLocation
 from apps.weather.services import openweather as ow
+from apps.weather.services.locations import resolve_location
 
 from .models import Diary
 from .serializers import (
@@ -127,32 +127,16 @@ class DiaryViewSet(viewsets.ModelViewSet):
         except Exception:
             current_weather = None  # 날씨 조회 실패시, 일기는 저장
 
-        #  2. WeatherLocation 생성 or 갱신
-        city = (
-            current_weather.get("raw", {}).get("name")
-            if isinstance(current_weather, dict)
-            else ""
-        ) or ""
-        district = ""
-
-        location, _ = WeatherLocation.objects.get_or_create(
-            city=city,
-            district=district,
-            defaults={
-                "lat": lat,
-                "lon": lon,
-                "dp_name": city or f"{lat},{lon}",
-            },
-        )
-
-        #  3. WeatherData 저장 (repository 사용)
+        #  2. WeatherData 저장 (정규화된 WeatherLocation 에 연결)
         weather_data = None
         if current_weather and isinstance(current_weather, dict):
+            city = current_weather.get("raw", {}).get("name") or ""
+            location = resolve_location(lat=lat, lon=lon, city=city)
             weather_data = weather_repo.save_current(
                 location=location, current=current_weather
             )
 
-        #  4. Diary 저장 (날씨 자동 연결)
+        #  3. Diary 저장 (날씨 자동 연결)
         serializer.save(user=self.request.user, weather_data=weather_data)
 
     @transaction.atomic
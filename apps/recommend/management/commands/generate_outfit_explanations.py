@@ -0,0 +1,69 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from openai import OpenAI
+
+from apps.recommend.services import explanation_batch as eb
+
+
+class Command(BaseCommand):
+    help = (
+        "룰 코디 설명을 (룰 키 × 성별 × 연령대) 조합별로 일괄 생성해 "
+        "OutfitExplanation 에 저장합니다 (OpenAI Batch API 또는 --fake)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fake", action="store_true", help="OpenAI 대신 로컬 템플릿으로 생성"
+        )
+        parser.add_argument("--model", default=eb.DEFAULT_MODEL)
+        parser.add_argument(
+            "--batch-id", default="", help="이미 제출한 배치 결과만 저장"
+        )
+        parser.add_argument(
+            "--no-wait", action="store_true", help="배치 제출 후 id 만 출력하고 종료"
+        )
+        parser.add_argument("--poll-interval", type=float, default=30.0)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="배치 입력 JSONL 을 stdout 으로 출력"
+        )
+
+    def handle(self, *args, **opts):
+        items = eb.combos()
+        if opts["dry_run"]:
+            sys.stdout.buffer.write(eb.batch_input(items, opts["model"]))
+            return
+
+        if opts["fake"]:
+            rows = eb.fake_generate(items)
+        else:
+            rows = self._run_batch(items, opts)
+            if rows is None:
+                return
+
+        saved = eb.save_explanations(rows)
+        self.stdout.write(
+            f"saved {saved}/{len(items)} explanations ({eb.PROMPT_VERSION})"
+        )
+
+    def _run_batch(self, items, opts):
+        client = OpenAI()
+        batch_id = opts["batch_id"]
+        if not batch_id:
+            batch_id = eb.submit_batch(client, items, opts["model"]).id
+            self.stdout.write(f"submitted batch {batch_id} ({len(items)} requests)")
+            if opts["no_wait"]:
+                return None
+
+        batch = eb.wait_batch(
+            client,
+            batch_id,
+            interval=opts["poll_interval"],
+            on_poll=lambda b: self.stdout.write(
+                f"{b.status}: {b.request_counts.completed if b.request_counts else 0}"
+                f"/{len(items)}"
+            ),
+        )
+        if batch.status != "completed":
+            raise CommandError(f"batch {batch_id} ended with status {batch.status}")
+        return eb.collect_batch(client, batch)
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommend', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutfitExplanation',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('rule_key', models.CharField(max_length=20)),
+                ('gender', models.CharField(blank=True, default='', max_length=10)),
+                ('age_group', models.CharField(blank=True, default='', max_length=10)),
+                ('explanation', models.TextField()),
+                ('model_name', models.CharField(max_length=50)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'outfit_explanations',
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('rule_key', 'gender', 'age_group'),
+                        name='uniq_outfit_explanation',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -33,3 +33,28 @@ class OutfitRecommendation(models.Model):
 
     def __str__(self):
         return f"OutfitRecommendation(user={self.user_id}, {self.created_at:%Y-%m-%d})"
+
+
+class OutfitExplanation(models.Model):
+    """배치 생성한 룰 코디 설명 (룰 키 × 성별 × 연령대, 빈 문자열은 '전체')"""
+
+    rule_key = models.CharField(max_length=20)  # "cond:rain", "band:3"
+    gender = models.CharField(max_length=10, blank=True, default="")
+    age_group = models.CharField(max_length=10, blank=True, default="")
+    # 현재 기온 자리는 {temp} (조회 시 치환)
+    explanation = models.TextField()
+    model_name = models.CharField(max_length=50)  # "fake" = 로컬 생성
+    prompt_version = models.CharField(max_length=20)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "outfit_explanations"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["rule_key", "gender", "age_group"],
+                name="uniq_outfit_explanation",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.rule_key}/{self.gender or '*'}/{self.age_group or '*'}"
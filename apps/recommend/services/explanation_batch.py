@@ -0,0 +1,257 @@
+"""룰 코디 설명 일괄 생성 (generate_outfit_explanations 명령)
+
+(룰 키 × 성별 × 연령대) 조합마다 설명 요청을 만들어 OpenAI Batch API 로 한 번에 보내고,
+결과를 OutfitExplanation 에 upsert 한다. 개발/테스트에서는 fake_explanation 으로
+같은 조합을 로컬에서 채운다. 저장 후 워커들은 캐시 버전이 바뀐 것을 보고 테이블을 다시 읽는다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+
+from apps.recommend.models import OutfitExplanation
+from apps.recommend.services import outfit_explanations
+from apps.recommend.services.outfit_explanations import AGE_GROUPS, ANY, GENDERS
+from apps.recommend.services.recommend_service import (
+    CONDITION_ALIASES,
+    CONDITION_RULES,
+    TEMPERATURE_BAND_RULES,
+    TEMPERATURE_BAND_UPPERS,
+)
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트를 바꾸면 올릴 것 (저장된 행으로 어느 프롬프트 결과인지 구분)
+PROMPT_VERSION = "outfit-expl-v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+BATCH_ENDPOINT = "/v1/chat/completions"
+MAX_CHARS = 300
+# 아직 끝나지 않은 배치 상태
+PENDING_STATUSES = ("validating", "in_progress", "finalizing")
+
+CONDITION_LABELS = {"snow": "눈 오는 날", "rain": "비 오는 날"}
+GENDER_LABELS = {ANY: "성별 무관", "W": "여성", "M": "남성"}
+
+SYSTEM_PROMPT = (
+    "너는 날씨에 맞는 옷차림을 설명하는 한국어 패션 도우미야. "
+    "추천 코디가 왜 어울리는지 존댓말로 1~2문장, 120자 이내로 설명하고 이모지는 쓰지 마. "
+    "현재 기온을 말하려면 숫자 대신 {temp} 를 그대로 써."
+)
+
+
+class Combo(NamedTuple):
+    rule_key: str
+    gender: str
+    age_group: str
+
+    @property
+    def custom_id(self) -> str:
+        return f"{self.rule_key}|{self.gender}|{self.age_group}"
+
+    @classmethod
+    def from_custom_id(cls, value: str) -> "Combo":
+        rule_key, gender, age_group = value.split("|")
+        return cls(rule_key, gender, age_group)
+
+
+class Generated(NamedTuple):
+    combo: Combo
+    explanation: str
+    model_name: str
+
+
+def rule_keys() -> List[str]:
+    conds = sorted({CONDITION_ALIASES.get(c, c) for c in CONDITION_RULES})
+    return [f"cond:{c}" for c in conds] + [
+        f"band:{i}" for i in range(len(TEMPERATURE_BAND_RULES))
+    ]
+
+
+def combos() -> List[Combo]:
+    return [
+        Combo(key, gender, age)
+        for key in rule_keys()
+        for gender in (ANY, *GENDERS)
+        for age in (ANY, *AGE_GROUPS)
+    ]
+
+
+def _rule(rule_key: str) -> Tuple[Tuple[str, str, str], str]:
+    kind, value = rule_key.split(":")
+    if kind == "cond":
+        return CONDITION_RULES[value]
+    return TEMPERATURE_BAND_RULES[int(value)]
+
+
+def _situation(rule_key: str) -> str:
+    kind, value = rule_key.split(":")
+    if kind == "cond":
+        return CONDITION_LABELS.get(value, value)
+    i, uppers = int(value), TEMPERATURE_BAND_UPPERS
+    if i == 0:
+        return f"기온 {uppers[0]}°C 이하"
+    if i == len(uppers):
+        return f"기온 {uppers[-1]}°C 초과"
+    return f"기온 {uppers[i - 1]}°C 초과 {uppers[i]}°C 이하"
+
+
+def _audience_label(combo: Combo) -> str:
+    if combo.age_group == ANY:
+        age = "연령 무관"
+    elif combo.age_group == "60+":
+        age = "60대 이상"
+    else:
+        age = f"{combo.age_group}대"
+    return f"{GENDER_LABELS[combo.gender]}, {age}"
+
+
+def prompt_messages(combo: Combo) -> List[dict]:
+    recs, _ = _rule(combo.rule_key)
+    outfits = "\n".join(f"{n}) {r}" for n, r in enumerate(recs, 1))
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f"상황: {_situation(combo.rule_key)}\n"
+                f"대상: {_audience_label(combo)}\n"
+                f"추천 코디:\n{outfits}\n"
+                "이 코디를 추천하는 이유를 설명해줘."
+            ),
+        },
+    ]
+
+
+def batch_input(items: Iterable[Combo], model: str) -> bytes:
+    """Batch API 입력 JSONL (한 줄에 조합 하나, custom_id 로 결과를 다시 매칭)"""
+    lines = [
+        json.dumps(
+            {
+                "custom_id": c.custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": model,
+                    "messages": prompt_messages(c),
+                    "max_tokens": 200,
+                    "temperature": 0.7,
+                },
+            },
+            ensure_ascii=False,
+        )
+        for c in items
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def clean(text: str) -> str:
+    text = re.sub(r"\s+", " ", text or "").strip().strip("\"'")
+    return text[:MAX_CHARS]
+
+
+def parse_batch_output(lines: Iterable[str]) -> List[Generated]:
+    """Batch 출력 JSONL → 성공한 조합만 (실패/빈 응답은 로그만 남기고 건너뜀)"""
+    out: List[Generated] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        resp = row.get("response") or {}
+        if row.get("error") or resp.get("status_code") != 200:
+            logger.warning(
+                "outfit explanation failed: %s %s",
+                row.get("custom_id"),
+                row.get("error"),
+            )
+            continue
+        body = resp["body"]
+        text = clean(body["choices"][0]["message"]["content"])
+        if text:
+            combo = Combo.from_custom_id(row["custom_id"])
+            out.append(Generated(combo, text, body.get("model", "")))
+    return out
+
+
+def fake_explanation(combo: Combo) -> str:
+    """OpenAI 없이 쓰는 로컬 생성 (룰 설명 + 대상 문구)"""
+    recs, template = _rule(combo.rule_key)
+    if combo.gender == ANY and combo.age_group == ANY:
+        return template
+    return (
+        f"{template} {_audience_label(combo)} 분께는 "
+        f"'{recs[0]}' 조합을 먼저 추천드려요."
+    )
+
+
+def fake_generate(items: Iterable[Combo]) -> List[Generated]:
+    return [Generated(c, fake_explanation(c), "fake") for c in items]
+
+
+def submit_batch(client, items: Iterable[Combo], model: str) -> Any:
+    """입력 파일 업로드 + 배치 생성 → Batch 객체"""
+    upload = client.files.create(
+        file=("outfit_explanations.jsonl", batch_input(items, model)),
+        purpose="batch",
+    )
+    return client.batches.create(
+        input_file_id=upload.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+        metadata={"prompt_version": PROMPT_VERSION},
+    )
+
+
+def wait_batch(
+    client,
+    batch_id: str,
+    *,
+    interval: float = 30.0,
+    on_poll: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    batch = client.batches.retrieve(batch_id)
+    while batch.status in PENDING_STATUSES:
+        if on_poll is not None:
+            on_poll(batch)
+        time.sleep(interval)
+        batch = client.batches.retrieve(batch_id)
+    return batch
+
+
+def collect_batch(client, batch) -> List[Generated]:
+    if not batch.output_file_id:
+        return []
+    text = client.files.content(batch.output_file_id).text
+    return parse_batch_output(text.splitlines())
+
+
+def save_explanations(rows: Iterable[Generated]) -> int:
+    """조합별 upsert 후 워커 테이블 무효화. 저장한 행 수 반환"""
+    objs = [
+        OutfitExplanation(
+            rule_key=g.combo.rule_key,
+            gender=g.combo.gender,
+            age_group=g.combo.age_group,
+            explanation=g.explanation,
+            model_name=g.model_name[:50],
+            prompt_version=PROMPT_VERSION,
+        )
+        for g in rows
+    ]
+    if not objs:
+        return 0
+    with transaction.atomic():
+        OutfitExplanation.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["rule_key", "gender", "age_group"],
+            update_fields=["explanation", "model_name", "prompt_version", "updated_at"],
+        )
+        outfit_explanations.invalidate_local()
+        transaction.on_commit(outfit_explanations.invalidate)
+    return len(objs)
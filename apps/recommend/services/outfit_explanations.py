@@ -0,0 +1,156 @@
+"""배치 생성 코디 설명 조회 테이블
+
+룰 코디의 설명은 (룰 키, 성별, 연령대) 만으로 정해지므로 generate_outfit_explanations
+명령으로 모든 조합을 미리 생성해 OutfitExplanation 에 저장해 두고, 요청 때는 워커 메모리의
+dict 에서 찾기만 한다. 테이블이 바뀌면 chat 의 model_picker/intent 와 같은 캐시 버전
+방식으로 워커마다 다시 읽는다. 맞는 조합이 없으면 None (호출부가 룰 템플릿 설명 사용).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from django.core.cache import cache
+
+GENDERS: Tuple[str, ...] = ("W", "M")
+AGE_GROUPS: Tuple[str, ...] = ("10", "20", "30", "40", "50", "60+")
+ANY = ""  # 성별/연령대 무관
+
+VERSION_KEY = "recommend:outfit_explanations_ver"
+VERSION_CHECK_INTERVAL = 5.0  # 초
+
+Audience = Tuple[str, str]  # (gender, age_group)
+TableKey = Tuple[str, str, str]  # (rule_key, gender, age_group)
+
+_GENDER_ALIASES = {
+    "w": "W",
+    "f": "W",
+    "female": "W",
+    "woman": "W",
+    "여": "W",
+    "여성": "W",
+    "여자": "W",
+    "m": "M",
+    "male": "M",
+    "man": "M",
+    "남": "M",
+    "남성": "M",
+    "남자": "M",
+}
+
+
+def _gender(value: Any) -> str:
+    return _GENDER_ALIASES.get(str(value or "").strip().lower(), ANY)
+
+
+def _age_group(value: Any) -> str:
+    """27, "20", "20대", "60+" → AGE_GROUPS 값 (알 수 없으면 ANY)"""
+    m = re.match(r"\s*(\d+)", str(value if value is not None else ""))
+    if not m:
+        return ANY
+    age = int(m.group(1))
+    if age < 10:
+        return ANY
+    return "60+" if age >= 60 else f"{min(age // 10, 5) * 10}"
+
+
+def audience_of(profile: Mapping[str, Any] | None = None, user=None) -> Audience:
+    """요청 profile(gender, age_group/age) 우선, 없으면 로그인 사용자 정보"""
+    profile = profile or {}
+    gender = _gender(profile.get("gender"))
+    age = _age_group(profile.get("age_group") or profile.get("age"))
+    if getattr(user, "is_authenticated", False):
+        gender = gender or _gender(getattr(user, "gender", None))
+        age = age or _age_group(getattr(user, "age_group", None))
+    return gender, age
+
+
+def load_table() -> Dict[TableKey, str]:
+    from apps.recommend.models import OutfitExplanation
+
+    return {
+        (rule_key, gender, age_group): text
+        for rule_key, gender, age_group, text in OutfitExplanation.objects.values_list(
+            "rule_key", "gender", "age_group", "explanation"
+        )
+    }
+
+
+class _Holder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.table: Optional[Dict[TableKey, str]] = None
+        self.version: Optional[int] = None
+        self.checked_at = 0.0
+
+
+_holder = _Holder()
+
+
+def get_table() -> Dict[TableKey, str]:
+    now = time.monotonic()
+    table = _holder.table
+    if table is not None and now - _holder.checked_at < VERSION_CHECK_INTERVAL:
+        return table
+
+    version = cache.get(VERSION_KEY) or 0
+    with _holder.lock:
+        if _holder.table is None or _holder.version != version:
+            _holder.table = load_table()
+            _holder.version = version
+        _holder.checked_at = now
+        return _holder.table
+
+
+def invalidate_local() -> None:
+    with _holder.lock:
+        _holder.table = None
+
+
+@contextmanager
+def pinned(table: Dict[TableKey, str]) -> Iterator[None]:
+    """블록 동안 이 워커의 테이블을 table 로 고정 (DB/캐시 버전 무시, 벤치마크용)"""
+    with _holder.lock:
+        _holder.table = table
+        _holder.checked_at = float("inf")
+    try:
+        yield
+    finally:
+        with _holder.lock:
+            _holder.table = None
+            _holder.checked_at = 0.0
+
+
+def invalidate() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+    invalidate_local()
+
+
+def lookup(rule_key: str, audience: Audience | None = None) -> Optional[str]:
+    """가장 구체적인 조합부터: (성별, 연령대) → 성별만 → 연령대만 → 전체"""
+    table = get_table()
+    if not table:
+        return None
+    gender, age = audience or (ANY, ANY)
+    for key in (
+        (rule_key, gender, age),
+        (rule_key, gender, ANY),
+        (rule_key, ANY, age),
+        (rule_key, ANY, ANY),
+    ):
+        text = table.get(key)
+        if text:
+            return text
+    return None
+
+
+def render(text: str, temp: float) -> str:
+    # 생성 문장에 다른 중괄호가 있어도 깨지지 않도록 format 대신 치환
+    return text.replace("{temp}", str(temp))
@@ -1,8 +1,17 @@
+import json
+from io import StringIO
+from types import SimpleNamespace
 from unittest.mock import patch
 
+from django.core.management import call_command
 from django.test import TestCase
 
-from apps.recommend.services.recommend_service import generate_outfit_recommend
+from apps.recommend.models import OutfitExplanation
+from apps.recommend.services import explanation_batch, outfit_explanations
+from apps.recommend.services.recommend_service import (
+    build_outfit_by_temp_and_cond,
+    generate_outfit_recommend,
+)
 
 
 class GenerateOutfitRecommendTests(TestCase):
@@ -37,3 +46,85 @@ class GenerateOutfitRecommendTests(TestCase):
         self.assertIn("비 오는", result["explanation"])
         self.assertIn("레인", result["rec_2"])
         self.assertTrue(result["rec_1"])
+
+
+class OutfitExplanationTableTests(TestCase):
+    def setUp(self):
+        outfit_explanations.invalidate_local()
+        self.addCleanup(outfit_explanations.invalidate_local)
+
+    def test_audience_normalization(self):
+        audience_of = outfit_explanations.audience_of
+        self.assertEqual(audience_of({"gender": "여성", "age": 27}), ("W", "20"))
+        self.assertEqual(
+            audience_of({"gender": "male", "age_group": "60+"}), ("M", "60+")
+        )
+        self.assertEqual(audience_of(None), ("", ""))
+        user = SimpleNamespace(is_authenticated=True, gender="M", age_group="30")
+        self.assertEqual(audience_of({"age": 45}, user), ("M", "40"))
+
+    def test_fake_generation_fills_every_combo(self):
+        out = StringIO()
+        call_command("generate_outfit_explanations", "--fake", stdout=out)
+        combos = explanation_batch.combos()
+        self.assertEqual(OutfitExplanation.objects.count(), len(combos))
+        self.assertIn(f"saved {len(combos)}/{len(combos)}", out.getvalue())
+
+        fb = build_outfit_by_temp_and_cond(3, "Clear", ("W", "20"))
+        self.assertIn("3°C", fb["explanation"])
+        self.assertIn("여성, 20대", fb["explanation"])
+        # 조합이 없으면 더 넓은 조합 → 룰 템플릿 순으로
+        OutfitExplanation.objects.filter(rule_key="cond:rain").exclude(
+            gender="", age_group=""
+        ).delete()
+        outfit_explanations.invalidate_local()
+        fb = build_outfit_by_temp_and_cond(22, "비", ("M", "30"))
+        self.assertEqual(
+            fb["explanation"],
+            "비 오는 날엔 방수 소재와 통풍이 잘 되는 코디를 추천드려요.",
+        )
+        with self.assertNumQueries(0):
+            build_outfit_by_temp_and_cond(22, "Rain", ("M", "30"))
+
+    @patch("apps.recommend.management.commands.generate_outfit_explanations.OpenAI")
+    def test_batch_api_results_are_saved(self, mock_openai):
+        client = mock_openai.return_value
+        combo = explanation_batch.combos()[0]
+        output = [
+            {
+                "custom_id": combo.custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "model": "gpt-4o-mini-2024-07-18",
+                        "choices": [
+                            {
+                                "message": {
+                                    "content": " 눈길엔 {temp}°C라도 부츠가 좋아요. "
+                                }
+                            }
+                        ],
+                    },
+                },
+                "error": None,
+            },
+            {"custom_id": "band:0||", "response": None, "error": {"code": "x"}},
+        ]
+        client.batches.create.return_value = SimpleNamespace(id="batch_1")
+        client.batches.retrieve.return_value = SimpleNamespace(
+            status="completed", output_file_id="file_out", request_counts=None
+        )
+        client.files.content.return_value = SimpleNamespace(
+            text="\n".join(json.dumps(r) for r in output)
+        )
+
+        call_command("generate_outfit_explanations", stdout=StringIO())
+
+        upload = client.files.create.call_args.kwargs
+        self.assertEqual(upload["purpose"], "batch")
+        lines = upload["file"][1].decode().splitlines()
+        self.assertEqual(len(lines), len(explanation_batch.combos()))
+        self.assertEqual(json.loads(lines[0])["url"], "/v1/chat/completions")
+        row = OutfitExplanation.objects.get()
+        self.assertEqual(row.explanation, "눈길엔 {temp}°C라도 부츠가 좋아요.")
+        self.assertEqual(row.model_name, "gpt-4o-mini-2024-07-18")
@@ -0,0 +1,127 @@
+import json
+import random
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand
+
+from apps.weather.repository import forecast_defaults
+from apps.weather.services import openweather as ow
+
+
+def _sample_forecast(n: int) -> bytes:
+    """OpenWeather /forecast 와 같은 모양의 n 개 슬롯 응답 바이트"""
+    rnd = random.Random(42)
+    start = 1761955200
+    items = []
+    for i in range(n):
+        temp = round(rnd.uniform(-5, 30), 2)
+        item: Dict[str, Any] = {
+            "dt": start + i * 10800,
+            "main": {
+                "temp": temp,
+                "feels_like": round(temp - rnd.uniform(0, 3), 2),
+                "temp_min": temp - 1,
+                "temp_max": temp + 1,
+                "pressure": 1015,
+                "sea_level": 1015,
+                "grnd_level": 1005,
+                "humidity": rnd.randint(20, 95),
+                "temp_kf": 0,
+            },
+            "weather": [
+                {"id": 800, "main": "Clear", "description": "맑음", "icon": "01d"}
+            ],
+            "clouds": {"all": rnd.randint(0, 100)},
+            "wind": {"speed": round(rnd.uniform(0, 8), 2), "deg": 200, "gust": 3.1},
+            "visibility": 10000,
+            "pop": round(rnd.random(), 2),
+            "sys": {"pod": "d"},
+            "dt_txt": "2025-11-01 00:00:00",
+        }
+        if i % 4 == 0:
+            item["rain"] = {"3h": round(rnd.uniform(0, 5), 2)}
+        items.append(item)
+    payload = {
+        "cod": "200",
+        "message": 0,
+        "cnt": n,
+        "list": items,
+        "city": {"id": 1835848, "name": "Seoul", "country": "KR"},
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+# 예보 수신 시각 (두 구현이 같은 값을 쓰도록 고정)
+ISSUED_AT = datetime(2025, 11, 1, tzinfo=timezone.utc)
+
+
+def _legacy_parse(body: bytes) -> List[Dict[str, Any]]:
+    """이전 구현: r.json() 후 .get()/float() 체인으로 dict 순회"""
+    payload = json.loads(body)
+    rows = []
+    for item in payload.get("list", []):
+        dt = datetime.fromtimestamp(int(item.get("dt", 0)), tz=timezone.utc)
+        main = item.get("main", {})
+        weather0 = (item.get("weather") or [{}])[0]
+        wind = item.get("wind", {})
+        pop = item.get("pop")
+        rain = item.get("rain", {}) or {}
+        rows.append(
+            {
+                "valid_time": dt,
+                "base_time": ISSUED_AT,
+                "temperature": float(main.get("temp")),
+                "feels_like": float(main.get("feels_like")),
+                "humidity": int(main["humidity"]) if "humidity" in main else None,
+                "rain_probability": float(pop) * 100 if pop is not None else None,
+                "rain_volume": float(rain.get("3h") or rain.get("1h") or 0.0),
+                "wind_speed": float(wind["speed"]) if "speed" in wind else None,
+                "condition": weather0.get("main"),
+                "icon": weather0.get("icon"),
+                "raw_payload": item,
+            }
+        )
+    return rows
+
+
+def _schema_parse(body: bytes) -> List[Dict[str, Any]]:
+    """현재 구현: 응답 바이트를 스키마로 바로 검증한 뒤 필드 매핑"""
+    return [
+        forecast_defaults(item, ISSUED_AT)
+        for item in ow.parse_forecast(body).get("list", [])
+    ]
+
+
+def _schema_validate_only(body: bytes) -> int:
+    return len(ow.parse_forecast(body).get("list", []))
+
+
+class Command(BaseCommand):
+    help = "OpenWeather 예보 응답 파싱 마이크로벤치마크 (dict 순회 vs pydantic 스키마)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=40)
+        parser.add_argument("--number", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        body = _sample_forecast(opts["items"])
+        assert _legacy_parse(body) == _schema_parse(body)
+
+        self.stdout.write(
+            f"forecast {opts['items']} items, {len(body)} bytes, "
+            f"best of {opts['repeat']} x {opts['number']}"
+        )
+        for label, fn in (
+            ("legacy json.loads + dict walk", _legacy_parse),
+            ("validate_json + rows", _schema_parse),
+            ("validate_json only", _schema_validate_only),
+        ):
+            best = min(
+                timeit.repeat(
+                    lambda: fn(body), number=opts["number"], repeat=opts["repeat"]
+                )
+            )
+            self.stdout.write(f"  {label:32s} {best / opts['number'] * 1e6:8.1f} µs")
@@ -0,0 +1,58 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.weather.services import export
+
+
+class Command(BaseCommand):
+    help = (
+        "weather_data 또는 일별 롤업을 서버 사이드 커서로 읽어 "
+        "gzip NDJSON/CSV 또는 Parquet 으로 내보냅니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dataset", choices=export.DATASETS, default=export.DATASET_WEATHER_DATA
+        )
+        parser.add_argument(
+            "--format", dest="fmt", choices=export.FORMATS, default=export.FORMAT_NDJSON
+        )
+        parser.add_argument(
+            "--location", default="", help="WeatherLocation id (쉼표로 여러 개)"
+        )
+        parser.add_argument("--start", default="", help="valid_time 시작 (포함)")
+        parser.add_argument("--end", default="", help="valid_time 끝 (미포함)")
+        parser.add_argument("--chunk-size", type=int, default=export.DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--output", "-o", default="-", help="출력 파일 경로 (기본: stdout)"
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            chunks = export.stream_export(
+                opts["dataset"],
+                opts["fmt"],
+                location_ids=export.parse_location_ids(opts["location"]),
+                start=export.parse_bound(opts["start"]),
+                end=export.parse_bound(opts["end"]),
+                chunk_size=opts["chunk_size"],
+            )
+        except export.ExportError as e:
+            raise CommandError(str(e))
+
+        written = 0
+        if opts["output"] == "-":
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+            out.flush()
+        else:
+            with open(opts["output"], "wb") as fp:
+                for chunk in chunks:
+                    fp.write(chunk)
+                    written += len(chunk)
+            self.stderr.write(
+                self.style.SUCCESS(f"{opts['output']} 저장 완료 ({written} bytes)")
+            )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from apps.weather.services import locations
+
+
+class Command(BaseCommand):
+    help = (
+        "같은 좌표 격자에 중복 생성된 WeatherLocation 을 하나로 합칩니다. "
+        "WeatherData/Diary/OutfitRecommendation FK 를 일괄로 옮긴 뒤 중복 위치를 삭제합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="병합 대상만 출력하고 변경하지 않음"
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        groups = locations.find_duplicate_groups()
+        if not groups:
+            self.stdout.write("중복 위치가 없습니다.")
+            return
+
+        totals = {"locations": 0, "moved": 0, "collapsed": 0, "repointed": 0}
+        for survivor_id, *dup_ids in groups:
+            if opts["dry_run"]:
+                self.stdout.write(f"[dry-run] {dup_ids} → {survivor_id}")
+                continue
+            stats = locations.merge_locations(
+                survivor_id, dup_ids, batch_size=opts["batch_size"]
+            )
+            for k, v in stats.items():
+                totals[k] += v
+            self.stdout.write(f"{dup_ids} → {survivor_id}: {stats}")
+
+        if not opts["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"병합 완료: 위치 {totals['locations']}개 삭제, "
+                    f"날씨 {totals['moved']}건 이동, {totals['collapsed']}건 중복 제거, "
+                    f"FK {totals['repointed']}건 변경"
+                )
+            )
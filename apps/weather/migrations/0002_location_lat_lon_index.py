@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='weatherlocation',
+            index=models.Index(fields=['lat', 'lon'], name='idx_location_lat_lon'),
+        ),
+    ]
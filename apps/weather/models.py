@@ -15,6 +15,7 @@ class WeatherLocation(models.Model):
         #     fields=["city", "district"], name="weather_location"
         # )
         unique_together = ("city", "district")
+        indexes = [models.Index(fields=["lat", "lon"], name="idx_location_lat_lon")]
 
     def __str__(self):
         return f"{self.city} {self.district}"
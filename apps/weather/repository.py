@@ -1,9 +1,13 @@
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from django.db import transaction
+from django.utils import timezone as dj_timezone
 
 from apps.weather.models import WeatherData, WeatherLocation
+from apps.weather.services import forecast_series, schemas
+from apps.weather.services.openweather import CurrentOut
+from apps.weather.services.schemas import ForecastItem, ForecastPayload
 
 
 def _ts_to_dt_utc(ts: int) -> datetime:
@@ -11,7 +15,7 @@ def _ts_to_dt_utc(ts: int) -> datetime:
 
 
 @transaction.atomic
-def save_current(location: WeatherLocation, current: Dict[str, Any]) -> WeatherData:
+def save_current(location: WeatherLocation, current: CurrentOut) -> WeatherData:
     vt = _ts_to_dt_utc(current["base_time"])
     obj, _ = WeatherData.objects.update_or_create(
         location=location,
@@ -32,30 +36,43 @@ def save_current(location: WeatherLocation, current: Dict[str, Any]) -> WeatherD
     return obj
 
 
+def forecast_defaults(
+    item: ForecastItem, issued_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """검증된 예보 한 슬롯 → WeatherData 필드값 (item 자체가 raw_payload)
+
+    base_time 은 예보를 받은 시각(발표 시각 대용), valid_time 은 슬롯 시각.
+    현재 날씨 관측은 base_time == valid_time 이라 예보 행과 구분된다.
+    """
+    dt = _ts_to_dt_utc(item["dt"])
+    main = item["main"]
+    cond = schemas.first_condition(item)
+    pop = item.get("pop")
+    return {
+        "valid_time": dt,
+        "base_time": issued_at or dj_timezone.now(),
+        "temperature": main["temp"],
+        "feels_like": main["feels_like"],
+        "humidity": main.get("humidity"),
+        "rain_probability": pop * 100 if pop is not None else None,
+        "rain_volume": schemas.rain_volume(item, prefer="3h"),
+        "wind_speed": (item.get("wind") or {}).get("speed"),
+        "condition": cond.get("main"),
+        "icon": cond.get("icon"),
+        "raw_payload": item,
+    }
+
+
 @transaction.atomic
-def save_forecast(location: WeatherLocation, forecast_payload: Dict[str, Any]) -> int:
+def save_forecast(location: WeatherLocation, forecast: ForecastPayload) -> int:
     cnt = 0
-    for item in forecast_payload.get("list", []):
-        dt = _ts_to_dt_utc(int(item.get("dt", 0)))
-        main = item.get("main", {})
-        weather0 = (item.get("weather") or [{}])[0]
-        wind = item.get("wind", {})
-        pop = item.get("pop")  # 0~1, 확률
-        rain = item.get("rain", {}) or {}
-        defaults = {
-            "base_time": dt,
-            "temperature": float(main.get("temp")),
-            "feels_like": float(main.get("feels_like")),
-            "humidity": int(main["humidity"]) if "humidity" in main else None,
-            "rain_probability": float(pop) * 100 if pop is not None else None,
-            "rain_volume": float(rain.get("3h") or rain.get("1h") or 0.0),
-            "wind_speed": float(wind["speed"]) if "speed" in wind else None,
-            "condition": weather0.get("main"),
-            "icon": weather0.get("icon"),
-            "raw_payload": item,
-        }
+    issued_at = dj_timezone.now()
+    for item in forecast.get("list", []):
+        defaults = forecast_defaults(item, issued_at)
         WeatherData.objects.update_or_create(
-            location=location, valid_time=dt, defaults=defaults
+            location=location, valid_time=defaults.pop("valid_time"), defaults=defaults
         )
         cnt += 1
+    if cnt:
+        transaction.on_commit(lambda: forecast_series.invalidate(location.id))
     return cnt
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from apps.weather.models import WeatherData
+from apps.weather.services import export
 
 
 class CurrentQuerySerializer(serializers.Serializer):
@@ -36,6 +37,35 @@ class HistoryQuerySerializer(serializers.Serializer):
         return attrs
 
 
+class ExportQuerySerializer(serializers.Serializer):
+    dataset = serializers.ChoiceField(
+        choices=export.DATASETS, default=export.DATASET_WEATHER_DATA
+    )
+    format = serializers.ChoiceField(
+        choices=export.FORMATS, default=export.FORMAT_NDJSON
+    )
+    location_id = serializers.CharField(required=False, allow_blank=True)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    chunk_size = serializers.IntegerField(
+        required=False,
+        min_value=100,
+        max_value=20000,
+        default=export.DEFAULT_CHUNK_SIZE,
+    )
+
+    def validate_location_id(self, value):
+        try:
+            return export.parse_location_ids(value)
+        except export.ExportError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs):
+        if attrs["format"] == export.FORMAT_PARQUET and not export.parquet_available():
+            raise serializers.ValidationError("parquet 출력에는 pyarrow 가 필요합니다.")
+        return attrs
+
+
 class WeatherDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = WeatherData
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.db.models import Avg, Count, Max, Min, QuerySet, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.weather.models import WeatherData
+
+try:  # parquet 출력은 pyarrow 가 설치된 환경에서만 지원
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 선택 의존성
+    pa = None
+    pq = None
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV, FORMAT_PARQUET)
+
+DATASET_WEATHER_DATA = "weather_data"
+DATASET_DAILY = "daily"
+DATASETS = (DATASET_WEATHER_DATA, DATASET_DAILY)
+
+WEATHER_DATA_FIELDS: List[str] = [
+    "id",
+    "location_id",
+    "base_time",
+    "valid_time",
+    "temperature",
+    "feels_like",
+    "humidity",
+    "rain_probability",
+    "rain_volume",
+    "wind_speed",
+    "condition",
+    "icon",
+    "created_at",
+]
+
+DAILY_FIELDS: List[str] = [
+    "location_id",
+    "day",
+    "samples",
+    "temp_min",
+    "temp_max",
+    "temp_avg",
+    "feels_like_avg",
+    "humidity_avg",
+    "rain_volume_sum",
+    "rain_probability_max",
+]
+
+
+class ExportError(Exception): ...
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def content_type_for(fmt: str) -> str:
+    if fmt == FORMAT_PARQUET:
+        return "application/vnd.apache.parquet"
+    return "application/gzip"
+
+
+def filename_for(dataset: str, fmt: str) -> str:
+    if fmt == FORMAT_PARQUET:
+        return f"{dataset}.parquet"
+    return f"{dataset}.{fmt}.gz"
+
+
+# -----------------------------
+# 1) 쿼리셋 구성
+# -----------------------------
+def build_queryset(
+    dataset: str,
+    *,
+    location_ids: Sequence[int] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> QuerySet:
+    """필터가 적용된 values() 쿼리셋 (모델 인스턴스를 만들지 않음)"""
+    qs = WeatherData.objects.all()
+    if location_ids:
+        qs = qs.filter(location_id__in=list(location_ids))
+    if start is not None:
+        qs = qs.filter(valid_time__gte=start)
+    if end is not None:
+        qs = qs.filter(valid_time__lt=end)
+
+    if dataset == DATASET_WEATHER_DATA:
+        # 기본 ordering(-valid_time) 대신 PK 순으로 읽어 인덱스 스캔을 유지
+        return qs.order_by("id").values(*WEATHER_DATA_FIELDS)
+
+    if dataset == DATASET_DAILY:
+        return (
+            qs.annotate(day=TruncDate("valid_time"))
+            .values("location_id", "day")
+            .annotate(
+                samples=Count("id"),
+                temp_min=Min("temperature"),
+                temp_max=Max("temperature"),
+                temp_avg=Avg("temperature"),
+                feels_like_avg=Avg("feels_like"),
+                humidity_avg=Avg("humidity"),
+                rain_volume_sum=Sum("rain_volume"),
+                rain_probability_max=Max("rain_probability"),
+            )
+            .order_by("location_id", "day")
+        )
+
+    raise ExportError(f"unknown dataset: {dataset}")
+
+
+def fields_for(dataset: str) -> List[str]:
+    return WEATHER_DATA_FIELDS if dataset == DATASET_WEATHER_DATA else DAILY_FIELDS
+
+
+def iter_rows(
+    qs: QuerySet, *, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """서버 사이드 커서로 chunk_size 단위만 메모리에 올리며 순회"""
+    yield from qs.iterator(chunk_size=chunk_size)
+
+
+# -----------------------------
+# 2) 직렬화
+# -----------------------------
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_lines(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[bytes]:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for row in rows:
+        yield (dumps({f: _jsonable(row.get(f)) for f in fields}) + "\n").encode("utf-8")
+
+
+def _csv_lines(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def _drain() -> bytes:
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+        return data
+
+    writer.writerow(fields)
+    yield _drain()
+    for row in rows:
+        writer.writerow([_jsonable(row.get(f)) for f in fields])
+        yield _drain()
+
+
+def gzip_stream(
+    chunks: Iterable[bytes], *, flush_bytes: int = 64 * 1024
+) -> Iterator[bytes]:
+    """바이트 청크를 gzip 스트림으로 압축 (flush_bytes 단위로 내보냄)"""
+    comp = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            out += comp.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    tail = comp.flush(zlib.Z_FINISH)
+    if tail:
+        yield tail
+
+
+class _ChunkSink(io.RawIOBase):
+    """pyarrow 가 쓰는 바이트를 모아두었다가 row group 단위로 내보내는 sink"""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def write(self, b) -> int:  # type: ignore[override]
+        data = bytes(b)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+_ARROW_TYPES: Dict[str, str] = {
+    "id": "int64",
+    "location_id": "int64",
+    "base_time": "timestamp",
+    "valid_time": "timestamp",
+    "created_at": "timestamp",
+    "day": "date",
+    "samples": "int64",
+    "humidity": "float64",
+    "condition": "string",
+    "icon": "string",
+}
+
+
+def _arrow_schema(fields: List[str]):
+    def _type(name: str):
+        kind = _ARROW_TYPES.get(name, "float64")
+        if kind == "timestamp":
+            return pa.timestamp("us", tz="UTC")
+        if kind == "date":
+            return pa.date32()
+        return getattr(pa, kind)()
+
+    return pa.schema([(f, _type(f)) for f in fields])
+
+
+def _parquet_chunks(
+    rows: Iterable[Dict[str, Any]], fields: List[str], *, batch_rows: int
+) -> Iterator[bytes]:
+    if pa is None or pq is None:
+        raise ExportError("parquet export requires pyarrow")
+
+    schema = _arrow_schema(fields)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    batch: List[Dict[str, Any]] = []
+
+    def _flush() -> bytes:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        batch.clear()
+        return sink.drain()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_rows:
+            data = _flush()
+            if data:
+                yield data
+    if batch:
+        data = _flush()
+        if data:
+            yield data
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def stream_export(
+    dataset: str,
+    fmt: str,
+    *,
+    location_ids: Sequence[int] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """dataset 을 fmt 로 직렬화한 바이트 스트림 (ndjson/csv 는 gzip 압축)"""
+    if fmt not in FORMATS:
+        raise ExportError(f"unknown format: {fmt}")
+    if fmt == FORMAT_PARQUET and not parquet_available():
+        raise ExportError("parquet export requires pyarrow")
+
+    qs = build_queryset(dataset, location_ids=location_ids, start=start, end=end)
+    fields = fields_for(dataset)
+    rows = iter_rows(qs, chunk_size=chunk_size)
+
+    if fmt == FORMAT_PARQUET:
+        return _parquet_chunks(rows, fields, batch_rows=chunk_size)
+    if fmt == FORMAT_CSV:
+        return gzip_stream(_csv_lines(rows, fields))
+    return gzip_stream(_ndjson_lines(rows, fields))
+
+
+def parse_bound(raw: Optional[str]) -> Optional[datetime]:
+    """'2025-11-01' 또는 ISO datetime 문자열 → aware datetime (naive 는 현지 시간 기준)"""
+    if not raw:
+        return None
+    dt = parse_datetime(raw)
+    if dt is None:
+        raise ExportError(f"잘못된 날짜 형식: {raw}")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def parse_location_ids(raw: Optional[str]) -> List[int]:
+    if not raw:
+        return []
+    try:
+        return [int(x) for x in raw.split(",") if x.strip()]
+    except ValueError:
+        raise ExportError("location_id 는 쉼표로 구분된 숫자여야 합니다.")
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from datetime import timezone as py_tz
+from typing import Any, Dict, List, Optional, Sequence, TypedDict
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from apps.weather.models import WeatherData, WeatherLocation
+from apps.weather.services import hotkeys
+
+SERIES_CACHE_TTL = 600  # 10분
+SERIES_CACHE_PREFIX = "weather:forecast_series"
+SERIES_VERSION_PREFIX = "weather:forecast_series_ver"
+FORECAST_WINDOW_DAYS = 5
+HOUR = 3600
+DAY = 86400
+# 조회 빈도 등급별 TTL. 새 예보 저장 시 버전 무효화되므로 hot 은 슬롯 끝까지 유지
+SERIES_CACHE_TTLS: Dict[hotkeys.Tier, int] = {
+    "hot": 3 * HOUR,
+    "warm": SERIES_CACHE_TTL,
+    "cold": 120,
+}
+# 윈도우 안 예보 슬롯이 이보다 적거나 가장 최근 수신이 이보다 오래되면 예보를 다시 받음
+MIN_SLOTS = 8  # 하루치
+MAX_FORECAST_AGE = 6 * HOUR
+
+
+class HourlyOut(TypedDict):
+    valid_time: str
+    temperature: float | None
+    feels_like: float | None
+    humidity: int | None
+    condition: str | None
+
+
+class DailyOut(TypedDict):
+    date: str
+    temp_min: float
+    temp_max: float
+    temp_avg: float
+    feels_like_min: float
+    feels_like_max: float
+    humidity_avg: float | None
+    rain_volume_sum: float
+    rain_probability_max: float | None
+    condition: str | None
+
+
+class SeriesOut(TypedDict):
+    location_id: int
+    base_time: str
+    hourly: List[HourlyOut]
+    daily: List[DailyOut]
+
+
+def _version_key(location_id: int) -> str:
+    return f"{SERIES_VERSION_PREFIX}:{location_id}"
+
+
+def _cache_key(location_id: int, base_ts: int) -> str:
+    ver = cache.get(_version_key(location_id)) or 0
+    return f"{SERIES_CACHE_PREFIX}:{location_id}:{base_ts}:{ver}"
+
+
+def _window_start(now: datetime) -> datetime:
+    """3시간 슬롯 경계로 내림 (진행 중인 슬롯부터 포함)"""
+    now = now.astimezone(py_tz.utc)
+    return now.replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=now.hour % 3
+    )
+
+
+def load_rows(location: WeatherLocation, *, start: datetime) -> List[tuple]:
+    """윈도우 안 예보 행 (마지막 열은 예보 수신 시각 base_time)
+
+    같은 테이블의 현재 날씨 관측(base_time == valid_time)은 3시간 슬롯이 아니므로 제외한다.
+    """
+    return list(
+        WeatherData.objects.filter(
+            location=location,
+            valid_time__gte=start,
+            valid_time__lt=start + timedelta(days=FORECAST_WINDOW_DAYS + 1),
+        )
+        .exclude(base_time=F("valid_time"))
+        .order_by("valid_time")
+        .values_list(
+            "valid_time",
+            "temperature",
+            "feels_like",
+            "humidity",
+            "rain_volume",
+            "rain_probability",
+            "condition",
+            "base_time",
+        )
+    )
+
+
+def _usable(rows: List[tuple], now: datetime) -> bool:
+    """슬롯이 충분하고 최근에 받은 예보인지"""
+    if len(rows) < MIN_SLOTS:
+        return False
+    issued = max(r[-1] for r in rows)
+    return (now - issued).total_seconds() < MAX_FORECAST_AGE
+
+
+def _to_float(values: Sequence[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _interp_nan(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """결측(NaN) 포인트를 제외하고 선형 보간 (전부 결측이면 NaN)"""
+    ok = ~np.isnan(fp)
+    if not ok.any():
+        return np.full(x.shape, np.nan)
+    return np.interp(x, xp[ok], fp[ok])
+
+
+def _round_list(arr: np.ndarray, ndigits: int = 1) -> List[float | None]:
+    return [None if np.isnan(v) else v for v in np.round(arr, ndigits).tolist()]
+
+
+def build_series(rows: List[tuple], *, tz=None) -> Dict[str, List[Any]]:
+    """3시간 예보 행 → 시간별 보간 곡선 + 일별 요약 (numpy 벡터 연산)"""
+    if not rows:
+        return {"hourly": [], "daily": []}
+
+    tz = tz or timezone.get_current_timezone()
+    cols = list(zip(*rows))
+    ts = np.array([dt.timestamp() for dt in cols[0]], dtype=np.float64)
+    temp = _to_float(cols[1])
+    feels = _to_float(cols[2])
+    humi = _to_float(cols[3])
+    rain = np.nan_to_num(_to_float(cols[4]))
+    pop = _to_float(cols[5])
+    conds = np.array([c or "" for c in cols[6]], dtype=object)
+
+    # -----------------------------
+    # 1) 시간별 보간
+    # -----------------------------
+    hours = np.arange(ts[0], ts[-1] + 1, HOUR)
+    h_temp = np.interp(hours, ts, temp)
+    h_feels = np.interp(hours, ts, feels)
+    h_humi = _interp_nan(hours, ts, humi)
+    # 상태는 보간하지 않고 직전 슬롯 값을 유지
+    slot_idx = np.searchsorted(ts, hours, side="right") - 1
+    h_cond = conds[slot_idx]
+
+    # -----------------------------
+    # 2) 일별 집계 (한 번의 reduceat)
+    # -----------------------------
+    # 현지 시간 기준 날짜. 서비스 지역(Asia/Seoul)은 DST 가 없어 첫 슬롯의 오프셋을 공통 적용
+    offset = tz.utcoffset(cols[0][0].replace(tzinfo=None)).total_seconds()
+    day_no = ((ts + offset) // DAY).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, day_no[1:] != day_no[:-1]])
+    counts = np.diff(np.r_[starts, len(ts)])
+
+    values = np.column_stack([temp, feels])
+    d_min = np.minimum.reduceat(values, starts, axis=0)
+    d_max = np.maximum.reduceat(values, starts, axis=0)
+    sums = np.add.reduceat(
+        np.column_stack([temp, np.nan_to_num(humi), rain, ~np.isnan(humi)]),
+        starts,
+        axis=0,
+    )
+    d_temp_avg = sums[:, 0] / counts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d_humi_avg = np.where(sums[:, 3] > 0, sums[:, 1] / sums[:, 3], np.nan)
+    d_rain = sums[:, 2]
+    d_pop = np.fmax.reduceat(pop, starts)
+
+    # 가장 많이 등장한 상태 (day × condition 빈도표의 argmax)
+    cond_names, cond_codes = np.unique(conds, return_inverse=True)
+    day_idx = np.repeat(np.arange(len(starts)), counts)
+    freq = np.bincount(
+        day_idx * len(cond_names) + cond_codes,
+        minlength=len(starts) * len(cond_names),
+    ).reshape(len(starts), len(cond_names))
+    d_cond = cond_names[freq.argmax(axis=1)]
+
+    hourly: List[HourlyOut] = [
+        {
+            "valid_time": datetime.fromtimestamp(t, tz=tz).isoformat(),
+            "temperature": tv,
+            "feels_like": fv,
+            "humidity": None if hv is None else int(round(hv)),
+            "condition": cv or None,
+        }
+        for t, tv, fv, hv, cv in zip(
+            hours.tolist(),
+            _round_list(h_temp),
+            _round_list(h_feels),
+            _round_list(h_humi, 0),
+            h_cond.tolist(),
+        )
+    ]
+
+    daily: List[DailyOut] = [
+        {
+            "date": datetime.fromtimestamp(int(ts[s]), tz=tz).date().isoformat(),
+            "temp_min": tmin,
+            "temp_max": tmax,
+            "temp_avg": tavg,
+            "feels_like_min": fmin,
+            "feels_like_max": fmax,
+            "humidity_avg": havg,
+            "rain_volume_sum": rsum,
+            "rain_probability_max": pmax,
+            "condition": cond or None,
+        }
+        for s, tmin, tmax, tavg, fmin, fmax, havg, rsum, pmax, cond in zip(
+            starts.tolist(),
+            _round_list(d_min[:, 0]),
+            _round_list(d_max[:, 0]),
+            _round_list(d_temp_avg),
+            _round_list(d_min[:, 1]),
+            _round_list(d_max[:, 1]),
+            _round_list(d_humi_avg),
+            _round_list(d_rain),
+            _round_list(d_pop),
+            d_cond.tolist(),
+        )
+    ]
+    return {"hourly": hourly, "daily": daily}
+
+
+def get_series(
+    location: WeatherLocation, *, now: datetime | None = None, ttl: int | None = None
+) -> Optional[SeriesOut]:
+    """(location, base_time) 단위로 캐시된 시간별/일별 예보 (hit 시 DB 조회 없음)
+
+    저장된 예보가 없거나 부족/오래됐으면 None (호출부가 예보를 새로 받음).
+    """
+    now = now or timezone.now()
+    base = _window_start(now)
+    key = _cache_key(location.id, int(base.timestamp()))
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    rows = load_rows(location, start=base)
+    if not _usable(rows, now):
+        return None
+
+    series = build_series(rows)
+    out: SeriesOut = {
+        "location_id": location.id,
+        "base_time": base.isoformat(),
+        "hourly": series["hourly"],
+        "daily": series["daily"],
+    }
+    cache.set(key, out, timeout=ttl or SERIES_CACHE_TTL)
+    return out
+
+
+def invalidate(location_id: int) -> None:
+    """새 예보가 저장되면 버전을 올려 이전 (location, base_time) 캐시를 무효화"""
+    key = _version_key(location_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
@@ -0,0 +1,167 @@
+"""날씨 조회 hot key 추적 (count-min sketch + top-K)
+
+조회 키(좌표 격자 라벨)마다 윈도우 단위 빈도를 count-min sketch 로 근사한다.
+sketch 셀은 공유 캐시(Redis/locmem)의 정수 키라 워커가 여러 개여도 합산되고,
+윈도우가 지나면 TTL 로 함께 사라진다. 빈도로 캐시 TTL 등급(hot/warm/cold)을 정해
+자주 찾는 위치는 오래·미리 갱신하고, 드문 위치는 빨리 만료시킨다.
+
+Redis(django-redis) 에서는 sketch 증가와 top-K(ZSET) 갱신을 Lua 스크립트 하나로 처리해
+조회당 왕복 1회에 원자적으로 반영한다. 그 외(locmem 등)는 프로세스 로컬 캐시이므로 top-K
+갱신만 프로세스 락으로 묶는다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Literal, Tuple, TypedDict
+
+from django.core.cache import cache
+
+from apps.core.cache import redis_client
+
+HOT_PREFIX = "weather:hot"
+WINDOW_SECONDS = 600  # 10분 윈도우
+SKETCH_DEPTH = 4
+SKETCH_WIDTH = 2048
+TOP_K = 50
+
+# 윈도우당 조회 수 기준 등급
+HOT_MIN_HITS = 20
+WARM_MIN_HITS = 3
+
+# hot 키는 TTL 의 이 비율이 지나면 만료 전에 미리 갱신
+REFRESH_AHEAD_RATIO = 0.5
+
+Tier = Literal["hot", "warm", "cold"]
+
+# KEYS: sketch 셀들 + top-K ZSET, ARGV: 조회 키, TTL, TOP_K → 추정 빈도
+_RECORD_LUA = """
+local n
+for i = 1, #KEYS - 1 do
+  local c = redis.call('INCR', KEYS[i])
+  if c == 1 then redis.call('EXPIRE', KEYS[i], ARGV[2]) end
+  if not n or c < n then n = c end
+end
+local top = KEYS[#KEYS]
+redis.call('ZADD', top, n, ARGV[1])
+if redis.call('ZCARD', top) > tonumber(ARGV[3]) then
+  redis.call('ZREMRANGEBYRANK', top, 0, -tonumber(ARGV[3]) - 1)
+end
+redis.call('EXPIRE', top, ARGV[2])
+return n
+"""
+
+_top_lock = threading.Lock()
+
+
+class HotKeyOut(TypedDict):
+    key: str
+    count: int
+    tier: Tier
+
+
+def _window(now: float | None = None) -> int:
+    return int((now if now is not None else time.time()) // WINDOW_SECONDS)
+
+
+def _cells(key: str) -> List[int]:
+    """행마다 독립적인 열 인덱스 (blake2b 다이제스트를 4바이트씩 나눠 사용)"""
+    digest = hashlib.blake2b(key.encode(), digest_size=4 * SKETCH_DEPTH).digest()
+    return [
+        int.from_bytes(digest[i * 4 : i * 4 + 4], "little") % SKETCH_WIDTH
+        for i in range(SKETCH_DEPTH)
+    ]
+
+
+def _cell_key(window: int, row: int, col: int) -> str:
+    return f"{HOT_PREFIX}:cms:{window}:{row}:{col}"
+
+
+def _top_key(window: int) -> str:
+    return f"{HOT_PREFIX}:top:{window}"
+
+
+def _incr(key: str) -> int:
+    # 윈도우 두 개 분량만 유지 (직전 윈도우 top-K 조회용). 보통은 incr 한 번으로 끝남
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=WINDOW_SECONDS * 2):
+            return 1
+        return cache.incr(key)  # 다른 요청이 먼저 만든 경우
+
+
+def _update_top(window: int, key: str, count: int) -> None:
+    """근사 top-K 갱신 (후보 밖이고 최소값보다 작으면 쓰기 생략)"""
+    tk = _top_key(window)
+    with _top_lock:
+        top: Dict[str, int] = cache.get(tk) or {}
+        if key not in top and len(top) >= TOP_K and count <= min(top.values()):
+            return
+        top[key] = count
+        if len(top) > TOP_K:
+            del top[min(top, key=top.__getitem__)]
+        cache.set(tk, top, timeout=WINDOW_SECONDS * 2)
+
+
+def record(key: str, *, now: float | None = None) -> int:
+    """조회 1회 기록 후 현재 윈도우의 추정 빈도 반환"""
+    window = _window(now)
+    cells = [_cell_key(window, row, col) for row, col in enumerate(_cells(key))]
+    r = redis_client()
+    if r is not None:
+        keys = [cache.make_key(k) for k in (*cells, _top_key(window))]
+        return int(
+            r.eval(_RECORD_LUA, len(keys), *keys, key, WINDOW_SECONDS * 2, TOP_K)
+        )
+
+    count = min(_incr(cell) for cell in cells)
+    _update_top(window, key, count)
+    return count
+
+
+def _load_top(window: int) -> Dict[str, int]:
+    r = redis_client()
+    if r is None:
+        return cache.get(_top_key(window)) or {}
+    pairs = r.zrange(cache.make_key(_top_key(window)), 0, -1, withscores=True)
+    return {m.decode() if isinstance(m, bytes) else m: int(c) for m, c in pairs}
+
+
+def tier_for(count: int) -> Tier:
+    if count >= HOT_MIN_HITS:
+        return "hot"
+    if count >= WARM_MIN_HITS:
+        return "warm"
+    return "cold"
+
+
+def ttl_for(count: int, ttls: Dict[Tier, int]) -> int:
+    return ttls[tier_for(count)]
+
+
+def needs_refresh(
+    count: int, fetched_at: float, ttl: int, *, now: float | None = None
+) -> bool:
+    """hot 키이고 TTL 의 REFRESH_AHEAD_RATIO 이상 지났으면 만료 전 갱신 대상"""
+    if tier_for(count) != "hot":
+        return False
+    age = (now if now is not None else time.time()) - fetched_at
+    return age >= ttl * REFRESH_AHEAD_RATIO
+
+
+def top_k(
+    limit: int = TOP_K, *, now: float | None = None
+) -> Tuple[int, List[HotKeyOut]]:
+    """(윈도우 시작 epoch, 빈도 내림차순 목록). 새 윈도우가 비어 있으면 직전 윈도우"""
+    window = _window(now)
+    top = _load_top(window)
+    if not top:
+        window -= 1
+        top = _load_top(window)
+    items = sorted(top.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    return window * WINDOW_SECONDS, [
+        {"key": k, "count": c, "tier": tier_for(c)} for k, c in items
+    ]
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, Count, Value, When
+
+from apps.weather.models import WeatherData, WeatherLocation
+from apps.weather.services import forecast_series
+
+# 좌표 격자 (소수 2자리 ≈ 1km). 같은 격자 안의 위치는 하나의 WeatherLocation 으로 본다
+COORD_PRECISION = 2
+_GRID = 10**-COORD_PRECISION
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_name(value: Optional[str]) -> str:
+    return _WS.sub(" ", (value or "").strip())
+
+
+def grid_key(lat: float, lon: float) -> Tuple[float, float]:
+    return round(float(lat), COORD_PRECISION), round(float(lon), COORD_PRECISION)
+
+
+def coord_label(lat: float, lon: float) -> str:
+    """이름 없는 위치의 district/dp_name 으로 쓰는 격자 좌표 문자열"""
+    glat, glon = grid_key(lat, lon)
+    return f"{glat:.{COORD_PRECISION}f},{glon:.{COORD_PRECISION}f}"
+
+
+def is_unnamed(loc: WeatherLocation) -> bool:
+    return not loc.city
+
+
+def name_key(city: Optional[str], district: Optional[str]) -> Tuple[str, str]:
+    """공백/대소문자 차이를 무시한 (city, district) 비교 키"""
+    return normalize_name(city).casefold(), normalize_name(district).casefold()
+
+
+def _display_name(city: str, district: str) -> str:
+    return f"{city} {district}".strip()
+
+
+def _nearby(lat: float, lon: float) -> List[WeatherLocation]:
+    """같은 격자에 속한 위치 (이름 있는 위치 우선, 오래된 순)"""
+    key = grid_key(lat, lon)
+    cands = WeatherLocation.objects.filter(
+        lat__gte=key[0] - _GRID,
+        lat__lte=key[0] + _GRID,
+        lon__gte=key[1] - _GRID,
+        lon__lte=key[1] + _GRID,
+    ).order_by("id")
+    same = [c for c in cands if grid_key(c.lat, c.lon) == key]
+    return sorted(same, key=lambda c: (is_unnamed(c), c.id))
+
+
+def resolve_location(
+    *,
+    lat: float | None = None,
+    lon: float | None = None,
+    city: str | None = None,
+    district: str | None = None,
+) -> Optional[WeatherLocation]:
+    """모든 경로가 공유하는 WeatherLocation 정규화 조회/생성
+
+    1) (city, district) 이름이 정확히 일치하는 위치
+    2) 같은 좌표 격자에 있는 위치 — 이름이 주어지면 같은 이름이거나 이름이 없던 위치만
+       (이름이 없던 위치면 이름을 채움). 같은 격자의 다른 지역 이름은 재사용하지 않음
+    3) 없으면 생성 — 이름이 없으면 격자 좌표를 district/dp_name 으로 사용
+    """
+    city_n = normalize_name(city)
+    district_n = normalize_name(district)
+    has_xy = lat is not None and lon is not None
+
+    if city_n:
+        loc = WeatherLocation.objects.filter(city=city_n, district=district_n).first()
+        if loc:
+            return loc
+
+    if not has_xy:
+        return None
+
+    wanted = name_key(city_n, district_n)
+    for loc in _nearby(lat, lon):  # type: ignore[arg-type]
+        if (
+            city_n
+            and not is_unnamed(loc)
+            and name_key(loc.city, loc.district) != wanted
+        ):
+            continue
+        if city_n and is_unnamed(loc):
+            loc.city = city_n
+            loc.district = district_n
+            loc.dp_name = _display_name(city_n, district_n)
+            try:
+                with transaction.atomic():
+                    loc.save(update_fields=["city", "district", "dp_name"])
+            except IntegrityError:
+                loc.refresh_from_db()
+        return loc
+
+    if city_n:
+        fields = {"city": city_n, "district": district_n}
+        dp_name = _display_name(city_n, district_n)
+    else:
+        label = coord_label(lat, lon)  # type: ignore[arg-type]
+        fields = {"city": "", "district": label}
+        dp_name = label
+
+    loc, _ = WeatherLocation.objects.get_or_create(
+        **fields,
+        defaults={"lat": float(lat), "lon": float(lon), "dp_name": dp_name},  # type: ignore[arg-type]
+    )
+    return loc
+
+
+# -----------------------------
+# 중복 위치 병합
+# -----------------------------
+def find_duplicate_groups() -> List[List[int]]:
+    """같은 격자 + 같은 (정규화한) 이름의 위치 id 묶음 (첫 번째가 남길 위치)
+
+    이름 없는 위치는 resolve_location 이 좌표만으로 돌려주는 위치(격자의 첫 이름 있는 위치)에
+    합치고, 같은 격자라도 이름이 다른 지역은 합치지 않는다.
+    """
+    rows = WeatherLocation.objects.annotate(n=Count("weather_data")).values_list(
+        "id", "city", "district", "lat", "lon", "n"
+    )
+    Member = Tuple[int, str, int]
+    cells: Dict[Tuple[float, float], Dict[Tuple[str, str], List[Member]]] = {}
+    for loc_id, city, district, lat, lon, n in rows:
+        names = cells.setdefault(grid_key(lat, lon), {})
+        key = name_key(city, district) if city else ("", "")
+        names.setdefault(key, []).append((loc_id, city, n))
+
+    out: List[List[int]] = []
+    for names in cells.values():
+        unnamed = names.pop(("", ""), [])
+        groups = list(names.values())
+        if unnamed:
+            if groups:
+                # _nearby 순서(오래된 순)의 첫 이름 있는 위치 그룹
+                first = min(groups, key=lambda g: min(m[0] for m in g))
+                first.extend(unnamed)
+            else:
+                groups.append(unnamed)
+        for members in groups:
+            if len(members) < 2:
+                continue
+            # 이름 있는 위치 → 데이터 많은 위치 → 오래된 위치 순으로 대표 선정
+            members.sort(key=lambda m: (not m[1], -m[2], m[0]))
+            out.append([m[0] for m in members])
+    return out
+
+
+def _repoint_weather_fk(model, mapping: Dict[int, int], batch_size: int) -> int:
+    """model.weather_data 를 old → new 로 일괄 변경 (배치당 UPDATE 1회)"""
+    items = list(mapping.items())
+    updated = 0
+    for i in range(0, len(items), batch_size):
+        batch = items[i : i + batch_size]
+        updated += model.objects.filter(
+            weather_data_id__in=[old for old, _ in batch]
+        ).update(
+            weather_data_id=Case(
+                *[When(weather_data_id=old, then=Value(new)) for old, new in batch],
+                output_field=BigIntegerField(),
+            )
+        )
+    return updated
+
+
+def merge_locations(
+    survivor_id: int, duplicate_ids: Iterable[int], *, batch_size: int = 500
+) -> Dict[str, int]:
+    """duplicate_ids 의 WeatherData/Diary/OutfitRecommendation 을 survivor 로 옮기고 삭제"""
+    from apps.diary.models import Diary
+    from apps.recommend.models import OutfitRecommendation
+
+    stats = {"locations": 0, "moved": 0, "collapsed": 0, "repointed": 0}
+    dup_ids = [d for d in duplicate_ids if d != survivor_id]
+    if not dup_ids:
+        return stats
+
+    with transaction.atomic():
+        survivor_times = dict(
+            WeatherData.objects.filter(location_id=survivor_id).values_list(
+                "valid_time", "id"
+            )
+        )
+        # 같은 valid_time 이 이미 대표 위치에 있으면 FK 를 대표 행으로 돌리고 삭제
+        mapping: Dict[int, int] = {}
+        for dup_row_id, vt in WeatherData.objects.filter(
+            location_id__in=dup_ids
+        ).values_list("id", "valid_time"):
+            if vt in survivor_times:
+                mapping[dup_row_id] = survivor_times[vt]
+            else:
+                survivor_times[vt] = dup_row_id  # 먼저 옮겨지는 행이 대표가 됨
+
+        stats["repointed"] += _repoint_weather_fk(Diary, mapping, batch_size)
+        stats["repointed"] += _repoint_weather_fk(
+            OutfitRecommendation, mapping, batch_size
+        )
+        collapse_ids = list(mapping)
+        for i in range(0, len(collapse_ids), batch_size):
+            stats["collapsed"] += WeatherData.objects.filter(
+                id__in=collapse_ids[i : i + batch_size]
+            ).delete()[0]
+
+        stats["moved"] = WeatherData.objects.filter(location_id__in=dup_ids).update(
+            location_id=survivor_id
+        )
+        stats["locations"] = WeatherLocation.objects.filter(id__in=dup_ids).delete()[0]
+
+    transaction.on_commit(lambda: forecast_series.invalidate(survivor_id))
+    return stats
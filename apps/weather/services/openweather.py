@@ -1,8 +1,14 @@
 from datetime import datetime
-from typing import Any, Dict, TypedDict
+from typing import Any, Dict, TypedDict, TypeVar
 
+import httpx
 import requests
 from django.conf import settings
+from pydantic import TypeAdapter, ValidationError
+
+from apps.weather.services import schemas
+
+T = TypeVar("T")
 
 
 class ProviderError(Exception): ...
@@ -29,9 +35,8 @@ headers = {
 }
 
 
-def _request(
-    path: str, params: Dict[str, Any], timeout: int | None = None
-) -> Dict[str, Any]:
+def _request(path: str, params: Dict[str, Any], timeout: int | None = None) -> bytes:
+    """응답 본문 바이트 (파싱·검증은 스키마 어댑터의 validate_json 에서 한 번만)"""
     base = settings.OPENWEATHER["BASE_URL"]
     api_key = settings.OPENWEATHER["API_KEY"]
     timeout = timeout or settings.OPENWEATHER.get("TIMEOUT", 5)
@@ -41,57 +46,108 @@ def _request(
         if r.status_code >= 500:
             raise ProviderError("provider_XXX")
         r.raise_for_status()
-        return r.json()
+        return r.content
     except requests.exceptions.Timeout:
         raise ProviderTimeout()
     except requests.RequestException as e:
         raise ProviderError(str(e))
 
 
-def get_current(lat: float, lon: float, *, timeout: int | None = None) -> CurrentOut:
-    data = _request("/data/2.5/weather", {"lat": lat, "lon": lon}, timeout)
-    main = data.get("main", {})
-    weather0 = (data.get("weather") or [{}])[0]
-    wind = data.get("wind", {})
-    rain = data.get("rain", {}) or {}
+async def _arequest(
+    path: str, params: Dict[str, Any], timeout: int | None = None
+) -> bytes:
+    """_request 의 비동기 버전 (ASGI 뷰에서 이벤트 루프를 막지 않음)"""
+    base = settings.OPENWEATHER["BASE_URL"]
+    api_key = settings.OPENWEATHER["API_KEY"]
+    timeout = timeout or settings.OPENWEATHER.get("TIMEOUT", 5)
+    p = {"appid": api_key, "units": "metric", "lang": "kr", **params}
+    try:
+        async with httpx.AsyncClient(headers=headers, timeout=timeout) as c:
+            r = await c.get(f"{base}{path}", params=p)
+        if r.status_code >= 500:
+            raise ProviderError("provider_XXX")
+        r.raise_for_status()
+        return r.content
+    except httpx.TimeoutException:
+        raise ProviderTimeout()
+    except httpx.HTTPError as e:
+        raise ProviderError(str(e))
+
+
+def _validate(adapter: TypeAdapter[T], body: bytes) -> T:
+    try:
+        return adapter.validate_json(body)
+    except ValidationError:
+        raise ProviderError("invalid_payload")
+
+
+def parse_current(body: bytes) -> CurrentOut:
+    data = _validate(schemas.current_adapter, body)
+    main = data["main"]
+    cond = schemas.first_condition(data)
+    return {
+        "base_time": data.get("dt") or 0,
+        "temperature": main["temp"],
+        "feels_like": main["feels_like"],
+        "humidity": main.get("humidity"),
+        "wind_speed": (data.get("wind") or {}).get("speed"),
+        "rain_volume": schemas.rain_volume(data, prefer="1h"),
+        "condition": cond.get("main"),
+        "icon": cond.get("icon"),
+        "raw": dict(data),
+    }
+
+
+def parse_historical(body: bytes) -> CurrentOut:
+    cur = _validate(schemas.timemachine_adapter, body)["current"]
+    cond = schemas.first_condition(cur)
     return {
-        "base_time": int(data.get("dt") or 0),
-        "temperature": float(main.get("temp")),
-        "feels_like": float(main.get("feels_like")),
-        "humidity": int(main["humidity"]) if "humidity" in main else None,
-        "wind_speed": float(wind["speed"]) if "speed" in wind else None,
-        "rain_volume": float(rain.get("1h") or rain.get("3h") or 0.0),
-        "condition": weather0.get("main"),
-        "icon": weather0.get("icon"),
-        "raw": data,
+        "base_time": cur.get("dt") or 0,
+        "temperature": cur["temp"],
+        "feels_like": cur["feels_like"],
+        "humidity": cur.get("humidity"),
+        "wind_speed": cur.get("wind_speed"),
+        "rain_volume": schemas.rain_volume(cur, prefer="1h"),
+        "condition": cond.get("main"),
+        "icon": cond.get("icon"),
+        "raw": dict(cur),
     }
 
 
+def parse_forecast(body: bytes) -> schemas.ForecastPayload:
+    return _validate(schemas.forecast_adapter, body)
+
+
+def get_current(lat: float, lon: float, *, timeout: int | None = None) -> CurrentOut:
+    return parse_current(
+        _request("/data/2.5/weather", {"lat": lat, "lon": lon}, timeout)
+    )
+
+
+async def aget_current(
+    lat: float, lon: float, *, timeout: int | None = None
+) -> CurrentOut:
+    return parse_current(
+        await _arequest("/data/2.5/weather", {"lat": lat, "lon": lon}, timeout)
+    )
+
+
 def get_historical(
     lat: float, lon: float, date: datetime, *, timeout: int | None = None
-) -> dict:
+) -> CurrentOut:
     ts = int(date.timestamp())  # Unix timestamp
-    data = _request(
-        "/data/2.5/onecall/timemachine", {"lat": lat, "lon": lon, "dt": ts}, timeout
+    return parse_historical(
+        _request(
+            "/data/2.5/onecall/timemachine",
+            {"lat": lat, "lon": lon, "dt": ts},
+            timeout,
+        )
     )
-    main = data.get("current", {})
-    weather0 = (main.get("weather") or [{}])[0]
-    wind = main.get("wind", {})
-    rain = main.get("rain", {}) or {}
-    return {
-        "base_time": int(main.get("dt") or 0),
-        "temperature": float(main.get("temp")),
-        "feels_like": float(main.get("feels_like")),
-        "humidity": int(main.get("humidity")) if "humidity" in main else None,
-        "wind_speed": float(wind.get("speed")) if "speed" in wind else None,
-        "rain_volume": float(rain.get("1h") or rain.get("3h") or 0.0),
-        "condition": weather0.get("main"),
-        "icon": weather0.get("icon"),
-        "raw": main,
-    }
 
 
 def get_forecast(
     lat: float, lon: float, *, timeout: int | None = None
-) -> Dict[str, Any]:
-    return _request("/data/2.5/forecast", {"lat": lat, "lon": lon}, timeout)
+) -> schemas.ForecastPayload:
+    return parse_forecast(
+        _request("/data/2.5/forecast", {"lat": lat, "lon": lon}, timeout)
+    )
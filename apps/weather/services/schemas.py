@@ -0,0 +1,109 @@
+"""OpenWeather 응답 스키마 (pydantic v2)
+
+응답 바이트를 ``TypeAdapter.validate_json`` 으로 바로 검증한다. 스키마는 TypedDict 라
+결과가 그대로 dict 이고, ``extra="allow"`` 로 모르는 필드도 남기 때문에 한 번의 파싱으로
+타입이 보장된 값과 raw_payload 용 원본을 함께 얻는다.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import ConfigDict, TypeAdapter, with_config
+from typing_extensions import NotRequired, TypedDict
+
+_config = ConfigDict(extra="allow")
+
+
+@with_config(_config)
+class Main(TypedDict):
+    temp: float
+    feels_like: float
+    humidity: NotRequired[int]
+
+
+@with_config(_config)
+class Condition(TypedDict, total=False):
+    main: str
+    icon: str
+
+
+@with_config(_config)
+class Wind(TypedDict, total=False):
+    speed: float
+
+
+# 키("1h", "3h")가 식별자가 아니라 함수형 선언. 타입 검사기가 타입으로 인식하도록
+# with_config(...) 로 감싸지 않고 같은 속성을 직접 붙임
+Precip = TypedDict("Precip", {"1h": float, "3h": float}, total=False)
+setattr(Precip, "__pydantic_config__", _config)
+
+
+@with_config(_config)
+class CurrentPayload(TypedDict):
+    """/data/2.5/weather"""
+
+    dt: NotRequired[int]
+    main: Main
+    weather: NotRequired[List[Condition]]
+    wind: NotRequired[Wind]
+    rain: NotRequired[Optional[Precip]]
+    name: NotRequired[str]
+
+
+@with_config(_config)
+class ForecastItem(TypedDict):
+    """/data/2.5/forecast 의 list 원소 (3시간 간격)"""
+
+    dt: int
+    main: Main
+    weather: NotRequired[List[Condition]]
+    wind: NotRequired[Wind]
+    pop: NotRequired[Optional[float]]
+    rain: NotRequired[Optional[Precip]]
+
+
+@with_config(_config)
+class ForecastCity(TypedDict, total=False):
+    name: str
+
+
+@with_config(_config)
+class ForecastPayload(TypedDict):
+    list: NotRequired[List[ForecastItem]]
+    city: NotRequired[ForecastCity]
+
+
+@with_config(_config)
+class TimemachineCurrent(TypedDict):
+    dt: NotRequired[int]
+    temp: float
+    feels_like: float
+    humidity: NotRequired[int]
+    wind_speed: NotRequired[float]
+    weather: NotRequired[List[Condition]]
+    rain: NotRequired[Optional[Precip]]
+
+
+@with_config(_config)
+class TimemachinePayload(TypedDict):
+    """/data/2.5/onecall/timemachine"""
+
+    current: TimemachineCurrent
+
+
+# 스키마 컴파일은 import 시 한 번만
+current_adapter = TypeAdapter(CurrentPayload)
+forecast_adapter = TypeAdapter(ForecastPayload)
+timemachine_adapter = TypeAdapter(TimemachinePayload)
+
+
+def first_condition(block) -> Condition:
+    weather = block.get("weather") or [{}]
+    return weather[0]
+
+
+def rain_volume(block, *, prefer: str = "1h") -> float:
+    rain = block.get("rain") or {}
+    other = "3h" if prefer == "1h" else "1h"
+    return float(rain.get(prefer) or rain.get(other) or 0.0)
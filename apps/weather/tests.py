@@ -1,3 +1,436 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as py_tz
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.core.streaming import streaming_body
+from apps.weather import repository as repo
+from apps.weather.models import WeatherData, WeatherLocation
+from apps.weather.services import export, forecast_series, hotkeys, locations
+from apps.weather.services import openweather as ow
+
+User = get_user_model()
+
+
+class WeatherExportTests(TestCase):
+    def setUp(self):
+        self.loc = WeatherLocation.objects.create(
+            city="Seoul", district="Jongno", lat=37.57, lon=126.98, dp_name="Seoul"
+        )
+        self.other = WeatherLocation.objects.create(
+            city="Busan", district="Haeundae", lat=35.16, lon=129.16, dp_name="Busan"
+        )
+        base = datetime(2025, 11, 1, 0, 0, tzinfo=py_tz.utc)
+        for i in range(6):
+            for loc in (self.loc, self.other):
+                WeatherData.objects.create(
+                    location=loc,
+                    base_time=base,
+                    valid_time=base + timedelta(hours=6 * i),
+                    temperature=10.0 + i,
+                    feels_like=9.0 + i,
+                    humidity=50,
+                    rain_volume=1.0,
+                    condition="Clear",
+                )
+        self.client = APIClient()
+
+    def _ndjson(self, chunks):
+        raw = gzip.decompress(b"".join(chunks)).decode("utf-8")
+        return [json.loads(line) for line in raw.splitlines()]
+
+    def test_ndjson_filters_by_location_and_range(self):
+        """location / 시간 범위 필터 적용된 gzip NDJSON"""
+        rows = self._ndjson(
+            export.stream_export(
+                export.DATASET_WEATHER_DATA,
+                export.FORMAT_NDJSON,
+                location_ids=[self.loc.id],
+                start=datetime(2025, 11, 1, 6, tzinfo=py_tz.utc),
+                end=datetime(2025, 11, 2, 0, tzinfo=py_tz.utc),
+                chunk_size=2,
+            )
+        )
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(r["location_id"] == self.loc.id for r in rows))
+        self.assertEqual(rows[0]["temperature"], 11.0)
+
+    def test_daily_rollup_csv(self):
+        """일별 롤업 CSV - 위치별/일자별(Asia/Seoul) 집계"""
+        raw = gzip.decompress(
+            b"".join(export.stream_export(export.DATASET_DAILY, export.FORMAT_CSV))
+        ).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(raw)))
+        self.assertEqual(len(rows), 4)
+        first = rows[0]
+        self.assertEqual(int(first["samples"]), 3)
+        self.assertEqual(float(first["temp_min"]), 10.0)
+        self.assertEqual(float(first["temp_max"]), 12.0)
+
+    @skipUnless(export.parquet_available(), "pyarrow 미설치")
+    def test_parquet_row_groups(self):
+        """parquet 출력 - chunk_size 단위 row group"""
+        import pyarrow.parquet as pq
+
+        data = b"".join(
+            export.stream_export(
+                export.DATASET_WEATHER_DATA, export.FORMAT_PARQUET, chunk_size=5
+            )
+        )
+        pf = pq.ParquetFile(io.BytesIO(data))
+        self.assertEqual(pf.metadata.num_rows, 12)
+        self.assertEqual(pf.metadata.num_row_groups, 3)
+
+    def test_export_endpoint_admin_only(self):
+        """일반 사용자는 403, 관리자는 스트리밍 응답"""
+        url = "/api/weather/export/"
+        user = User.objects.create_user(email="u@test.com", password="1234")
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(email="a@test.com", password="1234")
+        self.client.force_authenticate(user=admin)
+        resp = self.client.get(url, {"location_id": str(self.other.id)})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        rows = self._ndjson(resp.streaming_content)
+        self.assertEqual(len(rows), 6)
+
+    async def test_asgi_body_streams_chunk_by_chunk(self):
+        """ASGI 에서는 청크를 하나씩 꺼냄 (전부 모아서 보내지 않음)"""
+        produced = []
+
+        def chunks():
+            for i in range(3):
+                produced.append(i)
+                yield b"chunk"
+
+        request = AsyncRequestFactory().get("/api/weather/export/")
+        body = streaming_body(request, chunks())
+        self.assertEqual(await anext(body), b"chunk")
+        self.assertEqual(produced, [0])
+        self.assertEqual([c async for c in body], [b"chunk", b"chunk"])
+
+    def test_management_command_writes_file(self):
+        """export_weather 커맨드가 파일로 저장"""
+        path = "/tmp/weather_export_test.ndjson.gz"
+        call_command("export_weather", "--output", path, stderr=io.StringIO())
+        with open(path, "rb") as fp:
+            rows = self._ndjson([fp.read()])
+        self.assertEqual(len(rows), 12)
+
+
+class ForecastSeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.loc = WeatherLocation.objects.create(
+            city="Seoul", district="Jung", lat=37.56, lon=126.99, dp_name="Seoul Jung"
+        )
+        # 2025-11-01 12:00 KST(03:00 UTC) 부터 3시간 간격 8개 슬롯
+        self.base = datetime(2025, 11, 1, 3, 0, tzinfo=py_tz.utc)
+        temps = [12.0, 15.0, 13.0, 9.0, 6.0, 5.0, 8.0, 14.0]
+        for i, t in enumerate(temps):
+            WeatherData.objects.create(
+                location=self.loc,
+                base_time=self.base - timedelta(hours=1),  # 예보 수신 시각
+                valid_time=self.base + timedelta(hours=3 * i),
+                temperature=t,
+                feels_like=t - 1,
+                humidity=40 + i * 3,
+                rain_volume=0.5 if i >= 6 else 0.0,
+                rain_probability=20.0 * (i % 3),
+                condition="Rain" if i >= 5 else "Clear",
+            )
+        self.client = APIClient()
+
+    def test_hourly_interpolation_and_daily_summary(self):
+        """3시간 → 1시간 선형 보간, KST 기준 일별 최저/최고/강수 합계"""
+        series = forecast_series.get_series(self.loc, now=self.base)
+
+        hourly = series["hourly"]
+        self.assertEqual(len(hourly), 22)
+        self.assertEqual(hourly[1]["temperature"], 13.0)
+        self.assertEqual(hourly[2]["feels_like"], 13.0)
+        self.assertEqual(hourly[1]["humidity"], 41)
+
+        daily = series["daily"]
+        self.assertEqual([d["date"] for d in daily], ["2025-11-01", "2025-11-02"])
+        self.assertEqual((daily[0]["temp_min"], daily[0]["temp_max"]), (9.0, 15.0))
+        self.assertEqual(daily[0]["condition"], "Clear")
+        self.assertEqual(daily[1]["rain_volume_sum"], 1.0)
+        self.assertEqual(daily[1]["condition"], "Rain")
+
+    @patch("apps.weather.services.forecast_series.load_rows")
+    def test_series_cached_per_location_base_time(self, mock_rows):
+        """같은 (location, base_time) 은 DB 를 다시 읽지 않음"""
+        mock_rows.side_effect = (
+            lambda loc, start: forecast_series.WeatherData.objects.filter(location=loc)
+            .order_by("valid_time")
+            .values_list(
+                "valid_time",
+                "temperature",
+                "feels_like",
+                "humidity",
+                "rain_volume",
+                "rain_probability",
+                "condition",
+                "base_time",
+            )
+        )
+        forecast_series.get_series(self.loc, now=self.base)
+        forecast_series.get_series(self.loc, now=self.base + timedelta(hours=1))
+        self.assertEqual(mock_rows.call_count, 1)
+
+        forecast_series.invalidate(self.loc.id)
+        forecast_series.get_series(self.loc, now=self.base)
+        self.assertEqual(mock_rows.call_count, 2)
+
+    def test_current_observation_is_not_a_forecast(self):
+        """현재 날씨 관측 행은 시리즈에 섞이지 않고, 그것만 있으면 예보 없음"""
+        obs = self.base + timedelta(minutes=40)
+        WeatherData.objects.create(
+            location=self.loc,
+            base_time=obs,
+            valid_time=obs,
+            temperature=30.0,
+            feels_like=30.0,
+        )
+        series = forecast_series.get_series(self.loc, now=self.base)
+        self.assertEqual(len(series["hourly"]), 22)
+        self.assertNotIn(30.0, [h["temperature"] for h in series["hourly"]])
+
+        WeatherData.objects.filter(location=self.loc).exclude(valid_time=obs).delete()
+        forecast_series.invalidate(self.loc.id)
+        self.assertIsNone(forecast_series.get_series(self.loc, now=self.base))
+
+    def test_stale_or_short_forecast_is_refetched(self):
+        with patch.object(forecast_series, "MAX_FORECAST_AGE", 1800):
+            self.assertIsNone(forecast_series.get_series(self.loc, now=self.base))
+        # 윈도우에 남은 슬롯이 하루치보다 적음
+        later = self.base + timedelta(hours=6)
+        self.assertIsNone(forecast_series.get_series(self.loc, now=later))
+
+    @patch("apps.weather.services.forecast_series.timezone.now")
+    def test_daily_endpoint_uses_stored_rows(self, mock_now):
+        mock_now.return_value = self.base
+        resp = self.client.get(
+            "/api/weather/forecast/daily/", {"lat": 37.56, "lon": 126.99}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["daily"]), 2)
+        self.assertNotIn("hourly", resp.data)
+
+
+class LocationCanonicalizationTests(TestCase):
+    def test_resolver_reuses_grid_and_fills_names(self):
+        """좌표만으로 생성된 위치에 이후 이름이 채워지고 같은 격자는 재사용"""
+        anon = locations.resolve_location(lat=37.5665, lon=126.9780)
+        self.assertEqual(anon.city, "")
+        self.assertEqual(anon.dp_name, "37.57,126.98")
+
+        named = locations.resolve_location(
+            lat=37.5671, lon=126.9779, city=" Seoul ", district="Jung-gu"
+        )
+        self.assertEqual(named.id, anon.id)
+        self.assertEqual((named.city, named.district), ("Seoul", "Jung-gu"))
+
+        by_name = locations.resolve_location(city="Seoul", district="Jung-gu")
+        self.assertEqual(by_name.id, anon.id)
+        self.assertEqual(WeatherLocation.objects.count(), 1)
+
+    def test_same_grid_keeps_distinct_names_apart(self):
+        """같은 격자라도 이름이 다른 지역은 재사용/병합하지 않음"""
+        seoul = locations.resolve_location(
+            lat=37.5665, lon=126.9780, city="Seoul", district="Jung-gu"
+        )
+        other = locations.resolve_location(
+            lat=37.5668, lon=126.9781, city="Seoul", district="Jongno-gu"
+        )
+        self.assertNotEqual(other.id, seoul.id)
+        # 좌표만 주면 격자의 첫 이름 있는 위치
+        self.assertEqual(
+            locations.resolve_location(lat=37.5669, lon=126.9779).id, seoul.id
+        )
+
+        spaced = WeatherLocation.objects.create(
+            city="seoul ", district="JUNG-GU", lat=37.567, lon=126.978, dp_name="x"
+        )
+        anon = WeatherLocation.objects.create(
+            city="", district="", lat=37.5661, lon=126.9782, dp_name="y"
+        )
+        self.assertEqual(
+            locations.find_duplicate_groups(), [[seoul.id, spaced.id, anon.id]]
+        )
+
+    def test_merge_repoints_foreign_keys(self):
+        """중복 위치 병합 - 겹치는 valid_time 은 대표 행으로 FK 변경 후 삭제"""
+        from apps.diary.models import Diary
+
+        keep = WeatherLocation.objects.create(
+            city="Seoul", district="", lat=37.566, lon=126.978, dp_name="Seoul"
+        )
+        dup = WeatherLocation.objects.create(
+            city="", district="", lat=37.5665, lon=126.9781, dp_name="37.5665,126.9781"
+        )
+        vt = datetime(2025, 11, 1, 3, tzinfo=py_tz.utc)
+        kw = dict(base_time=vt, temperature=10.0, feels_like=9.0, humidity=50)
+        keep_row = WeatherData.objects.create(location=keep, valid_time=vt, **kw)
+        dup_same = WeatherData.objects.create(location=dup, valid_time=vt, **kw)
+        dup_new = WeatherData.objects.create(
+            location=dup, valid_time=vt + timedelta(hours=3), **kw
+        )
+        user = User.objects.create_user(email="m@test.com", password="1234")
+        diary = Diary.objects.create(
+            user=user,
+            date=vt.date(),
+            weather_data=dup_same,
+            emotion="happy",
+            title="t",
+            notes="n",
+        )
+
+        groups = locations.find_duplicate_groups()
+        self.assertEqual(groups, [[keep.id, dup.id]])
+        call_command("merge_weather_locations", stdout=io.StringIO())
+
+        self.assertFalse(WeatherLocation.objects.filter(id=dup.id).exists())
+        self.assertFalse(WeatherData.objects.filter(id=dup_same.id).exists())
+        dup_new.refresh_from_db()
+        self.assertEqual(dup_new.location_id, keep.id)
+        diary.refresh_from_db()
+        self.assertEqual(diary.weather_data_id, keep_row.id)
+
+
+class OpenWeatherParseTests(TestCase):
+    def test_forecast_keeps_extra_fields_as_raw(self):
+        body = json.dumps(
+            {
+                "list": [
+                    {
+                        "dt": 1761955200,
+                        "main": {"temp": "11.5", "feels_like": 10, "humidity": 60},
+                        "weather": [{"main": "Rain", "icon": "10d"}],
+                        "pop": 0.4,
+                        "rain": {"3h": 1.2},
+                        "visibility": 10000,
+                    }
+                ],
+                "city": {"name": "Seoul"},
+            }
+        ).encode()
+        fc = ow.parse_forecast(body)
+        row = repo.forecast_defaults(fc["list"][0])
+        self.assertEqual(row["temperature"], 11.5)
+        self.assertEqual(row["rain_probability"], 40.0)
+        self.assertEqual(row["rain_volume"], 1.2)
+        self.assertEqual(row["condition"], "Rain")
+        self.assertEqual(row["raw_payload"]["visibility"], 10000)
+
+    def test_invalid_payload_raises_provider_error(self):
+        with self.assertRaises(ow.ProviderError):
+            ow.parse_current(b'{"main": {"temp": "hot"}}')
+        with self.assertRaises(ow.ProviderError):
+            ow.parse_forecast(b"not json")
+
+
+class HotKeyCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_sketch_counts_and_top_k(self):
+        now = 1_761_955_200.0
+        for _ in range(25):
+            hotkeys.record("37.57,126.98", now=now)
+        for _ in range(2):
+            hotkeys.record("35.10,129.04", now=now)
+        self.assertEqual(hotkeys.record("33.50,126.53", now=now), 1)
+
+        _, items = hotkeys.top_k(2, now=now)
+        self.assertEqual([i["key"] for i in items], ["37.57,126.98", "35.10,129.04"])
+        self.assertEqual(items[0]["tier"], "hot")
+        self.assertEqual(items[1]["tier"], "cold")
+        # 다음 윈도우가 비어 있으면 직전 윈도우 목록
+        _, items = hotkeys.top_k(now=now + hotkeys.WINDOW_SECONDS)
+        self.assertEqual(items[0]["count"], 25)
+
+    def test_ttl_tiers_and_refresh_ahead(self):
+        ttls = {"hot": 900, "warm": 300, "cold": 60}
+        self.assertEqual(hotkeys.ttl_for(1, ttls), 60)
+        self.assertEqual(hotkeys.ttl_for(5, ttls), 300)
+        self.assertEqual(hotkeys.ttl_for(50, ttls), 900)
+        self.assertFalse(hotkeys.needs_refresh(5, 0, 300, now=299))
+        self.assertFalse(hotkeys.needs_refresh(50, 0, 900, now=100))
+        self.assertTrue(hotkeys.needs_refresh(50, 0, 900, now=450))
+
+    @patch("apps.weather.services.openweather.get_current")
+    def test_current_is_cached_per_grid(self, mock_current):
+        mock_current.return_value = {
+            "base_time": 1761955200,
+            "temperature": 10.0,
+            "feels_like": 9.0,
+            "humidity": 50,
+            "wind_speed": 1.0,
+            "rain_volume": 0.0,
+            "condition": "Clear",
+            "icon": "01d",
+            "raw": {"name": "Seoul"},
+        }
+        for lat in (37.5665, 37.5668):
+            resp = self.client.get(
+                "/api/weather/current/", {"lat": lat, "lon": 126.978}
+            )
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_current.call_count, 1)
+
+        # 같은 격자라도 지명이 다르면 앞 요청의 위치 이름을 돌려주지 않음
+        resp = self.client.get(
+            "/api/weather/current/",
+            {"lat": 37.5665, "lon": 126.978, "city": "서울", "district": "중구"},
+        )
+        self.assertEqual(mock_current.call_count, 2)
+        self.assertEqual(resp.data["location_name"], "서울 중구")
+
+    @patch("apps.weather.views._refresh_executor")
+    @patch("apps.weather.services.openweather.get_current")
+    def test_hot_key_refreshes_in_background(self, mock_current, mock_executor):
+        label = locations.coord_label(37.5665, 126.978)
+        for _ in range(hotkeys.HOT_MIN_HITS):
+            hotkeys.record(label)
+        cache.set(
+            f"weather:current:{label}",
+            {"data": {"temperature": 1.0}, "fetched_at": time.time() - 600, "ttl": 900},
+        )
+        for _ in range(2):
+            resp = self.client.get(
+                "/api/weather/current/", {"lat": 37.5665, "lon": 126.978}
+            )
+            # 갱신을 기다리지 않고 기존 값으로 응답, 갱신 예약은 한 번만
+            self.assertEqual(resp.data["temperature"], 1.0)
+        mock_current.assert_not_called()
+        self.assertEqual(mock_executor.submit.call_count, 1)
+
+    def test_hot_keys_endpoint_admin_only(self):
+        hotkeys.record("37.57,126.98")
+        resp = self.client.get("/api/weather/hot-keys/")
+        self.assertIn(resp.status_code, (401, 403))
+
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="1234"
+        )
+        self.client.force_authenticate(admin)
+        resp = self.client.get("/api/weather/hot-keys/", {"limit": 5})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["items"][0]["key"], "37.57,126.98")
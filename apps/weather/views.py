@@ -1,25 +1,52 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from datetime import timezone as py_tz
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
-from django.db import transaction
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from drf_spectacular.utils import OpenApiParameter, extend_schema
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema
 from rest_framework import permissions, serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from apps.core.streaming import streaming_body
 from apps.weather import repository as repo
 from apps.weather.models import WeatherData, WeatherLocation
 from apps.weather.serializers import (
     CurrentQuerySerializer,
+    ExportQuerySerializer,
     ForecastQuerySerializer,
     HistoryQuerySerializer,
 )
-from apps.weather.services import geocoding
+from apps.weather.services import (
+    export,
+    forecast_series,
+    geocoding,
+    hotkeys,
+    locations,
+)
 from apps.weather.services import openweather as ow
+from apps.weather.services.schemas import ForecastPayload
+
+CURRENT_CACHE_PREFIX = "weather:current"
+# 조회 빈도 등급별 현재 날씨 캐시 TTL (초)
+CURRENT_CACHE_TTLS: Dict[hotkeys.Tier, int] = {"hot": 900, "warm": 300, "cold": 60}
+REFRESH_LOCK_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+# hot 키 만료 전 갱신은 응답 경로 밖에서
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="weather-refresh"
+)
 
 
 class WeatherDataOutSerializer(serializers.ModelSerializer):
@@ -70,30 +97,128 @@ class WeatherViewSet(viewsets.GenericViewSet):
     def _get_or_create_location(
         self, *, lat: float, lon: float, city: str, district: str
     ) -> WeatherLocation:
-        loc, _ = WeatherLocation.objects.get_or_create(
-            city=city or "",
-            district=district or "",
-            defaults={
-                "lat": lat,
-                "lon": lon,
-                "dp_name": f"{(city or '').strip()} {(district or '').strip()}".strip(),
-            },
-        )
-        to_update = []
-        if loc.lat != lat:
-            loc.lat = lat
-            to_update.append("lat")
-        if loc.lon != lon:
-            loc.lon = lon
-            to_update.append("lon")
-        dp = f"{(city or '').strip()} {(district or '').strip()}".strip()
-        if getattr(loc, "dp_name", "") != dp:
-            loc.dp_name = dp
-            to_update.append("dp_name")
-        if to_update:
-            loc.save(update_fields=to_update)
+        loc = locations.resolve_location(lat=lat, lon=lon, city=city, district=district)
+        assert loc is not None  # 좌표가 있으면 항상 생성됨
         return loc
 
+    def _fetch_and_save_forecast(
+        self, *, lat: float, lon: float, city: str, district: str
+    ) -> Tuple[WeatherLocation, ForecastPayload, int]:
+        fc = ow.get_forecast(lat=lat, lon=lon)
+        payload_city = (fc.get("city") or {}).get("name") or city
+        loc = self._get_or_create_location(
+            lat=lat, lon=lon, city=payload_city or "", district=district or ""
+        )
+        with transaction.atomic():
+            saved_count = repo.save_forecast(location=loc, forecast=fc)
+        return loc, fc, saved_count
+
+    def _fetch_and_save_current(
+        self, *, lat: float, lon: float, city: str, district: str
+    ) -> Dict[str, Any]:
+        cur = ow.get_current(lat=lat, lon=lon)
+        raw_city = (cur.get("raw") or {}).get("name")
+        if raw_city and not city:
+            city = raw_city
+        loc = self._get_or_create_location(
+            lat=lat, lon=lon, city=city or "", district=district or ""
+        )
+        with transaction.atomic():
+            obj = repo.save_current(location=loc, current=cur)
+        return WeatherDataOutSerializer(obj).data
+
+    def _current_cached(
+        self, *, lat: float, lon: float, city: str, district: str
+    ) -> Dict[str, Any]:
+        """격자 단위 현재 날씨 캐시. TTL 은 조회 빈도로 정하고 hot 키는 만료 전에 갱신
+
+        응답의 id/location_name 은 위치 행 기준이라, 지명이 있으면 키에 지명도 넣어
+        같은 격자의 다른 지역 요청에 앞 요청의 위치가 내려가지 않게 한다.
+        """
+        label = locations.coord_label(lat, lon)
+        hits = hotkeys.record(label)
+        key = f"{CURRENT_CACHE_PREFIX}:{label}"
+        name = f"{city} {district}".strip()
+        if name:
+            key += ":" + hashlib.md5(name.encode()).hexdigest()[:12]
+        entry = cache.get(key)
+        if entry is not None:
+            if hotkeys.needs_refresh(hits, entry["fetched_at"], entry["ttl"]):
+                self._schedule_current_refresh(key, hits, lat, lon, city, district)
+            return entry["data"]
+        return self._store_current(key, hits, lat, lon, city, district)
+
+    def _schedule_current_refresh(self, key: str, hits: int, *args: Any) -> None:
+        """만료 전 갱신 예약 (갱신은 한 작업만, 실패하면 기존 값 유지)"""
+        if cache.add(f"{key}:refresh", 1, timeout=REFRESH_LOCK_SECONDS):
+            _refresh_executor.submit(self._refresh_current, key, hits, *args)
+
+    def _refresh_current(self, key: str, hits: int, *args: Any) -> None:
+        try:
+            self._store_current(key, hits, *args)
+        except Exception:
+            logger.exception("weather refresh-ahead failed (%s)", key)
+        finally:
+            cache.delete(f"{key}:refresh")
+            connection.close()  # 스레드 전용 DB 연결 정리
+
+    def _store_current(
+        self, key: str, hits: int, lat: float, lon: float, city: str, district: str
+    ) -> Dict[str, Any]:
+        data = self._fetch_and_save_current(
+            lat=lat, lon=lon, city=city, district=district
+        )
+        ttl = hotkeys.ttl_for(hits, CURRENT_CACHE_TTLS)
+        cache.set(
+            key, {"data": data, "fetched_at": time.time(), "ttl": ttl}, timeout=ttl
+        )
+        return data
+
+    def _forecast_series(self, request, part: str) -> Response:
+        """저장된 3시간 예보로 시간별/일별 시리즈 생성 (없으면 예보를 받아 저장)"""
+        try:
+            lat, lon, city, district = self._resolve_coords_from_query(request)
+            loc = self._get_or_create_location(
+                lat=lat, lon=lon, city=city, district=district
+            )
+            hits = hotkeys.record(locations.coord_label(lat, lon))
+            ttl = hotkeys.ttl_for(hits, forecast_series.SERIES_CACHE_TTLS)
+            series = forecast_series.get_series(loc, ttl=ttl)
+            if series is None:
+                try:
+                    loc, _, _ = self._fetch_and_save_forecast(
+                        lat=lat, lon=lon, city=city, district=district
+                    )
+                except ow.ProviderTimeout:
+                    return Response(
+                        {"detail": "provider_timeout"},
+                        status=status.HTTP_502_BAD_GATEWAY,
+                    )
+                except ow.ProviderError as e:
+                    return Response(
+                        {"detail": str(e) or "provider_error"},
+                        status=status.HTTP_502_BAD_GATEWAY,
+                    )
+                series = forecast_series.get_series(loc, ttl=ttl)
+            if series is None:
+                return Response(
+                    {"detail": "forecast_not_found"}, status=status.HTTP_404_NOT_FOUND
+                )
+            return Response(
+                {
+                    "location_id": series["location_id"],
+                    "base_time": series["base_time"],
+                    part: series[part],  # type: ignore[literal-required]
+                },
+                status=status.HTTP_200_OK,
+            )
+        except serializers.ValidationError as ve:
+            return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
+        except Exception:
+            return Response(
+                {"detail": "weather_fetch_failed"}, status=status.HTTP_502_BAD_GATEWAY
+            )
+
     @extend_schema(
         summary="현재 날씨 조회",
         parameters=[
@@ -120,7 +245,9 @@ class WeatherViewSet(viewsets.GenericViewSet):
         try:
             lat, lon, city, district = self._resolve_coords_from_query(request)
             try:
-                cur = ow.get_current(lat=lat, lon=lon)
+                data = self._current_cached(
+                    lat=lat, lon=lon, city=city, district=district
+                )
             except ow.ProviderTimeout:
                 return Response(
                     {"detail": "provider_timeout"}, status=status.HTTP_502_BAD_GATEWAY
@@ -130,17 +257,7 @@ class WeatherViewSet(viewsets.GenericViewSet):
                     {"detail": str(e) or "provider_error"},
                     status=status.HTTP_502_BAD_GATEWAY,
                 )
-            raw_city = (cur.get("raw") or {}).get("name")
-            if raw_city and not city:
-                city = raw_city
-            loc = self._get_or_create_location(
-                lat=lat, lon=lon, city=city or "", district=district or ""
-            )
-            with transaction.atomic():
-                obj = repo.save_current(location=loc, current=cur)
-            return Response(
-                WeatherDataOutSerializer(obj).data, status=status.HTTP_200_OK
-            )
+            return Response(data, status=status.HTTP_200_OK)
         except serializers.ValidationError as ve:
             return Response(ve.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception:
@@ -176,7 +293,9 @@ class WeatherViewSet(viewsets.GenericViewSet):
             q.is_valid(raise_exception=True)
             lat, lon, city, district = self._resolve_coords_from_query(request)
             try:
-                fc = ow.get_forecast(lat=lat, lon=lon)
+                loc, fc, saved_count = self._fetch_and_save_forecast(
+                    lat=lat, lon=lon, city=city, district=district
+                )
             except ow.ProviderTimeout:
                 return Response(
                     {"detail": "provider_timeout"}, status=status.HTTP_502_BAD_GATEWAY
@@ -186,16 +305,10 @@ class WeatherViewSet(viewsets.GenericViewSet):
                     {"detail": str(e) or "provider_error"},
                     status=status.HTTP_502_BAD_GATEWAY,
                 )
-            payload_city = ((fc.get("city") or {}).get("name")) or city
-            loc = self._get_or_create_location(
-                lat=lat, lon=lon, city=payload_city or "", district=district or ""
-            )
-            with transaction.atomic():
-                saved_count = repo.save_forecast(location=loc, forecast_payload=fc)
-            dts = []
-            for item in fc.get("list", []):
-                ts = int(item.get("dt", 0))
-                dts.append(datetime.fromtimestamp(ts, tz=py_tz.utc))
+            dts = [
+                datetime.fromtimestamp(item["dt"], tz=py_tz.utc)
+                for item in fc.get("list", [])
+            ]
             objs = list(
                 WeatherData.objects.filter(location=loc, valid_time__in=dts).order_by(
                     "valid_time"
@@ -215,6 +328,56 @@ class WeatherViewSet(viewsets.GenericViewSet):
                 {"detail": "weather_fetch_failed"}, status=status.HTTP_502_BAD_GATEWAY
             )
 
+    @extend_schema(
+        summary="시간별 예보 (3시간 예보 보간)",
+        parameters=[
+            OpenApiParameter(
+                name="city", type=str, location=OpenApiParameter.QUERY, required=False
+            ),
+            OpenApiParameter(
+                name="district",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+            ),
+            OpenApiParameter(
+                name="lat", type=float, location=OpenApiParameter.QUERY, required=False
+            ),
+            OpenApiParameter(
+                name="lon", type=float, location=OpenApiParameter.QUERY, required=False
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=["get"], url_path="forecast/hourly")
+    def forecast_hourly(self, request):
+        return self._forecast_series(request, "hourly")
+
+    @extend_schema(
+        summary="일별 예보 요약 (최저/최고/강수)",
+        parameters=[
+            OpenApiParameter(
+                name="city", type=str, location=OpenApiParameter.QUERY, required=False
+            ),
+            OpenApiParameter(
+                name="district",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+            ),
+            OpenApiParameter(
+                name="lat", type=float, location=OpenApiParameter.QUERY, required=False
+            ),
+            OpenApiParameter(
+                name="lon", type=float, location=OpenApiParameter.QUERY, required=False
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=["get"], url_path="forecast/daily")
+    def forecast_daily(self, request):
+        return self._forecast_series(request, "daily")
+
     @extend_schema(
         summary="날씨 히스토리 조회",
         parameters=[
@@ -262,19 +425,7 @@ class WeatherViewSet(viewsets.GenericViewSet):
                         {"detail": "location_id 또는 lat/lon 중 하나는 필수"},
                         status=400,
                     )
-                loc = (
-                    WeatherLocation.objects.filter(lat=float(lat), lon=float(lon))
-                    .order_by("-id")
-                    .first()
-                )
-                if not loc:
-                    loc = WeatherLocation.objects.create(
-                        city="",
-                        district="",
-                        lat=float(lat),
-                        lon=float(lon),
-                        dp_name=f"{lat},{lon}",
-                    )
+                loc = locations.resolve_location(lat=float(lat), lon=float(lon))
             start = q.validated_data.get("start")
             end = q.validated_data.get("end")
             if not start or not end:
@@ -299,3 +450,67 @@ class WeatherViewSet(viewsets.GenericViewSet):
             return Response(
                 {"detail": "history_fetch_failed"}, status=status.HTTP_502_BAD_GATEWAY
             )
+
+    @extend_schema(
+        summary="자주 조회되는 위치 top-K (관리자 전용)",
+        parameters=[
+            OpenApiParameter(
+                name="limit", type=int, location=OpenApiParameter.QUERY, required=False
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="hot-keys",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def hot_keys(self, request):
+        try:
+            limit = int(request.query_params.get("limit", hotkeys.TOP_K))
+        except ValueError:
+            return Response({"detail": "invalid_limit"}, status=400)
+        window_start, items = hotkeys.top_k(max(1, min(limit, hotkeys.TOP_K)))
+        return Response(
+            {
+                "window_start": datetime.fromtimestamp(
+                    window_start, tz=py_tz.utc
+                ).isoformat(),
+                "window_seconds": hotkeys.WINDOW_SECONDS,
+                "items": items,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        summary="날씨 데이터 내보내기 (관리자 전용, 스트리밍)",
+        parameters=[ExportQuerySerializer],
+        responses={200: bytes},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def export_data(self, request):
+        q = ExportQuerySerializer(data=request.query_params)
+        q.is_valid(raise_exception=True)
+        data = q.validated_data
+        chunks = export.stream_export(
+            data["dataset"],
+            data["format"],
+            location_ids=data.get("location_id") or None,
+            start=data.get("start"),
+            end=data.get("end"),
+            chunk_size=data["chunk_size"],
+        )
+        # ASGI 에서도 한 청크씩 내보내도록 (동기 이터레이터는 전부 모아서 보냄)
+        resp = StreamingHttpResponse(
+            streaming_body(request, chunks),
+            content_type=export.content_type_for(data["format"]),
+        )
+        filename = export.filename_for(data["dataset"], data["format"])
+        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return resp
@@ -37,7 +37,7 @@ echo "🗄️ Running migrations..."
 python manage.py migrate
 
 echo "🚀 Starting gunicorn..."
-gunicorn settings.wsgi:application --bind 0.0.0.0:8000 --workers 3 --daemon
+gunicorn settings.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --workers 3 --daemon
 sleep 3
 
 echo "✅ Checking if gunicorn is running..."
@@ -12,5 +12,5 @@ echo "Redis is up!"
 python manage.py makemigrations --check --noinput || echo "No changes"
 python manage.py migrate
 
-# Gunicorn 실행
-gunicorn settings.wsgi:application --bind 0.0.0.0:8000 --workers 3
\ No newline at end of file
+# Gunicorn 실행 (ASGI: 비동기 채팅 뷰를 위해 uvicorn 워커 사용)
+gunicorn settings.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --workers 3
\ No newline at end of file
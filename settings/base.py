@@ -74,6 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.TxnTimingMiddleware',
 ]
 
 # ==================== CORS 설정 ====================
@@ -250,3 +251,20 @@ OPENWEATHER: OpenWeatherConf = {
 
 # URL설정
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+
+# ==================== 챗봇 설정 ====================
+# 마지막 대화 후 이 시간 안에 session_id 없이 보내면 같은 세션을 이어서 사용
+CHAT_SESSION_TTL_MINUTES = env.int("CHAT_SESSION_TTL_MINUTES", default=10)
+# GPT 프롬프트에 넣는 이전 대화(요약 포함) 토큰 예산
+CHAT_HISTORY_TOKEN_BUDGET = env.int("CHAT_HISTORY_TOKEN_BUDGET", default=1200)
+# 대화 로그를 버퍼에 넣고 응답한 뒤 배치로 저장 (Redis 면 flush_chat_logs 명령 실행 필요)
+CHAT_LOG_WRITE_BEHIND = env.bool("CHAT_LOG_WRITE_BEHIND", default=False)
+# LLM 호출: 요청당 마감(초), 최대 시도 횟수, 워커당 동시 호출 수
+CHAT_LLM_DEADLINE_SECONDS = env.float("CHAT_LLM_DEADLINE_SECONDS", default=20.0)
+CHAT_LLM_MAX_ATTEMPTS = env.int("CHAT_LLM_MAX_ATTEMPTS", default=3)
+CHAT_LLM_MAX_CONCURRENCY = env.int("CHAT_LLM_MAX_CONCURRENCY", default=8)
+# LLM 모델 라우팅 기준 덮어쓰기 (키는 apps.chat.services.model_picker.DEFAULT_ROUTING 참고)
+CHAT_MODEL_ROUTING = env.json("CHAT_MODEL_ROUTING", default={})
+# 세션 날씨 스냅샷: 이 시간(초) 안이면 그대로, 최대 나이까지는 재사용하며 백그라운드 갱신
+CHAT_WEATHER_FRESH_SECONDS = env.int("CHAT_WEATHER_FRESH_SECONDS", default=600)
+CHAT_WEATHER_MAX_AGE_SECONDS = env.int("CHAT_WEATHER_MAX_AGE_SECONDS", default=3600)